@@ -0,0 +1,136 @@
+"""
+Benchmark the example apps, rendering headlessly through a fixed stretch of simulated time.
+
+    python -m benchmarks.apps [app ...] [--seconds 60] [--update-baseline]
+
+Each app runs in a process of its own, so that its peak memory is its own. Results are
+compared against benchmarks/baseline_apps.json, and the exit status is 1 if any app has
+regressed beyond the tolerances in `benchmarks.harness.TOLERANCES`.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import examples.weather_app
+from benchmarks.harness import (
+    AppDriver,
+    Workload,
+    compare,
+    create_headless_matrix,
+    format_table,
+    load_baseline,
+    peak_rss_mib,
+    save_baseline,
+    simulated_time,
+    summarize,
+)
+from examples import render_test
+from examples.advent_app import AdventApp
+from examples.satori import SatoriApp
+from examples.weather_app import WeatherApp
+from examples.world_clock import WorldClock
+from lmae.app import App
+
+EXAMPLES_PATH = os.path.dirname(examples.weather_app.__file__)
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline_apps.json")
+COLUMNS = ["fps", "p50_ms", "p99_ms", "max_ms", "alloc_kib_per_frame", "peak_rss_mib"]
+
+# simulated seconds to run before measuring, so that caches are warm
+WARMUP_SECONDS = 5.0
+ALLOCATION_FRAMES = 100
+
+
+def weather_app() -> App:
+    with open(os.path.join(EXAMPLES_PATH, "openweather/example.json")) as file:
+        conditions_and_forecast = json.load(file)
+
+    # answer weather requests with the canned response, rather than calling OpenWeather
+    def canned_conditions_and_forecast(latitude: str, longitude: str, api_key: str) -> dict:
+        return conditions_and_forecast
+
+    examples.weather_app.get_conditions_and_forecast_by_lat_long = canned_conditions_and_forecast
+    return WeatherApp(
+        api_key="canned",
+        latitude=str(conditions_and_forecast["lat"]),
+        longitude=str(conditions_and_forecast["lon"]),
+        resource_path=EXAMPLES_PATH,
+    )
+
+
+WORKLOADS: dict[str, Workload] = {
+    "weather": weather_app,
+    "satori": lambda: SatoriApp.get_app_instance(seed=1),
+    "world_clock": WorldClock.get_app_instance,
+    "advent": AdventApp.get_app_instance,
+    "render_test": render_test.create_app,
+}
+
+
+def run_workload(name: str, seconds: float) -> dict[str, float]:
+    """
+    Run an app through simulated time, and measure it.
+
+    :param name: The app's name in `WORKLOADS`
+    :param seconds: How long to run, in simulated seconds
+    :return: the app's metrics
+    """
+    with simulated_time() as clock:
+        matrix, options = create_headless_matrix()
+        app = WORKLOADS[name]()
+        app.set_matrix(matrix=matrix, options=options)
+        driver = AppDriver(app, clock)
+        driver.run_for(WARMUP_SECONDS)
+        metrics = summarize(driver.run_for(seconds))
+        metrics["alloc_kib_per_frame"] = driver.allocations(ALLOCATION_FRAMES)
+        driver.stop()
+        matrix.close()
+    metrics["peak_rss_mib"] = peak_rss_mib()
+    return metrics
+
+
+def run_in_subprocess(name: str, seconds: float) -> dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.apps", "--worker", name, "--seconds", str(seconds)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the example apps headlessly")
+    parser.add_argument("apps", nargs="*", choices=list(WORKLOADS), help="Apps to run")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Simulated seconds per app")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file path")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Store the results as the baseline"
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    options = parser.parse_args(args)
+
+    if options.worker:
+        print(json.dumps(run_workload(options.worker, options.seconds)))
+        return 0
+
+    results = {}
+    for name in options.apps or WORKLOADS:
+        print(f"Running {name} for {options.seconds:g} simulated seconds", file=sys.stderr)
+        results[name] = run_in_subprocess(name, options.seconds)
+    print(format_table(results, COLUMNS))
+
+    if options.update_baseline:
+        save_baseline(options.baseline, {**load_baseline(options.baseline), **results})
+        print(f"Stored baseline in {options.baseline}")
+        return 0
+    regressions = compare(results, load_baseline(options.baseline))
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
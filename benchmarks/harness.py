@@ -0,0 +1,262 @@
+import datetime
+import json
+import os
+import resource
+import sys
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, cast
+
+import freezegun.api
+from freezegun import freeze_time
+
+from lmae import app_runner
+from lmae.app import App, DisplayManagedApp
+from lmae.core import Stage
+from lmae.display import HeadlessRGBMatrix, VirtualRGBMatrixOptions
+
+# simulated time starts when the canned weather data in examples/openweather was fetched
+START_TIME = datetime.datetime.fromtimestamp(1693660308, datetime.UTC)
+
+# how much worse than the baseline a result can be before it counts as a regression
+TOLERANCES = {
+    "fps": -0.15,  # fractional change
+    "p50_ms": 0.25,
+    "p99_ms": 0.50,
+    "alloc_kib_per_frame": 0.25,
+    "peak_rss_mib": 0.15,
+}
+
+
+def real_clock() -> float:
+    """
+    :return: the real time, in seconds, from `time.perf_counter()`, even while simulated
+        time is in effect
+    """
+    # freezegun never patches its own module, so this is always the real clock
+    return freezegun.api.real_perf_counter()
+
+
+@contextmanager
+def simulated_time(start: datetime.datetime = START_TIME) -> Iterator[Any]:
+    """
+    Run with simulated time, which stands still until it is ticked forward. Everything that
+    reads the time, such as stages, schedulers and apps, must be created inside the context.
+
+    :param start: When simulated time starts
+    :return: a context that yields the simulated clock, with a `tick(seconds)` method
+    """
+    with freeze_time(start) as clock:
+        yield clock
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    :param values: Values, in any order
+    :param fraction: Which percentile, from 0.0 to 1.0
+    :return: the value at that percentile, by nearest rank
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def peak_rss_mib() -> float:
+    """
+    :return: the most memory this process has had resident, in MiB
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macOS, in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def create_headless_matrix(
+    size: tuple[int, int] = (64, 32),
+) -> tuple[HeadlessRGBMatrix, VirtualRGBMatrixOptions]:
+    """
+    Create a matrix that needs no display, as the app runner does with `--headless`.
+
+    :param size: The display size, in pixels
+    :return: the matrix and its options
+    """
+    options = VirtualRGBMatrixOptions()
+    options.cols, options.rows = size
+    app_runner.matrix_options = options
+    matrix = HeadlessRGBMatrix(options, ring_name=f"lmae-benchmark-{os.getpid()}")
+    return matrix, options
+
+
+class AppDriver:
+    """
+    Steps an app through its frame loop one frame at a time, as its `run()` would, without
+    waiting between frames. Simulated time moves forward by one frame on each step.
+    """
+
+    def __init__(self, app: App, clock: Any, frame_rate: float | None = None):
+        """
+        :param app: The app, with its matrix set. It is prepared here.
+        :param clock: The simulated clock, from `simulated_time()`
+        :param frame_rate: The frame rate to simulate, in frames per second.
+            Defaults to the app's maximum frame rate.
+        """
+        self.app = app
+        self.clock = clock
+        self.frame_rate = frame_rate or getattr(app, "max_frame_rate", 30)
+        self.frame_count = 0
+        app.prepare()
+        app.running = True
+        self.stage = cast(Stage, app.stage)
+        self.stage.needs_render = True
+        self.cycle_start = self.simulated_seconds = 0.0
+
+    def step(self) -> float:
+        """
+        Render one frame, then move simulated time forward by one frame.
+
+        :return: how long the frame took, in real seconds
+        """
+        app = self.app
+        start = real_clock()
+        app.run_scheduled()
+        if isinstance(app, DisplayManagedApp):
+            elapsed_time = self.simulated_seconds - self.cycle_start
+            if elapsed_time >= app.refresh_time:
+                self.cycle_start = self.simulated_seconds
+                elapsed_time = 0.0
+            app.update_view(elapsed_time=elapsed_time)
+        elif getattr(app, "pre_render_callback", None):
+            app.pre_render_callback()
+        self.stage.render_frame()
+        frame_time = real_clock() - start
+        self.frame_count += 1
+        self.simulated_seconds += 1.0 / self.frame_rate
+        self.clock.tick(1.0 / self.frame_rate)
+        return frame_time
+
+    def run_for(self, seconds: float) -> list[float]:
+        """
+        Run for a while in simulated time.
+
+        :param seconds: How long to run, in simulated seconds
+        :return: how long each frame took, in real seconds
+        """
+        return [self.step() for _ in range(round(seconds * self.frame_rate))]
+
+    def allocations(self, frames: int) -> float:
+        """
+        Measure how much memory frames allocate, with tracemalloc. This slows rendering down,
+        so it is measured apart from frame times.
+
+        :param frames: How many frames to measure
+        :return: the mean memory allocated per frame, in KiB
+        """
+        tracemalloc.start()
+        total = 0
+        try:
+            for _ in range(frames):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                self.step()
+                total += tracemalloc.get_traced_memory()[1] - before
+        finally:
+            tracemalloc.stop()
+        return total / frames / 1024 if frames else 0.0
+
+    def stop(self) -> None:
+        """
+        Stop the app. Its matrix is left open, for the next app to use.
+        """
+        self.app.stop()
+
+
+def summarize(frame_times: list[float]) -> dict[str, float]:
+    """
+    :param frame_times: How long each frame took, in seconds
+    :return: the frame count, the frames per second that could be rendered back to back,
+        and the median, 99th percentile and longest frame times, in milliseconds
+    """
+    total = sum(frame_times)
+    return {
+        "frames": len(frame_times),
+        "fps": len(frame_times) / total if total else 0.0,
+        "p50_ms": percentile(frame_times, 0.50) * 1000,
+        "p99_ms": percentile(frame_times, 0.99) * 1000,
+        "max_ms": max(frame_times, default=0.0) * 1000,
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerances: dict[str, float] | None = None,
+) -> list[str]:
+    """
+    Compare results against a baseline.
+
+    :param results: Metrics for each benchmark
+    :param baseline: Baseline metrics for each benchmark
+    :param tolerances: How much each metric may get worse, as a fraction of its baseline:
+        negative for metrics where lower is worse. Defaults to `TOLERANCES`.
+    :return: a description of each regression
+    """
+    tolerances = tolerances or TOLERANCES
+    regressions = []
+    for name, metrics in results.items():
+        for metric, tolerance in tolerances.items():
+            if metric not in metrics or metric not in baseline.get(name, {}):
+                continue
+            expected, actual = baseline[name][metric], metrics[metric]
+            limit = expected * (1 + tolerance)
+            if (tolerance < 0 and actual < limit) or (tolerance > 0 and actual > limit):
+                regressions.append(
+                    f"{name} {metric}: {actual:.2f}, baseline {expected:.2f} (limit {limit:.2f})"
+                )
+    return regressions
+
+
+def load_baseline(path: str) -> dict[str, dict[str, float]]:
+    """
+    :param path: The baseline file path
+    :return: the baseline metrics for each benchmark, or nothing if there is no baseline
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def save_baseline(path: str, results: dict[str, dict[str, float]]) -> None:
+    """
+    Store results as the baseline.
+
+    :param path: The baseline file path
+    :param results: The metrics for each benchmark
+    """
+    machine = f"{os.uname().machine} {sys.implementation.name} {sys.version.split()[0]}"
+    with open(path, "w") as file:
+        json.dump({"machine": machine, "results": results}, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def format_table(results: dict[str, dict[str, float]], columns: list[str]) -> str:
+    """
+    :param results: Metrics for each benchmark
+    :param columns: The metrics to show
+    :return: the results as a text table
+    """
+    width = max([len("benchmark"), *(len(name) for name in results)])
+    widths = [max(10, len(column)) for column in columns]
+    header = " ".join(f"{column:>{w}}" for column, w in zip(columns, widths, strict=True))
+    lines = [f"{'benchmark':<{width}} {header}"]
+    for name, metrics in results.items():
+        cells = " ".join(
+            f"{metrics.get(column, float('nan')):>{w}.2f}"
+            for column, w in zip(columns, widths, strict=True)
+        )
+        lines.append(f"{name:<{width}} {cells}")
+    return "\n".join(lines)
+
+
+Workload = Callable[[], App]
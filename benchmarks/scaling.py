@@ -0,0 +1,306 @@
+"""
+Measure how stage frame time scales with the number of actors, the number of animations,
+and the canvas size, on synthetic scenes.
+
+    python -m benchmarks.scaling [--frames 60] [--plot scaling.png] [--csv scaling.csv]
+
+Three sweeps are run: each actor type alone at increasing counts, a mixed scene with
+increasing animation counts, and a mixed scene at increasing canvas sizes. Frame times are
+shown as a chart, drawn with matplotlib if it is installed, or as text otherwise. Results
+are compared against benchmarks/baseline_scaling.json, and the exit status is 1 on a
+regression.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+from collections.abc import Callable
+
+from PIL import Image, ImageFont
+
+from benchmarks.harness import (
+    compare,
+    create_headless_matrix,
+    format_table,
+    load_baseline,
+    real_clock,
+    save_baseline,
+    simulated_time,
+    summarize,
+)
+from lmae.actor import CropMask, Rectangle, SpriteImage, StillImage, Text
+from lmae.animation import Sequence, StraightMove
+from lmae.core import Actor, Animation, Stage
+from lmae.sprite_sheet import SpriteSheet
+
+try:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib import pyplot
+except ImportError:
+    pyplot = None  # type: ignore[assignment]
+
+FONT_PATH = os.path.join(
+    os.path.dirname(__file__), "../examples/fonts/teeny-tiny-pixls-font/TeenyTinyPixls-o2zo.ttf"
+)
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline_scaling.json")
+COLUMNS = ["actors", "animations", "width", "height", "p50_ms", "p99_ms"]
+TOLERANCES = {"p50_ms": 0.30}
+
+ACTOR_COUNTS = [1, 16, 64, 256]
+ANIMATION_COUNTS = [0, 16, 64, 256, 1024]
+CANVAS_SIZES = [(64, 32), (128, 64), (192, 96), (256, 128)]
+MIXED_ACTORS = 64
+
+
+class SceneBuilder:
+    """
+    Builds synthetic scenes of actors scattered over a canvas, from a fixed random seed.
+    """
+
+    def __init__(self, size: tuple[int, int], seed: int = 47):
+        """
+        :param size: The canvas size, in pixels
+        :param seed: The random seed
+        """
+        self.size = size
+        self.random = random.Random(seed)
+        self.font = ImageFont.truetype(FONT_PATH, 5)
+        self.image = Image.new("RGBA", (8, 8))
+        self.image.putdata([(x * 32, y * 32, 128, 255) for y in range(8) for x in range(8)])
+        sheet_image = Image.new("RGBA", (32, 8))
+        for index in range(4):
+            sheet_image.paste(
+                (64 * index, 255 - 64 * index, 96, 255), (index * 8, 0, index * 8 + 8, 8)
+            )
+        spec = {f"frame{i}": {"position": [i * 8, 0], "size": [8, 8]} for i in range(4)}
+        self.sheet = SpriteSheet(sheet_image, spec)
+
+    def position(self) -> tuple[int, int]:
+        return self.random.randrange(self.size[0]), self.random.randrange(self.size[1])
+
+    def text(self) -> Actor:
+        return Text(font=self.font, position=self.position(), text=f"T{self.random.randrange(99)}")
+
+    def still_image(self) -> Actor:
+        return StillImage(position=self.position(), image=self.image)
+
+    def sprite_image(self) -> Actor:
+        selected = f"frame{self.random.randrange(4)}"
+        return SpriteImage(position=self.position(), sheet=self.sheet, selected=selected)
+
+    def rectangle(self) -> Actor:
+        color = (self.random.randrange(256), self.random.randrange(256), 64, 255)
+        return Rectangle(position=self.position(), size=(5, 3), color=color)
+
+    def crop_mask(self) -> Actor:
+        child = Rectangle(position=self.position(), size=(9, 9), color=(255, 128, 0, 255))
+        left, top = child.position
+        return CropMask(
+            child=child, size=self.size, crop_area=(left + 2, top + 2, left + 6, top + 6)
+        )
+
+    def actor_types(self) -> dict[str, Callable[[], Actor]]:
+        return {
+            "Text": self.text,
+            "StillImage": self.still_image,
+            "SpriteImage": self.sprite_image,
+            "Rectangle": self.rectangle,
+            "CropMask": self.crop_mask,
+        }
+
+    def actors(self, count: int, actor_type: str | None = None) -> list[Actor]:
+        """
+        :param count: How many actors
+        :param actor_type: Which type of actor, or None for all types in turn
+        :return: the actors
+        """
+        types = self.actor_types()
+        makers = itertools.cycle([types[actor_type]] if actor_type else types.values())
+        return [next(makers)() for _ in range(count)]
+
+    def animations(self, actors: list[Actor], count: int) -> list[Animation]:
+        """
+        :param actors: The actors to animate, in turn
+        :param count: How many animations
+        :return: repeating animations that move the actors back and forth
+        """
+        animations: list[Animation] = []
+        for actor in itertools.islice(itertools.cycle(actors), count):
+            distance = (self.random.randrange(-4, 5), self.random.randrange(-2, 3))
+            duration = self.random.uniform(0.5, 2.0)
+            back = (-distance[0], -distance[1])
+            animations.append(
+                Sequence(
+                    actor=actor,
+                    repeat=True,
+                    animations=[
+                        StraightMove(actor=actor, distance=distance, duration=duration),
+                        StraightMove(actor=actor, distance=back, duration=duration),
+                    ],
+                )
+            )
+        return animations
+
+
+def measure_scene(
+    actor_count: int,
+    animation_count: int,
+    size: tuple[int, int] = (64, 32),
+    actor_type: str | None = None,
+    frames: int = 60,
+) -> dict[str, float]:
+    """
+    Render a synthetic scene for some frames, and measure the frame times.
+
+    :param actor_count: How many actors
+    :param animation_count: How many animations
+    :param size: The canvas size, in pixels
+    :param actor_type: Which type of actor, or None for all types in turn
+    :param frames: How many frames to measure, after one to warm up
+    :return: the scene's metrics
+    """
+    with simulated_time() as clock:
+        builder = SceneBuilder(size)
+        actors = builder.actors(actor_count, actor_type)
+        animations = builder.animations(actors, animation_count)
+        matrix, _ = create_headless_matrix(size)
+        stage = Stage(size=size, actors=actors, animations=animations, matrix=matrix)
+        frame_times = []
+        for _ in range(frames + 1):
+            start = real_clock()
+            stage.render_frame()
+            frame_times.append(real_clock() - start)
+            clock.tick(1.0 / 30)
+        matrix.close()
+    metrics = summarize(frame_times[1:])
+    metrics.update(actors=actor_count, animations=animation_count, width=size[0], height=size[1])
+    return metrics
+
+
+def run_sweeps(frames: int) -> dict[str, dict[str, dict[str, float]]]:
+    """
+    Run the three sweeps.
+
+    :param frames: How many frames to measure for each scene
+    :return: the metrics for each scene, by sweep and scene name
+    """
+    sweeps: dict[str, dict[str, dict[str, float]]] = {}
+    for actor_type in SceneBuilder((64, 32)).actor_types():
+        sweeps[f"actors: {actor_type}"] = {
+            f"{actor_type} x{count}": measure_scene(
+                count, count, actor_type=actor_type, frames=frames
+            )
+            for count in ACTOR_COUNTS
+        }
+    sweeps["animations: mixed"] = {
+        f"mixed x{MIXED_ACTORS}, {count} animations": measure_scene(
+            MIXED_ACTORS, count, frames=frames
+        )
+        for count in ANIMATION_COUNTS
+    }
+    sweeps["canvas: mixed"] = {
+        f"mixed x{MIXED_ACTORS}, {width}x{height}": measure_scene(
+            MIXED_ACTORS, MIXED_ACTORS, size=(width, height), frames=frames
+        )
+        for width, height in CANVAS_SIZES
+    }
+    return sweeps
+
+
+def sweep_axis(sweep: str) -> str:
+    if sweep.startswith("actors"):
+        return "actors"
+    if sweep.startswith("animations"):
+        return "animations"
+    return "width"
+
+
+def text_chart(sweeps: dict[str, dict[str, dict[str, float]]], width: int = 40) -> str:
+    """
+    :param sweeps: The metrics for each scene, by sweep and scene name
+    :param width: The width of the longest bar, in characters
+    :return: the median frame times as a bar chart in text
+    """
+    lines = []
+    for sweep, scenes in sweeps.items():
+        longest = max(metrics["p50_ms"] for metrics in scenes.values()) or 1.0
+        lines.append(sweep)
+        for metrics in scenes.values():
+            bar = "#" * max(1, round(metrics["p50_ms"] / longest * width))
+            lines.append(f"  {metrics[sweep_axis(sweep)]:>6g} {bar} {metrics['p50_ms']:.3f} ms")
+    return "\n".join(lines)
+
+
+def plot(sweeps: dict[str, dict[str, dict[str, float]]], path: str) -> None:
+    """
+    Plot median frame times against each sweep's variable.
+
+    :param sweeps: The metrics for each scene, by sweep and scene name
+    :param path: The image file to save the plot to
+    """
+    figure, axes = pyplot.subplots(1, 3, figsize=(15, 4.5))
+    for sweep, scenes in sweeps.items():
+        axis = sweep_axis(sweep)
+        subplot = axes[["actors", "animations", "width"].index(axis)]
+        x = [metrics[axis] for metrics in scenes.values()]
+        subplot.plot(x, [metrics["p50_ms"] for metrics in scenes.values()], "o-", label=sweep)
+    titles = ["Actors (one animation each)", f"Animations ({MIXED_ACTORS} actors)", "Canvas width"]
+    for subplot, title in zip(axes, titles, strict=True):
+        subplot.set_title(title)
+        subplot.set_xscale("log", base=2)
+        subplot.set_ylabel("median frame time (ms)")
+        subplot.legend(fontsize="small")
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def write_csv(sweeps: dict[str, dict[str, dict[str, float]]], path: str) -> None:
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["sweep", "scene", *COLUMNS])
+        for sweep, scenes in sweeps.items():
+            for scene, metrics in scenes.items():
+                writer.writerow([sweep, scene, *(metrics[column] for column in COLUMNS)])
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure how stage frame time scales")
+    parser.add_argument("--frames", type=int, default=60, help="Frames to measure per scene")
+    parser.add_argument("--plot", help="Save a plot of the results to this image file")
+    parser.add_argument("--csv", help="Save the results to this CSV file")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file path")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Store the results as the baseline"
+    )
+    options = parser.parse_args(args)
+
+    sweeps = run_sweeps(options.frames)
+    results = {scene: metrics for scenes in sweeps.values() for scene, metrics in scenes.items()}
+    print(format_table(results, COLUMNS))
+    print()
+    print(text_chart(sweeps))
+    if options.csv:
+        write_csv(sweeps, options.csv)
+    if options.plot:
+        if pyplot is None:
+            print("Install matplotlib to plot the results", file=sys.stderr)
+        else:
+            plot(sweeps, options.plot)
+
+    if options.update_baseline:
+        save_baseline(options.baseline, results)
+        print(f"Stored baseline in {options.baseline}")
+        return 0
+    regressions = compare(results, load_baseline(options.baseline), TOLERANCES)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
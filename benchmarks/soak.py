@@ -0,0 +1,231 @@
+"""
+Soak test apps through a day or more of simulated time, at accelerated speed, and check
+that nothing grows while they run.
+
+    python -m benchmarks.soak [app ...] [--hours 24] [--frame-rate 2] [--cycle-minutes 10]
+
+With more than one app, the apps take turns, as `examples/cycle.py` runs them. Frames are
+rendered back to back, with simulated time moving forward by one frame each, so scheduled
+calls such as hourly and daily updates happen as they would in a deployment.
+
+Memory, live objects by type, loggers and frame times are sampled as the apps run. After a
+warm-up, any that grow beyond their threshold fail the soak, with exit status 1.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+from collections import Counter
+
+import psutil
+
+from benchmarks.apps import WORKLOADS
+from benchmarks.harness import AppDriver, create_headless_matrix, simulated_time
+from lmae.app import App
+
+logger = logging.getLogger("benchmarks.soak")
+
+# how much each measure may grow between the end of the warm-up and the end of the soak
+DEFAULT_MAX_RSS_GROWTH_MIB = 16.0
+DEFAULT_MAX_OBJECT_GROWTH = 500  # live objects of any one type
+DEFAULT_MAX_LOGGER_GROWTH = 50
+DEFAULT_MAX_FRAME_TIME_DRIFT = 1.5  # ratio of mean frame times
+
+
+class Sample:
+    """
+    Measures taken at one point in a soak
+    """
+
+    def __init__(self, simulated_hours: float, frame_times: dict[str, list[float]]):
+        """
+        Take a sample now.
+
+        :param simulated_hours: How far into the soak the sample is taken, in simulated hours
+        :param frame_times: The frame times since the last sample, in real seconds, by app
+        """
+        gc.collect()
+        self.simulated_hours = simulated_hours
+        self.rss_mib = psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+        self.object_counts = Counter(type(item).__name__ for item in gc.get_objects())
+        self.logger_count = len(logging.Logger.manager.loggerDict)
+        # apps differ in how long their frames take, so frame times are kept apart by app
+        self.mean_frame_ms = {
+            name: sum(times) / len(times) * 1000 for name, times in frame_times.items() if times
+        }
+
+    def describe(self) -> str:
+        frames = "  ".join(f"{name} {ms:.3f} ms" for name, ms in self.mean_frame_ms.items())
+        return (
+            f"{self.simulated_hours:6.2f} h  rss {self.rss_mib:7.1f} MiB  "
+            f"objects {sum(self.object_counts.values()):8d}  loggers {self.logger_count:6d}  "
+            f"frame {frames}"
+        )
+
+
+class SoakTest:
+    """
+    Runs apps in turn through simulated time, sampling what they hold as they go.
+    """
+
+    def __init__(
+        self,
+        apps: list[App],
+        frame_rate: float = 2.0,
+        cycle_seconds: float = 600.0,
+        sample_seconds: float = 900.0,
+    ):
+        """
+        :param apps: The apps to run in turn. They must be created in simulated time.
+        :param frame_rate: How many frames to render per simulated second
+        :param cycle_seconds: How long each app runs before the next one takes a turn,
+            in simulated seconds
+        :param sample_seconds: How often to sample, in simulated seconds
+        """
+        self.apps = apps
+        self.frame_rate = frame_rate
+        self.cycle_seconds = cycle_seconds
+        self.sample_seconds = sample_seconds
+        self.samples: list[Sample] = []
+
+    def run(self, clock, hours: float) -> list[Sample]:
+        """
+        Run the apps.
+
+        :param clock: The simulated clock, from `simulated_time()`
+        :param hours: How long to run, in simulated hours
+        :return: the samples taken, starting with one before any frames were rendered
+        """
+        frames_per_cycle = max(1, round(self.cycle_seconds * self.frame_rate))
+        frames_per_sample = max(1, round(self.sample_seconds * self.frame_rate))
+        total_frames = round(hours * 3600 * self.frame_rate)
+        self.samples = [Sample(0.0, {})]
+        frame_times: dict[str, list[float]] = {}
+        driver: AppDriver | None = None
+        for frame in range(total_frames):
+            if frame % frames_per_cycle == 0:
+                if driver:
+                    driver.stop()
+                app = self.apps[frame // frames_per_cycle % len(self.apps)]
+                driver = AppDriver(app, clock, frame_rate=self.frame_rate)
+            frame_times.setdefault(type(driver.app).__name__, []).append(driver.step())
+            if (frame + 1) % frames_per_sample == 0:
+                sample = Sample((frame + 1) / self.frame_rate / 3600, frame_times)
+                logger.info(sample.describe())
+                self.samples.append(sample)
+                frame_times = {}
+        if driver:
+            driver.stop()
+        return self.samples
+
+
+def last_mean_frame_ms(samples: list[Sample]) -> dict[str, float]:
+    """
+    :param samples: The samples, in order
+    :return: each app's mean frame time in the latest sample that has one, in milliseconds
+    """
+    mean_frame_ms: dict[str, float] = {}
+    for sample in samples:
+        mean_frame_ms.update(sample.mean_frame_ms)
+    return mean_frame_ms
+
+
+def check_growth(
+    samples: list[Sample],
+    warmup_hours: float = 1.0,
+    max_rss_growth_mib: float = DEFAULT_MAX_RSS_GROWTH_MIB,
+    max_object_growth: int = DEFAULT_MAX_OBJECT_GROWTH,
+    max_logger_growth: int = DEFAULT_MAX_LOGGER_GROWTH,
+    max_frame_time_drift: float = DEFAULT_MAX_FRAME_TIME_DRIFT,
+) -> list[str]:
+    """
+    Compare the last sample of a soak with the first one after the warm-up.
+
+    :param samples: The samples, in order
+    :param warmup_hours: How long the apps may take to settle, in simulated hours
+    :param max_rss_growth_mib: How much resident memory may grow, in MiB
+    :param max_object_growth: How much the count of live objects of any one type may grow
+    :param max_logger_growth: How much the count of loggers may grow
+    :param max_frame_time_drift: How many times longer frames may take
+    :return: a description of each measure that grew too much
+    """
+    warm = next((sample for sample in samples if sample.simulated_hours >= warmup_hours), None)
+    last = samples[-1]
+    if warm is None or warm is last:
+        return [f"The soak must run for longer than its {warmup_hours:g} hour warm-up"]
+    failures = []
+    if last.rss_mib - warm.rss_mib > max_rss_growth_mib:
+        failures.append(f"Memory grew from {warm.rss_mib:.1f} MiB to {last.rss_mib:.1f} MiB")
+    growth = last.object_counts.copy()
+    growth.subtract(warm.object_counts)
+    for type_name, count in growth.most_common():
+        if count <= max_object_growth:
+            break
+        failures.append(
+            f"Live {type_name} objects grew by {count}, "
+            f"from {warm.object_counts[type_name]} to {last.object_counts[type_name]}"
+        )
+    if last.logger_count - warm.logger_count > max_logger_growth:
+        failures.append(f"Loggers grew from {warm.logger_count} to {last.logger_count}")
+    for name, last_ms in last_mean_frame_ms(samples).items():
+        warm_ms = last_mean_frame_ms(samples[: samples.index(warm) + 1]).get(name)
+        if warm_ms and last_ms > warm_ms * max_frame_time_drift:
+            failures.append(
+                f"Mean {name} frame time drifted from {warm_ms:.3f} ms to {last_ms:.3f} ms"
+            )
+    return failures
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Soak test apps through simulated time")
+    parser.add_argument("apps", nargs="*", choices=list(WORKLOADS), help="Apps to run in turn")
+    parser.add_argument("--hours", type=float, default=24.0, help="Simulated hours to run")
+    parser.add_argument("--frame-rate", type=float, default=2.0, help="Frames per simulated second")
+    parser.add_argument(
+        "--cycle-minutes", type=float, default=10.0, help="Simulated minutes per app turn"
+    )
+    parser.add_argument(
+        "--sample-minutes", type=float, default=15.0, help="Simulated minutes between samples"
+    )
+    parser.add_argument("--warmup-hours", type=float, default=1.0, help="Hours to settle")
+    parser.add_argument("--max-rss-growth", type=float, default=DEFAULT_MAX_RSS_GROWTH_MIB)
+    parser.add_argument("--max-object-growth", type=int, default=DEFAULT_MAX_OBJECT_GROWTH)
+    parser.add_argument("--max-logger-growth", type=int, default=DEFAULT_MAX_LOGGER_GROWTH)
+    parser.add_argument("--max-frame-time-drift", type=float, default=DEFAULT_MAX_FRAME_TIME_DRIFT)
+    options = parser.parse_args(args)
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger.setLevel(logging.INFO)
+
+    with simulated_time() as clock:
+        matrix, matrix_options = create_headless_matrix()
+        apps = [WORKLOADS[name]() for name in options.apps or WORKLOADS]
+        for app in apps:
+            app.set_matrix(matrix=matrix, options=matrix_options)
+        soak = SoakTest(
+            apps,
+            frame_rate=options.frame_rate,
+            cycle_seconds=options.cycle_minutes * 60,
+            sample_seconds=options.sample_minutes * 60,
+        )
+        samples = soak.run(clock, options.hours)
+        matrix.close()
+
+    failures = check_growth(
+        samples,
+        warmup_hours=options.warmup_hours,
+        max_rss_growth_mib=options.max_rss_growth,
+        max_object_growth=options.max_object_growth,
+        max_logger_growth=options.max_logger_growth,
+        max_frame_time_drift=options.max_frame_time_drift,
+    )
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if not failures:
+        print(f"Soaked for {samples[-1].simulated_hours:g} simulated hours without growth")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,11 @@ import os.path
 import time
 from datetime import datetime
 
-from PIL import ImageFont
-
 from lmae import app_runner
 from lmae.actor import Rectangle, StillImage, Text
 from lmae.animation import HueFade, Sequence
 from lmae.app import DisplayManagedApp
+from lmae.assets import asset_registry
 from lmae.core import Animation
 
 
@@ -29,10 +28,10 @@ class AdventApp(DisplayManagedApp):
         self.refresh_time = refresh_time
         roboto_font_path = os.path.join(font_path, "Roboto/Roboto-Light.ttf")
         self.logger.debug(f"Roboto font path: {roboto_font_path}")
-        self.big_font = ImageFont.truetype(roboto_font_path, 15)
+        self.big_font = self.load_font(roboto_font_path, 15)
         self.counter_label = Text(font=self.big_font, name="counter", position=(8, 2))
         teeny_font_path = os.path.join(font_path, "teeny-tiny-pixls-font/TeenyTinyPixls-o2zo.ttf")
-        self.small_font = ImageFont.truetype(teeny_font_path, 5)
+        self.small_font = self.load_font(teeny_font_path, 5)
         self.line_1_label = Text(
             font=self.small_font,
             name="line_1_text",
@@ -49,7 +48,7 @@ class AdventApp(DisplayManagedApp):
         )
         self.tree_image = StillImage(name="tree", position=(37, 0))
         tree_image_path = os.path.join(image_path, "pixel-tree-22x32-alpha.png")
-        self.tree_image.set_from_file(tree_image_path)
+        self.tree_image.set_from_image(self.load_image(tree_image_path))
         self.days_until_christmas = 0
         self.hours_until_christmas = 0
         self.minutes_until_christmas = 0
@@ -115,6 +114,9 @@ class AdventApp(DisplayManagedApp):
             self.stage.actors.extend(self.lights_list)
         self.logger.debug(f"Stage needs render? {self.stage.needs_render}")
         self.update_countdown()
+        self.update_lights(datetime.now().hour)
+        self.call_on("minute", self.update_countdown)
+        self.call_on("hour", self.on_the_hour)
 
     def update_countdown(self):
         current_datetime = datetime.now()
@@ -154,9 +156,12 @@ class AdventApp(DisplayManagedApp):
         self.colors_index = int(hour_of_day % 6)
         self.twinkle = int(hour_of_day % 2)
 
-    def update_view(self, elapsed_time: float = 0.0):
-        self.update_countdown()
+    def on_the_hour(self):
+        self.update_lights(datetime.now().hour)
 
+    def update_view(self, elapsed_time: float = 0.0):
+        # the countdown and the lights are updated by scheduled calls,
+        # so all that's needed here is to reflect any change in the labels.
         # determine counter and text label values
         if (
             self.was_it_christmas != self.is_christmas
@@ -187,7 +192,8 @@ class AdventApp(DisplayManagedApp):
                 self.counter_label.set_text(str(self.days_until_christmas))
                 self.line_1_label.set_text("days")
 
-            # center labels
+            # center labels on the left half of the display, by their measured width,
+            # which doesn't need them to be rendered
             counter_x_offset = int((32 - self.counter_label.size[0]) / 2)
             line_1_x_offset = int((32 - self.line_1_label.size[0]) / 2)
             line_2_x_offset = int((32 - self.line_2_label.size[0]) / 2)
@@ -200,8 +206,11 @@ class AdventApp(DisplayManagedApp):
         self.last_hours_until_christmas = self.hours_until_christmas
         self.last_minutes_until_christmas = self.minutes_until_christmas
 
-        # determine Christmas light pattern and colors
-        hour_of_day = datetime.now().hour
+    def update_lights(self, hour_of_day: int):
+        """
+        Set up the Christmas light pattern and colors for the hour
+        :param hour_of_day: The hour of the day, 0-23
+        """
         if hour_of_day != self.last_hour:
             self.last_hour = hour_of_day
             self.stage.clear_animations_for_all(self.lights_list)
@@ -321,6 +330,7 @@ class AdventApp(DisplayManagedApp):
     @staticmethod
     def get_app_instance():
         resource_path = os.path.dirname(__file__)
+        asset_registry.load_bundle(resource_path)
         font_path = os.path.join(resource_path, "fonts")
         images_path = os.path.join(resource_path, "images")
         return AdventApp(font_path=font_path, image_path=images_path)
@@ -36,7 +36,7 @@ async def run_app_with_timeout(app, timeout=600):
 
     try:
         log.debug(f"Preparing app to run for {timeout} seconds")
-        app.prepare()
+        app_runner.prepare_app(app)
 
         log.debug("Creating app runner task")
         app_runner_task = asyncio.create_task(app.run())
@@ -208,7 +208,11 @@ if __name__ == "__main__":
     log.info("Setting up app runner and initializing LED matrix")
     app_runner.app_setup()
     for app in apps:
-        app.set_matrix(matrix=app_runner.matrix, options=app_runner.matrix_options)
+        app.set_matrix(
+            matrix=app_runner.matrix,
+            options=app_runner.matrix_options,
+            sinks=app_runner.frame_sinks,
+        )
     log.info("Beginning app execution")
     run_apps_in_cycle(apps, cycle_timeout=5)
     # run_apps_in_subprocess_cycle(["advent_app.py", "world_clock.py"], cycle_timeout=5)
@@ -36,7 +36,8 @@ from lmae import app_runner
 from lmae.actor import StillImage, Text
 from lmae.animation import Hide, HueFade, Parallel, Sequence, Show, Still, StraightMove
 from lmae.app import DisplayManagedApp
-from lmae.core import Stage
+from lmae.assets import asset_registry
+from lmae.core import ActorMethod, AnimationTemplate, Stage, TemplateParameter
 
 # ---------------------------------------------------------------------------
 # C-fidelity helpers
@@ -622,9 +623,24 @@ class SatoriApp(DisplayManagedApp):
         # Palette-name overlay Text actor — created once in prepare()
         self._palette_label: Text | None = None
 
+        # Palette-name overlay animations — defined once, instantiated per overlay
+        self._overlay_scroll_template = self._build_overlay_template(
+            [
+                AnimationTemplate(Still, duration=TemplateParameter("pause")),
+                AnimationTemplate(
+                    StraightMove,
+                    distance=TemplateParameter("scroll_distance"),
+                    duration=TemplateParameter("scroll_time"),
+                ),
+                AnimationTemplate(Still, duration=TemplateParameter("pause")),
+            ]
+        )
+        self._overlay_hold_template = self._build_overlay_template(
+            [AnimationTemplate(Still, duration=self._OVERLAY_HOLD)]
+        )
+
         # Timing (reset in prepare)
         self._run_start: float = 0.0
-        self._last_gen: float = 0.0
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -638,16 +654,17 @@ class SatoriApp(DisplayManagedApp):
         timing clock is reset.
         """
         # Create the stage with the correct canvas size (DisplayManagedApp
-        # defaults to 64x32; we honor the constructor's width/height).
+        # defaults to 64x32; we honor the constructor's width/height). It is
+        # created before calling the base class, which then only blanks it.
         if not self.stage:
             self.stage = Stage(
                 name=f"{self.__class__.__name__}-Stage",
                 size=(self._width, self._height),
                 matrix=self.matrix,
                 matrix_options=self.matrix_options,
+                sinks=self.frame_sinks,
             )
-        else:
-            self.stage.blank_canvas()
+        super().prepare()
 
         # Create the pattern actor once
         if self._pattern is None:
@@ -672,7 +689,7 @@ class SatoriApp(DisplayManagedApp):
             font_path = os.path.join(
                 self._resource_path, "fonts/teeny-tiny-pixls-font/TeenyTinyPixls-o2zo.ttf"
             )
-            font: ImageFont.ImageFont = cast(ImageFont.ImageFont, ImageFont.truetype(font_path, 5))
+            font: ImageFont.ImageFont = cast(ImageFont.ImageFont, self.load_font(font_path, 5))
             self._palette_label = Text(
                 font=font,
                 name="PaletteNameOverlay",
@@ -689,9 +706,15 @@ class SatoriApp(DisplayManagedApp):
 
         # Reset the timing clock
         self._run_start = time.perf_counter()
-        self._last_gen = self._run_start
         # Force brightness re-application on (re-)start
         self._current_brightness = -1
+        self._apply_brightness()
+
+        # Wake up for brightness changes on the minute, and for regeneration
+        if self._fixed_brightness == 0:
+            self.call_on("minute", self._apply_brightness)
+        if self._do_regenerate:
+            self.call_every(self.refresh_time, self._regenerate)
 
     def _compute_brightness(self) -> int:
         """Return the target matrix brightness (1-100).
@@ -735,77 +758,92 @@ class SatoriApp(DisplayManagedApp):
     _OVERLAY_HOLD: float = 8.0
     _OVERLAY_FADE_OUT: float = 1.0
 
-    def _show_palette_overlay(self, palette_name: str) -> None:
-        """Build and start the palette-name overlay animation sequence.
+    @classmethod
+    def _build_overlay_template(cls, hold: list[AnimationTemplate]) -> AnimationTemplate:
+        """Define the palette-name overlay animation sequence.
 
-        Creates a one-shot Sequence: Show -> Parallel(fade-in) -> hold/scroll
-        -> Parallel(fade-out) -> Hide.
+        Show -> Parallel(fade-in) -> hold -> Parallel(fade-out) -> Hide.
 
         Each Parallel runs two HueFade animations concurrently: one for text
-        color alpha and one for stroke color alpha. This eliminates the need
-        for a callback wrapper — ``label.set_color`` and
-        ``label.set_stroke_color`` are passed directly as callbacks.
+        color alpha and one for stroke color alpha, with ``label.set_color``
+        and ``label.set_stroke_color`` bound as callbacks when instantiated.
         """
-        label = self._palette_label
-        stage = self.stage
-        if label is None or stage is None:
-            return
-
-        # Clear any previous overlay animations for this actor
-        stage.clear_animations_for(label)
-
-        # Set text (triggers prerender, updates size)
-        label.set_text(palette_name)
-        label.set_color((224, 224, 224, 0))
-        label.set_stroke_color((0, 0, 0, 0))
-
-        text_width = label.size[0]
-        text_height = label.size[1]
-        y = self._height - text_height  # bottom-aligned
-
         # HueFade with RGBA: fades both color and alpha.
         # Fade-in: start invisible (alpha=0), end visible (alpha=255/220)
         # Fade-out: start visible, end invisible
         text_alpha_target = math.floor(255 * 0.8)
         shadow_alpha_target = math.floor(255 * 0.8 * 0.8)
-        fade_in = Parallel(
-            actor=label,
+        fade_in = AnimationTemplate(
+            Parallel,
             animations=[
-                HueFade(
-                    actor=label,
-                    callback=label.set_color,
+                AnimationTemplate(
+                    HueFade,
+                    callback=ActorMethod("set_color"),
                     initial_color=(224, 224, 224, 0),
                     final_color=(224, 224, 224, text_alpha_target),
-                    duration=self._OVERLAY_FADE_IN,
+                    duration=cls._OVERLAY_FADE_IN,
                 ),
-                HueFade(
-                    actor=label,
-                    callback=label.set_stroke_color,
+                AnimationTemplate(
+                    HueFade,
+                    callback=ActorMethod("set_stroke_color"),
                     initial_color=(0, 0, 0, 0),
                     final_color=(0, 0, 0, shadow_alpha_target),
-                    duration=self._OVERLAY_FADE_IN,
+                    duration=cls._OVERLAY_FADE_IN,
                 ),
             ],
         )
-        fade_out = Parallel(
-            actor=label,
+        fade_out = AnimationTemplate(
+            Parallel,
             animations=[
-                HueFade(
-                    actor=label,
-                    callback=label.set_color,
+                AnimationTemplate(
+                    HueFade,
+                    callback=ActorMethod("set_color"),
                     initial_color=(224, 224, 224, text_alpha_target),
                     final_color=(224, 224, 224, 0),
-                    duration=self._OVERLAY_FADE_OUT,
+                    duration=cls._OVERLAY_FADE_OUT,
                 ),
-                HueFade(
-                    actor=label,
-                    callback=label.set_stroke_color,
+                AnimationTemplate(
+                    HueFade,
+                    callback=ActorMethod("set_stroke_color"),
                     initial_color=(0, 0, 0, shadow_alpha_target),
                     final_color=(0, 0, 0, 0),
-                    duration=self._OVERLAY_FADE_OUT,
+                    duration=cls._OVERLAY_FADE_OUT,
                 ),
             ],
         )
+        return AnimationTemplate(
+            Sequence,
+            animations=[
+                AnimationTemplate(Show),
+                fade_in,
+                *hold,
+                fade_out,
+                AnimationTemplate(Hide),
+            ],
+        )
+
+    def _show_palette_overlay(self, palette_name: str) -> None:
+        """Start the palette-name overlay animation sequence.
+
+        Instantiates the one-shot overlay sequence from its template: scrolling
+        when the name is wider than the display, centered otherwise.
+        """
+        label = self._palette_label
+        stage = self.stage
+        if label is None or stage is None:
+            return
+
+        # Clear any previous overlay animations for this actor
+        stage.clear_animations_for(label)
+
+        # Set text (triggers prerender, updates size)
+        label.set_text(palette_name)
+        label.set_color((224, 224, 224, 0))
+        label.set_stroke_color((0, 0, 0, 0))
+
+        text_width = label.size[0]
+        text_height = label.size[1]
+        y = self._height - text_height  # bottom-aligned
 
         if text_width > self._width:
             # Scroll: pause, scroll left, pause — mirrors weather app pattern
@@ -813,52 +851,43 @@ class SatoriApp(DisplayManagedApp):
             pause = 1.0
             scroll_time = self._OVERLAY_HOLD - 2.0 * pause  # 6s with defaults
             label.set_position((0, y))
-            hold_animations = [
-                Still(actor=label, duration=pause),
-                StraightMove(actor=label, distance=(-scroll_dist, 0), duration=scroll_time),
-                Still(actor=label, duration=pause),
-            ]
+            sequence = self._overlay_scroll_template.instantiate(
+                label, pause=pause, scroll_distance=(-scroll_dist, 0), scroll_time=scroll_time
+            )
         else:
             # Center and hold
             label.set_position(((self._width - text_width) // 2, y))
-            hold_animations = [Still(actor=label, duration=self._OVERLAY_HOLD)]
-
-        sequence = Sequence(
-            actor=label,
-            animations=[
-                Show(actor=label),
-                fade_in,
-                *hold_animations,
-                fade_out,
-                Hide(actor=label),
-            ],
-        )
+            sequence = self._overlay_hold_template.instantiate(label)
         stage.add_animation(sequence)
 
     def update_view(self, elapsed_time: float) -> None:
-        """Advance palette cycling and optionally regenerate.
+        """Advance palette cycling.
 
         Called every frame by DisplayManagedApp.run(). Uses perf_counter for
         a monotonic clock independent of the framework's elapsed_time (which
-        resets each refresh cycle).
+        resets each refresh cycle). Regeneration and brightness are handled
+        by scheduled calls set up in prepare().
         """
-        now = time.perf_counter()
-        total_elapsed = now - self._run_start
-
-        # Regenerate periodically if enabled
-        pattern = cast(SatoriPattern, self._pattern)
-        if self._do_regenerate and (now - self._last_gen) >= self.refresh_time:
-            pattern.regenerate()
-            self._show_palette_overlay(pattern.palette_name)
-            self._last_gen = now
-            self.logger.debug("Regenerated satori drawing")
+        total_elapsed = time.perf_counter() - self._run_start
 
         # Advance the palette offset and refresh the RGBA buffer in place
+        pattern = cast(SatoriPattern, self._pattern)
         offset = int(total_elapsed * self._palette_speed) % 256
         pattern.update_frame(offset)
 
-        # Apply brightness (wall-clock dimming or fixed override).
-        # Only writes to the matrix when the value actually changes.
+    def _regenerate(self) -> None:
+        """Generate a new drawing. Called every ``refresh_time`` seconds if enabled."""
+        pattern = cast(SatoriPattern, self._pattern)
+        pattern.regenerate()
+        self._show_palette_overlay(pattern.palette_name)
+        self.logger.debug("Regenerated satori drawing")
+
+    def _apply_brightness(self) -> None:
+        """Apply brightness (wall-clock dimming or fixed override).
+
+        Called on every minute boundary. Only writes to the matrix when the
+        value actually changes.
+        """
         target = self._compute_brightness()
         if target != self._current_brightness:
             if self.stage and self.stage.matrix:
@@ -886,7 +915,8 @@ class SatoriApp(DisplayManagedApp):
         Keyword arguments are forwarded to the SatoriApp constructor.
         """
         resource_path = os.path.dirname(__file__)
-        return SatoriApp(resource_path=resource_path, **kwargs) # type: ignore
+        asset_registry.load_bundle(resource_path)
+        return SatoriApp(resource_path=resource_path, **kwargs)  # type: ignore
 
 
 # ---------------------------------------------------------------------------
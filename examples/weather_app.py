@@ -1,12 +1,10 @@
 import asyncio
-import json
 import os.path
 import time
 from datetime import datetime
 from typing import cast
 
-from PIL import Image, ImageEnhance, ImageFilter, ImageFont
-from PIL.Image import Image as PILImage
+from PIL import Image, ImageEnhance, ImageFilter
 from PIL.ImageFont import ImageFont as PILImageFont
 
 from examples.openweather.openweather_client import (
@@ -16,8 +14,9 @@ from lmae import app_runner
 from lmae.actor import Line, SpriteImage, StillImage, Text
 from lmae.animation import Easing, Sequence, Still, StraightMove
 from lmae.app import DisplayManagedApp
+from lmae.assets import asset_registry
 from lmae.component import Carousel
-from lmae.core import Actor, Stage
+from lmae.core import Actor, AnimationTemplate, Stage, TemplateParameter
 
 
 class WeatherApp(DisplayManagedApp):
@@ -51,12 +50,12 @@ class WeatherApp(DisplayManagedApp):
         self.call_status = "ok"
         self.primary_text_font = cast(
             PILImageFont,
-            ImageFont.truetype(os.path.join(resource_path, "fonts/Roboto/Roboto-Light.ttf"), 15),
+            self.load_font(os.path.join(resource_path, "fonts/Roboto/Roboto-Light.ttf"), 15),
         )
         self.temperature_label: Text | None = None
         self.secondary_text_font = cast(
             PILImageFont,
-            ImageFont.truetype(
+            self.load_font(
                 os.path.join(resource_path, "fonts/teeny-tiny-pixls-font/TeenyTinyPixls-o2zo.ttf"),
                 5,
             ),
@@ -87,6 +86,33 @@ class WeatherApp(DisplayManagedApp):
         self.combined_long_desc: str = None  # type: ignore
         self.condition_description_label_position: tuple[int, int] = None  # type: ignore
         self.need_to_update_condition_desc_animation: bool = True
+        self.condition_scroll_template = AnimationTemplate(
+            Sequence,
+            name="Condition-scroll-sequence",
+            repeat=True,
+            animations=[
+                AnimationTemplate(
+                    Still, name="Condition-pause-1", duration=TemplateParameter("pause_duration")
+                ),
+                AnimationTemplate(
+                    StraightMove,
+                    name="Condition-scroll-left",
+                    duration=TemplateParameter("scroll_duration"),
+                    distance=TemplateParameter("scroll_left_distance"),
+                    easing=Easing.LINEAR,
+                ),
+                AnimationTemplate(
+                    Still, name="Condition-pause-2", duration=TemplateParameter("pause_duration")
+                ),
+                AnimationTemplate(
+                    StraightMove,
+                    name="Condition-scroll-right",
+                    duration=TemplateParameter("scroll_duration"),
+                    distance=TemplateParameter("scroll_right_distance"),
+                    easing=Easing.LINEAR,
+                ),
+            ],
+        )
         self.moon_phase_num: float = None  # type: ignore
         self.is_daytime: bool = None  # type: ignore
         self.moonrise: int = None  # type: ignore
@@ -103,21 +129,7 @@ class WeatherApp(DisplayManagedApp):
         self.logger.info(f"Refreshing weather data every {self.refresh_time} seconds")
         self.old_brightness: int = None  # type: ignore
 
-        self.blue_sky_image = Image.open(
-            os.path.join(resource_path, "images/backgrounds/blue_sky.png")
-        ).convert("RGBA")
-        self.cloudy_image = Image.open(
-            os.path.join(resource_path, "images/backgrounds/cloudy.png")
-        ).convert("RGBA")
-        self.dark_clouds_image = Image.open(
-            os.path.join(resource_path, "images/backgrounds/dark_clouds.png")
-        ).convert("RGBA")
-        self.night_sky_image = Image.open(
-            os.path.join(resource_path, "images/backgrounds/night_sky.png")
-        ).convert("RGBA")
-        self.sunrise_sunset_image = Image.open(
-            os.path.join(resource_path, "images/backgrounds/sunrise_sunset.png")
-        ).convert("RGBA")
+        # backgrounds are loaded when shown, through the shared asset registry
         self.bg_image_name = None
 
         # moved actor setup from prepare() since it can really just be done once
@@ -213,32 +225,28 @@ class WeatherApp(DisplayManagedApp):
         )
 
         # conditions image actor
-        sprite_sheet: PILImage = Image.open(
-            os.path.join(self.resource_path, "images/weather-sprites.png")
-        ).convert("RGBA")
-        with open(os.path.join(self.resource_path, "images/weather-sprites.json")) as spec_file:
-            sprite_spec = json.load(spec_file)
+        sprite_sheet = self.load_sprite_sheet(
+            os.path.join(self.resource_path, "images/weather-sprites.png"),
+            os.path.join(self.resource_path, "images/weather-sprites.json"),
+        )
         self.main_daytime_image = SpriteImage(
             name="main-daytime-condition",
             position=(39, 10),
             sheet=sprite_sheet,
-            spec=sprite_spec,
         )
         self.support_daytime_image_1 = SpriteImage(
             name="support-daytime-condition-1",
             position=(39, 10),
             sheet=sprite_sheet,
-            spec=sprite_spec,
         )
         self.support_daytime_image_2 = SpriteImage(
             name="support-daytime-condition-2",
             position=(39, 10),
             sheet=sprite_sheet,
-            spec=sprite_spec,
         )
 
         # set up outline shadow for these sprites
-        sprite_grayscale = sprite_sheet.copy().convert("L")
+        sprite_grayscale = sprite_sheet.image.convert("L")
 
         # Detect edges
         edges = sprite_grayscale.filter(ImageFilter.FIND_EDGES)
@@ -258,14 +266,11 @@ class WeatherApp(DisplayManagedApp):
         self.daytime_image_shadow = SpriteImage(
             name="daytime-condition-shadow",
             position=self.main_daytime_image.position,
-            sheet=shadow_image,
-            spec=sprite_spec,
+            sheet=sprite_sheet.with_image(shadow_image),
         )
 
         # moon phase actor
-        self.moon_phase_image = SpriteImage(
-            name="moon-phase", position=(39, 7), sheet=sprite_sheet, spec=sprite_spec
-        )
+        self.moon_phase_image = SpriteImage(name="moon-phase", position=(39, 7), sheet=sprite_sheet)
 
         # timer actor
         self.timer_line = Line(
@@ -393,6 +398,16 @@ class WeatherApp(DisplayManagedApp):
             timestamp = float(timestamp)
         return time.strftime(timestamp_format, time.localtime(timestamp))
 
+    def set_background(self, name: str) -> None:
+        """
+        Show a background image
+        :param name: The name of the background image file, without extension
+        """
+        self.bg_image_name = name
+        self.background_image.set_from_image(
+            self.load_image(os.path.join(self.resource_path, f"images/backgrounds/{name}.png"))
+        )
+
     def update_view(self, elapsed_time: float):
         time_since_last_update = (
             time.time() - self.last_weather_data_at
@@ -426,41 +441,13 @@ class WeatherApp(DisplayManagedApp):
                     f"scroll distance: {scroll_distance}"
                 )
 
-                pause_1 = Still(
-                    name="Condition-pause-1",
-                    actor=self.condition_description_label,
-                    duration=pause_duration,
-                )
-
-                scroll_left = StraightMove(
-                    name="Condition-scroll-left",
-                    actor=self.condition_description_label,
-                    duration=scroll_duration,
-                    distance=(-scroll_distance, 0),
-                    easing=Easing.LINEAR,
-                )
-
-                pause_2 = Still(
-                    name="Condition-pause-2",
-                    actor=self.condition_description_label,
-                    duration=pause_duration,
-                )
-
-                scroll_right = StraightMove(
-                    name="Condition-scroll-right",
-                    actor=self.condition_description_label,
-                    duration=scroll_duration,
-                    distance=(scroll_distance, 0),
-                    easing=Easing.LINEAR,
-                )
-
-                condition_sequence = Sequence(
-                    name="Condition-scroll-sequence",
-                    actor=self.condition_description_label,
-                    animations=[pause_1, scroll_left, pause_2, scroll_right],
-                    repeat=True,
+                condition_sequence = self.condition_scroll_template.instantiate(
+                    self.condition_description_label,
+                    pause_duration=pause_duration,
+                    scroll_duration=scroll_duration,
+                    scroll_left_distance=(-scroll_distance, 0),
+                    scroll_right_distance=(scroll_distance, 0),
                 )
-
                 self.stage.add_animation(condition_sequence)
             else:
                 self.logger.debug(
@@ -640,6 +627,8 @@ class WeatherApp(DisplayManagedApp):
 
         # set background based on condition
         # OW interpretation
+        last_background_image_name = self.bg_image_name
+        self.bg_image_name = "none"
         self.background_image.set_from_image(None)
         if self.is_daytime:
             if (
@@ -649,24 +638,24 @@ class WeatherApp(DisplayManagedApp):
                 or 500 <= self.condition_code <= 599
                 or 500 <= self.condition_code <= 599
             ):
-                self.background_image.set_from_image(self.cloudy_image)
+                self.set_background("cloudy")
             elif 700 <= self.condition_code <= 799:
                 # smoke, haze, dist
                 if self.condition_code in [711, 721, 731, 761]:
                     if is_sunrise or is_sunset:
-                        self.background_image.set_from_image(self.sunrise_sunset_image)
+                        self.set_background("sunrise_sunset")
                     else:
-                        self.background_image.set_from_image(self.blue_sky_image)
+                        self.set_background("blue_sky")
                 # mist, fog, sand, ash, squall, tornado!
                 else:
-                    self.background_image.set_from_image(self.cloudy_image)
+                    self.set_background("cloudy")
             elif 800 <= self.condition_code <= 803:
                 if is_sunrise or is_sunset:
-                    self.background_image.set_from_image(self.sunrise_sunset_image)
+                    self.set_background("sunrise_sunset")
                 else:
-                    self.background_image.set_from_image(self.blue_sky_image)
+                    self.set_background("blue_sky")
             elif 804 <= self.condition_code <= 899:
-                self.background_image.set_from_image(self.cloudy_image)
+                self.set_background("cloudy")
         else:
             if (
                 200 <= self.condition_code <= 299
@@ -675,44 +664,27 @@ class WeatherApp(DisplayManagedApp):
                 or 500 <= self.condition_code <= 599
                 or 500 <= self.condition_code <= 599
             ):
-                self.background_image.set_from_image(self.dark_clouds_image)
+                self.set_background("dark_clouds")
             elif 700 <= self.condition_code <= 799:
                 # smoke, haze, dust
                 if self.condition_code in [711, 721, 731, 761]:
                     if is_sunrise or is_sunset:
-                        self.background_image.set_from_image(self.sunrise_sunset_image)
+                        self.set_background("sunrise_sunset")
                     else:
-                        self.background_image.set_from_image(self.night_sky_image)
+                        self.set_background("night_sky")
                 # mist, fog, sand, ash, squall, tornado!
                 else:
-                    self.background_image.set_from_image(self.dark_clouds_image)
+                    self.set_background("dark_clouds")
             elif 800 <= self.condition_code <= 803:
                 if is_sunrise or is_sunset:
-                    self.background_image.set_from_image(self.sunrise_sunset_image)
+                    self.set_background("sunrise_sunset")
                 else:
-                    self.background_image.set_from_image(self.night_sky_image)
+                    self.set_background("night_sky")
             elif 804 <= self.condition_code <= 899:
-                self.background_image.set_from_image(self.dark_clouds_image)
+                self.set_background("dark_clouds")
         if self.background_image.image is None:
             self.logger.warning(f"Unrecognized condition code: {self.condition_code}")
 
-        last_background_image_name = self.bg_image_name
-        if self.background_image:
-            if self.background_image.image == self.cloudy_image:
-                self.bg_image_name = "cloudy"
-            elif self.background_image.image == self.dark_clouds_image:
-                self.bg_image_name = "dark_clouds"
-            elif self.background_image.image == self.sunrise_sunset_image:
-                self.bg_image_name = "sunrise_sunset"
-            elif self.background_image.image == self.blue_sky_image:
-                self.bg_image_name = "blue_sky"
-            elif self.background_image.image == self.night_sky_image:
-                self.bg_image_name = "night_sky"
-            else:
-                self.bg_image_name = "none"
-        else:
-            self.bg_image_name = "none"
-
         if last_background_image_name != self.bg_image_name:
             self.logger.debug(f"Setting background image to {self.bg_image_name}")
 
@@ -764,6 +736,7 @@ class WeatherApp(DisplayManagedApp):
         )  # default to 15 minutes
 
         resource_path = os.path.dirname(__file__)
+        asset_registry.load_bundle(resource_path)
         return WeatherApp(
             api_key=env_api_key,
             latitude=env_latitude,
@@ -2,11 +2,12 @@ import os.path
 from datetime import UTC, datetime
 from math import asin, atan2, cos, degrees, floor, isclose, pi, radians, sin, sqrt
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 from lmae import app_runner
 from lmae.actor import StillImage
 from lmae.app import DisplayManagedApp
+from lmae.assets import asset_registry
 
 
 def normalize_radians(rads):
@@ -244,14 +245,15 @@ class WorldClock(DisplayManagedApp):
         self.actors = list()
         self.pre_render_callback = None
         self.refresh_time = refresh_time
-        self.big_font = ImageFont.truetype(
+        self.big_font = self.load_font(
             os.path.join(resource_path, "fonts/Roboto/Roboto-Light.ttf"), 15
         )
-        self.daytime_map_image = Image.open(
-            os.path.join(resource_path, "images/visible-earth/world-topo-bathy.png")
+        # the maps are loaded when the view is updated, through the shared asset registry
+        self.daytime_map_path = os.path.join(
+            resource_path, "images/visible-earth/world-topo-bathy.png"
         )
-        self.nighttime_map_image = Image.open(
-            os.path.join(resource_path, "images/visible-earth/black-marble.png")
+        self.nighttime_map_path = os.path.join(
+            resource_path, "images/visible-earth/black-marble.png"
         )
         self.composite_map = StillImage(name="composite-map")
         self.current_datetime_utc: datetime = None
@@ -261,36 +263,37 @@ class WorldClock(DisplayManagedApp):
         super().prepare()
         if self.composite_map not in self.stage.actors:
             self.stage.actors.append(self.composite_map)
+        self.update_map()
+        self.call_on("hour", self.update_map, tz=UTC)
 
-    def time_to_update(self):
+    def update_map(self):
+        self.logger.debug("Updating view")
         self.current_datetime_utc = datetime.now(UTC)
-        return not self.last_view_update_datetime_utc or (
-            self.current_datetime_utc - self.last_view_update_datetime_utc
-        ).total_seconds() > (60 * 60)
 
-    def update_view(self, elapsed_time: float):
-        # see if we need to update the map
-        if self.time_to_update():
-            self.logger.debug("Updating view")
+        current_timetuple = self.current_datetime_utc.timetuple()
+        day_of_year = current_timetuple[7]
+        self.logger.debug(f"Day of year: {day_of_year}")
 
-            current_timetuple = self.current_datetime_utc.timetuple()
-            day_of_year = current_timetuple[7]
-            self.logger.debug(f"Day of year: {day_of_year}")
+        declination = compute_sun_declination(day_of_year)
+        self.logger.debug(f"Declination of sun: {declination:.3f}")
 
-            declination = compute_sun_declination(day_of_year)
-            self.logger.debug(f"Declination of sun: {declination:.3f}")
+        hour_of_day = current_timetuple[3]
+        self.logger.debug(f"UTC hour of day: {hour_of_day}")
 
-            hour_of_day = current_timetuple[3]
-            self.logger.debug(f"UTC hour of day: {hour_of_day}")
+        day_night_mask_image = draw_day_night_mask(declination, hour_of_day)
+        # composite_image = Image.new("RGBA", (64, 32), _BLACK)
+        composite_image = Image.composite(
+            self.load_image(self.daytime_map_path),
+            self.load_image(self.nighttime_map_path),
+            day_night_mask_image,
+        )
+        self.composite_map.set_from_image(composite_image)
 
-            day_night_mask_image = draw_day_night_mask(declination, hour_of_day)
-            # composite_image = Image.new("RGBA", (64, 32), _BLACK)
-            composite_image = Image.composite(
-                self.daytime_map_image, self.nighttime_map_image, day_night_mask_image
-            )
-            self.composite_map.set_from_image(composite_image)
+        self.last_view_update_datetime_utc = self.current_datetime_utc
 
-            self.last_view_update_datetime_utc = self.current_datetime_utc
+    def update_view(self, elapsed_time: float):
+        # the map is updated on the hour by a scheduled call
+        pass
 
     def stop(self):
         super().stop()
@@ -298,7 +301,9 @@ class WorldClock(DisplayManagedApp):
 
     @staticmethod
     def get_app_instance():
-        return WorldClock(resource_path=os.path.dirname(__file__))
+        resource_path = os.path.dirname(__file__)
+        asset_registry.load_bundle(resource_path)
+        return WorldClock(resource_path=resource_path)
 
 
 if __name__ == "__main__":
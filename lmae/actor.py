@@ -1,21 +1,36 @@
 from __future__ import annotations
 
-import json
 import logging
+from array import array
+from collections.abc import Iterable, Sequence
 from typing import cast
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, ImageMath
 from PIL.Image import Image as PILImage
 from PIL.ImageFont import ImageFont as PILImageFont
 from pilmoji import Pilmoji
-from pilmoji.source import EmojiCDNSource, MicrosoftEmojiSource
-
-from lmae.core import Actor, Canvas, CompositeActor, _get_sequential_name, logger
+from pilmoji.helpers import getsize as pilmoji_getsize
+from pilmoji.source import BaseSource, MicrosoftEmojiSource
+
+from lmae.core import Actor, Canvas, CompositeActor, _get_sequential_name
+from lmae.emoji_source import (
+    AtlasEmojiSource,
+    CachedEmojiSource,
+    EmojiAtlas,
+    find_emoji,
+    get_cached_emoji_source,
+)
+from lmae.glyphs import GlyphAtlas, TextLayout, check_layout_options, get_glyph_atlas
+from lmae.sprite_sheet import SpriteSheet
 
 # RGB or RGBA color tuple
 Color = tuple[int, int, int] | tuple[int, int, int, int]
 
 
+def _rgba(color: Color) -> tuple[int, int, int, int]:
+    return (color[0], color[1], color[2], color[3] if len(color) > 3 else 255)
+
+
 class StillImage(Actor):
     """
     An unchanging image that can position itself on a stage
@@ -66,7 +81,7 @@ class SpriteImage(Actor):
         self,
         name: str | None = None,
         position: tuple[int, int] = (0, 0),
-        sheet: PILImage | None = None,
+        sheet: SpriteSheet | PILImage | None = None,
         spec: dict | None = None,
         selected: str | None = None,
     ):
@@ -74,63 +89,73 @@ class SpriteImage(Actor):
         Initialize a sprite image actor
         :param name: The name of this actor
         :param position: The initial position of this sprite on the stage
-        :param sheet: The sprite sheet image
-        :param spec: The sprite specification: a dict of objects with position and size info
+        :param sheet: The sprite sheet, which may be shared with other sprite images,
+            or a sprite sheet image to use with `spec`
+        :param spec: The sprite specification, if `sheet` is an image:
+            a dict of objects with position and size info
         :param selected: Which sprite to display first, by name in the spec
         """
-        if spec is None:
-            spec = {}
         name = name or _get_sequential_name("SpriteImage")
         super().__init__(name=name, position=position)
-        self.sheet = sheet
-        self.spec = spec
-        self.selected = None
+        if isinstance(sheet, PILImage):
+            sheet = SpriteSheet(sheet, spec or {})
+        self.sheet: SpriteSheet | None = sheet
+        self.selected: str | None = None
+        self.sprite_image: PILImage | None = None
         self.size = (0, 0)
         if selected:
             self.set_sprite(selected)
 
+    @property
+    def spec(self) -> dict:
+        """
+        The sprite specification of the sheet: a dict of objects with position and size info
+        """
+        return self.sheet.spec if self.sheet else {}
+
     def set_sprite(self, selected: str) -> None:
         if selected != self.selected:
             self.changes_since_last_render = True
         self.selected = selected
-        if self.sheet and self.selected and self.selected in self.spec:
-            self.size = tuple(int(i) for i in self.spec[self.selected]["size"])
+        self._select_sprite()
+
+    def _select_sprite(self) -> None:
+        if self.sheet and self.selected in self.sheet:
+            self.sprite_image = self.sheet.crop(self.selected)
+            self.size = self.sprite_image.size
         else:
+            self.sprite_image = None
             self.size = (0, 0)
 
-    def set_from_file(self, image_filename: str, spec_filename: str) -> None:
-        logger.debug(f"Loading sprite sheet image from {image_filename}")
-        self.sheet = Image.open(image_filename).convert("RGBA")
+    def set_sheet(self, sheet: SpriteSheet) -> None:
+        """
+        Draw sprites from another sprite sheet, keeping the selected sprite name.
 
-        logger.debug(f"Loading spec file from {spec_filename}")
-        with open(spec_filename) as spec_file:
-            self.spec = json.load(spec_file)
+        :param sheet: The sprite sheet
+        """
+        self.sheet = sheet
+        self._select_sprite()
+        self.changes_since_last_render = True
+
+    def set_from_file(self, image_filename: str, spec_filename: str) -> None:
+        self.set_sheet(SpriteSheet.from_files(image_filename, spec_filename))
 
     def render(self, canvas: Canvas) -> None:
-        if self.sheet and self.selected in self.spec:
-            entry = self.spec[self.selected]
-            sheet_position = tuple(int(i) for i in entry["position"])
-            size = tuple(int(i) for i in entry["size"])
-            bounds = (
-                sheet_position[0],
-                sheet_position[1],
-                sheet_position[0] + size[0],
-                sheet_position[1] + size[1],
-            )
-            canvas.image.alpha_composite(self.sheet, dest=self.position, source=bounds)
+        if self.sprite_image:
+            canvas.image.alpha_composite(self.sprite_image, dest=self.position)
         self.changes_since_last_render = False
 
 
 class MultiFrameImage(Actor):
     def __init__(
         self,
-        images: list[PILImage],
+        images: Sequence[PILImage],
         name: str | None = None,
         position: tuple[int, int] = (0, 0),
     ):
         name = name or _get_sequential_name("MultiFrameImage")
         super().__init__(name=name, position=position)
-        self.images: list[PILImage] = images
+        self.images: Sequence[PILImage] = images
         self.current_frame: int = 0
 
     def set_frame(self, frame_number: int) -> None:
@@ -153,7 +178,10 @@ class MultiFrameImage(Actor):
 
 class Text(Actor):
     """
-    Text that renders on a stage
+    Text that renders on a stage.
+
+    Setting the text only measures it; the text is rasterized when it is next rendered,
+    and only if it is visible on the canvas.
     """
 
     def __init__(
@@ -165,107 +193,225 @@ class Text(Actor):
         color: Color = (255, 255, 255, 255),
         stroke_color: Color = (0, 0, 0, 255),
         stroke_width: int = 0,
+        anchor: str = "la",
+        align: str = "left",
+        wrap_width: int | None = None,
     ):
+        """
+        Create a text actor
+
+        :param font: The font to render the text in
+        :param name: The name of the actor
+        :param position: Where the anchor point of the text goes
+        :param text: The text
+        :param color: The fill color of the text
+        :param stroke_color: The color of the stroke around the text
+        :param stroke_width: The width of the stroke around the text
+        :param anchor: Which point of the text goes at the position, as a two-letter anchor:
+            "l", "m", or "r" for left, middle, or right, then "a", "m", "s", or "d" for the
+            ascender line, middle, baseline, or descender line. The default, "la", puts the
+            start of the first line's ascender line at the position.
+        :param align: How to align lines of multi-line text: "left", "center", or "right"
+        :param wrap_width: If given, the width in pixels to wrap the text to
+        """
         name = name or _get_sequential_name("Text")
         super().__init__(name=name, position=position)
+        check_layout_options(anchor, align)
         self.font = font
         self.color = color
         self.stroke_color = stroke_color
         self.stroke_width = stroke_width
+        self.anchor = anchor
+        self.align = align
+        self.wrap_width = wrap_width
         self.logger = logging.getLogger(name)
         self.has_warned_about_image_mode = False
-        self.rendered_text: PILImage | None = None
+        self._rendered_text: PILImage | None = None
         self.prerender_size_image: PILImage | None = None
+        self.layout: TextLayout | None = None
+        # offset from the position to where the text starts, on its first ascender line
+        self.text_offset: tuple[int, int] = (0, 0)
+        # stroke and fill coverage masks for each line of text, so that recoloring doesn't
+        # need to lay out the text again. None when the font can't be drawn from a glyph atlas.
+        self.coverage: list[tuple[PILImage | None, PILImage]] | None = None
+        self.needs_rasterize = False
+        self.needs_paint = False
+        # whether the rendered text is only fully opaque or fully transparent, as pixel fonts
+        # are, which lets it be composited more cheaply
+        self.binary_alpha = False
         self.text: str | None = None
         if text:
             self.set_text(text)
 
+    @property
+    def rendered_text(self) -> PILImage | None:
+        """
+        The text rendered in its colors, rasterizing it first if it has changed
+        """
+        if self.needs_rasterize:
+            self._rasterize_text()
+        if self.needs_paint:
+            self._paint_text()
+        return self._rendered_text
+
     def set_color(self, color: Color) -> None:
         if self.color != color:
             self.color = color
-            self._prerender_text()
+            self.needs_paint = True
             self.changes_since_last_render = True
 
     def set_stroke_color(self, stroke_color: Color) -> None:
         if self.stroke_color != stroke_color:
             self.stroke_color = stroke_color
-            self._prerender_text()
+            self.needs_paint = True
             self.changes_since_last_render = True
 
-    def _prerender_text(self) -> None:
-        # measure size of text
-        if not self.prerender_size_image:
-            self.prerender_size_image = Image.new("RGBA", (1, 1), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(self.prerender_size_image)
+    def measure(self, text: str) -> tuple[int, int]:
+        """
+        Measure what size some text would be in this actor's font and layout, without
+        rendering it or changing this actor's text.
+
+        :param text: The text to measure
+        :return: the size the text would be, including the stroke
+        """
+        return self._measure(text)[0]
+
+    def _measure(self, text: str) -> tuple[tuple[int, int], TextLayout | None]:
+        atlas = get_glyph_atlas(self.font, self.stroke_width)
+        layout = None
+        if atlas:
+            layout = atlas.layout(text, self.align, self.wrap_width)
+            text_bbox = layout.bbox
         else:
+            if self.anchor != "la" or self.align != "left" or self.wrap_width is not None:
+                raise ValueError("Anchors, alignment, and wrapping need a FreeType font")
+            if not self.prerender_size_image:
+                self.prerender_size_image = Image.new("RGBA", (1, 1), (0, 0, 0, 0))
             draw = ImageDraw.Draw(self.prerender_size_image)
-            draw.rectangle((0, 0, self.size[0], self.size[1]), fill=(0, 0, 0, 0))
-
-        # assume font is TTF for now, because the doc for this function says that is required
-        text = self.text if self.text else ""
-        text_bbox = draw.textbbox(
-            xy=(0, 0), text=text, font=self.font, stroke_width=self.stroke_width
-        )
-        self.size = cast(tuple[int, int], text_bbox[2:4])
-
+            text_bbox = draw.textbbox(
+                xy=(0, 0), text=text, font=self.font, stroke_width=self.stroke_width
+            )
         # account for stroke width
-        self.size = (
-            self.size[0] + self.stroke_width * 2,
-            self.size[1] + self.stroke_width * 2,
-        )
+        size = (text_bbox[2] + self.stroke_width * 2, text_bbox[3] + self.stroke_width * 2)
+        return cast(tuple[int, int], size), layout
 
+    def _layout_text(self) -> None:
+        self.size, self.layout = self._measure(self.text if self.text else "")
+        if self.layout:
+            atlas = cast(GlyphAtlas, get_glyph_atlas(self.font, self.stroke_width))
+            self.text_offset = self.layout.anchor_offset(self.anchor, atlas.ascent)
+        self.needs_rasterize = True
+
+    def _rasterize_text(self) -> None:
         # render into the image we'll keep
         # if the old rendered text image wasn't big enough for what we're about to render, then
         # make a new rendered text image
         if (
-            not self.rendered_text
-            or self.size[0] > self.rendered_text.width
-            or self.size[1] > self.rendered_text.height
+            not self._rendered_text
+            or self.size[0] > self._rendered_text.width
+            or self.size[1] > self._rendered_text.height
         ):
-            self.rendered_text = Image.new("RGBA", self.size, (0, 0, 0, 0))
-            draw = ImageDraw.Draw(self.rendered_text)
+            self._rendered_text = Image.new("RGBA", self.size, (0, 0, 0, 0))
+
+        atlas = get_glyph_atlas(self.font, self.stroke_width)
+        if atlas and self.layout:
+            # lay out cached glyphs into coverage masks, line by line
+            self.coverage = []
+            for line, line_origin in zip(self.layout.lines, self.layout.line_origins, strict=True):
+                origin = (self.stroke_width + line_origin[0], self.stroke_width + line_origin[1])
+                stroke_mask = None
+                if self.stroke_width:
+                    stroke_mask = Image.new("L", self._rendered_text.size, 0)
+                    atlas.draw_line(stroke_mask, origin, line, stroked=True)
+                fill_mask = Image.new("L", self._rendered_text.size, 0)
+                atlas.draw_line(fill_mask, origin, line, stroked=False)
+                self.coverage.append((stroke_mask, fill_mask))
         else:
-            draw = ImageDraw.Draw(self.rendered_text)
-            draw.rectangle(
-                (0, 0, self.rendered_text.width, self.rendered_text.height),
-                fill=(0, 0, 0, 0),
-            )
+            self.coverage = None
+        self.needs_rasterize = False
+        self.needs_paint = True
 
-        draw.text(
-            (self.stroke_width, self.stroke_width),
-            self.text if self.text else "",
-            fill=self.color,
-            font=self.font,
-            stroke_fill=self.stroke_color,
-            stroke_width=self.stroke_width,
-        )
+    def _paint_text(self) -> None:
+        """
+        Paint the text's colors into the rendered text image, then check its alpha
+        """
+        self.needs_paint = False
+        if not self._rendered_text:
+            return
+        self._paint_coverage(self._rendered_text)
+        alpha_counts = self._rendered_text.getchannel("A").histogram()
+        self.binary_alpha = not any(alpha_counts[1:255])
+
+    def _paint_coverage(self, rendered_text: PILImage) -> None:
+        """
+        Paint the text's colors into the rendered text image, through its coverage masks
+        """
+        box = (0, 0, *rendered_text.size)
+        rendered_text.paste((0, 0, 0, 0), box)
+
+        if self.coverage is None:
+            ImageDraw.Draw(rendered_text).text(
+                (self.stroke_width, self.stroke_width),
+                self.text if self.text else "",
+                fill=self.color,
+                font=self.font,
+                stroke_fill=self.stroke_color,
+                stroke_width=self.stroke_width,
+            )
+            return
+
+        # like Pillow, paint each line's stroke then its fill, and skip the fill when it
+        # would be the same color as the stroke
+        color = _rgba(self.color)
+        stroke_color = _rgba(self.stroke_color)
+        for stroke_mask, fill_mask in self.coverage:
+            if stroke_mask:
+                rendered_text.paste(stroke_color, box, stroke_mask)
+                if color == stroke_color:
+                    continue
+            rendered_text.paste(color, box, fill_mask)
 
     def set_text(self, text: str) -> None:
         if text != self.text:
             self.text = text
-            self._prerender_text()
+            self._layout_text()
             self.changes_since_last_render = True
 
     def render(self, canvas: Canvas) -> None:
-        if self.text and self.rendered_text:
+        if self.text:
             render_pos = (
-                self.position[0] - self.stroke_width,
-                self.position[1] - self.stroke_width,
+                self.position[0] + self.text_offset[0] - self.stroke_width,
+                self.position[1] + self.text_offset[1] - self.stroke_width,
             )
-            canvas.image.alpha_composite(self.rendered_text, dest=render_pos)
+            # only rasterize text that would be seen
+            if (
+                render_pos[0] < canvas.size[0]
+                and render_pos[1] < canvas.size[1]
+                and render_pos[0] + self.size[0] > 0
+                and render_pos[1] + self.size[1] > 0
+            ):
+                rendered_text = self.rendered_text
+                if rendered_text:
+                    canvas.composite(rendered_text, render_pos, self.binary_alpha)
         self.changes_since_last_render = False
 
 
 class EmojiText(Actor):
     """
-    Text that could contain emoji and that renders on a stage
+    Text that could contain emoji and that renders on a stage.
+
+    Emoji images come from a local cache, so that rendering never waits on the network.
+    Emoji that aren't cached yet are fetched in the background, and the text is drawn
+    without them until they arrive. Use `prefetch()` to fetch the emoji for strings that
+    will be shown ahead of time, or supply an `EmojiAtlas` of emoji already scaled to the
+    size they are drawn at.
     """
 
     def __init__(
         self,
         text_font: PILImageFont,
         text: str,
-        emoji_source: type[EmojiCDNSource] = MicrosoftEmojiSource,
+        emoji_source: type[BaseSource] | BaseSource = MicrosoftEmojiSource,
         name: str | None = None,
         position: tuple[int, int] = (0, 0),
         color: Color = (255, 255, 255, 255),
@@ -273,10 +419,30 @@ class EmojiText(Actor):
         stroke_width: int = 0,
         emoji_scale_factor: float = 1.0,
         emoji_position_offset: tuple[int, int] = (0, 0),
+        emoji_atlas: EmojiAtlas | None = None,
     ):
+        """
+        Create an emoji text actor
+
+        :param text_font: The font to render the text in
+        :param text: The text, which may contain emoji
+        :param emoji_source: Where to get emoji images. A source class is wrapped in a
+            shared `CachedEmojiSource`; a source instance is used as it is.
+        :param name: The name of the actor
+        :param position: Where the text starts
+        :param color: The fill color of the text
+        :param stroke_color: The color of the stroke around the text
+        :param stroke_width: The width of the stroke around the text
+        :param emoji_scale_factor: The size of emoji relative to the font size
+        :param emoji_position_offset: How far to move emoji from where they would be drawn
+        :param emoji_atlas: Emoji images already scaled for drawing, used before the source
+        """
         name = name or _get_sequential_name("EmojiText")
         super().__init__(name=name, position=position)
+        if isinstance(emoji_source, type):
+            emoji_source = get_cached_emoji_source(emoji_source)
         self.emoji_source = emoji_source
+        self.emoji_atlas = emoji_atlas
         self.text_font = text_font
         self.text = text
         self.color = color
@@ -284,34 +450,102 @@ class EmojiText(Actor):
         self.stroke_width = stroke_width
         self.emoji_scale_factor = emoji_scale_factor
         self.emoji_position_offset = emoji_position_offset
-        self.canvas = None  # we will prerender on this
+        self.rendered_text: PILImage | None = None  # we will prerender on this
+        # offset from the position to the top left of the rendered text
+        self.render_offset: tuple[int, int] = (0, 0)
+        # emoji left out of the rendered text because they are still being fetched
+        self.awaited_emoji: list[str] = []
         self.pre_render()
 
+    def prefetch(self, strings: Iterable[str]) -> list[str]:
+        """
+        Fetch the images of every emoji in some strings that this actor will show.
+
+        :param strings: The strings
+        :return: the emoji that could not be fetched
+        """
+        if isinstance(self.emoji_source, CachedEmojiSource):
+            return self.emoji_source.prefetch(strings)
+        return []
+
     def set_text(self, text: str) -> None:
         if text != self.text:
+            self.text = text
+            self.pre_render()
             self.changes_since_last_render = True
+
+    def update(self) -> None:
+        # draw the text again once the emoji it was drawn without have been fetched
+        if self.awaited_emoji and not any(
+            cast(CachedEmojiSource, self.emoji_source).is_pending(emoji)
+            for emoji in self.awaited_emoji
+        ):
             self.pre_render()
-        self.text = text
+            self.changes_since_last_render = True
 
     def pre_render(self) -> None:
-        self.canvas = Canvas(background_fill=False)
-        if self.text:
-            with Pilmoji(self.canvas.image, source=self.emoji_source) as pilmoji:
-                pilmoji.text(
-                    self.position,
-                    self.text,
-                    self.color,
-                    self.text_font,
-                    stroke_width=self.stroke_width,
-                    stroke_fill=self.stroke_color,
-                    emoji_scale_factor=self.emoji_scale_factor,
-                    emoji_position_offset=self.emoji_position_offset,
-                )
+        self.rendered_text = None
+        self.size = (0, 0)
+        self.awaited_emoji = []
+        if not self.text:
+            return
+
+        emoji_width = round(self.emoji_scale_factor * self.text_font.size)
+        source: BaseSource = self.emoji_source
+        if self.emoji_atlas:
+            source = AtlasEmojiSource(self.emoji_atlas, emoji_width, self.emoji_source)
+        if isinstance(self.emoji_source, CachedEmojiSource):
+            # start fetching any emoji that aren't cached, then note which are still on the
+            # way before drawing, so that ones that arrive in between are drawn right away
+            for emoji in find_emoji([self.text]):
+                if self.emoji_atlas and self.emoji_atlas.get(emoji, emoji_width):
+                    continue
+                self.emoji_source.get_emoji_bytes(emoji, wait=False)
+                if self.emoji_source.is_pending(emoji):
+                    self.awaited_emoji.append(emoji)
+
+        # draw on a scratch image with room for emoji and stroke to overhang the measured
+        # size, then keep only the part that was drawn on
+        text_width, text_height = pilmoji_getsize(
+            self.text, self.text_font, emoji_scale_factor=self.emoji_scale_factor
+        )
+        margin = (
+            self.stroke_width
+            + emoji_width
+            + abs(self.emoji_position_offset[0])
+            + abs(self.emoji_position_offset[1])
+        )
+        emoji_count = len(find_emoji([self.text]))
+        scratch = Image.new(
+            "RGBA",
+            (text_width + 2 * margin + emoji_count * emoji_width, text_height + 2 * margin),
+            (0, 0, 0, 0),
+        )
+        with Pilmoji(scratch, source=source, cache=False) as pilmoji:
+            pilmoji.text(
+                (margin, margin),
+                self.text,
+                self.color,
+                self.text_font,
+                stroke_width=self.stroke_width,
+                stroke_fill=self.stroke_color,
+                emoji_scale_factor=self.emoji_scale_factor,
+                emoji_position_offset=self.emoji_position_offset,
+            )
+        bbox = scratch.getbbox()
+        if not bbox:
+            return
+        self.rendered_text = scratch.crop(bbox)
+        self.render_offset = (bbox[0] - margin, bbox[1] - margin)
+        self.size = self.rendered_text.size
 
     def render(self, canvas: Canvas) -> None:
-        self_canvas = cast(Canvas, self.canvas)
-        if self.text:
-            canvas.image.alpha_composite(self_canvas.image, dest=(0, 0))
+        if self.text and self.rendered_text:
+            render_pos = (
+                self.position[0] + self.render_offset[0],
+                self.position[1] + self.render_offset[1],
+            )
+            canvas.image.alpha_composite(self.rendered_text, dest=render_pos)
         self.changes_since_last_render = False
 
 
@@ -353,10 +587,9 @@ class Rectangle(Actor):
         self.changes_since_last_render = True
 
     def render(self, canvas: Canvas) -> None:
-        draw = canvas.image_draw
-        opposite_corner = tuple(a + b for a, b in zip(self.position, self.size, strict=False))
-        draw.rectangle(
-            self.position + opposite_corner,
+        x, y = self.position
+        canvas.draw_rectangle(
+            (x, y, x + self.size[0], y + self.size[1]),
             fill=self.color,
             outline=self.outline_color,
             width=self.outline_width,
@@ -482,36 +715,45 @@ class CropMask(CompositeActor):
 
     def render(self, canvas: Canvas) -> None:
         if self.child:
-            # set up the crop canvas
-            self.crop_canvas = Canvas(
-                name=f"{self.name}_crop_Canvas", background_fill=False, size=self.size
-            )
+            # set up the crop canvas, reusing it unless the size has changed
+            if self.crop_canvas.size != self.size:
+                self.crop_canvas = Canvas(
+                    name=f"{self.name}_crop_Canvas", background_fill=False, size=self.size
+                )
+            else:
+                self.crop_canvas.blank()
 
             # ask the child to render into the crop canvas
             self.child.render(self.crop_canvas)
 
             # apply the crop by blanking out the relevant parts with full alpha
             crop_black = (0, 0, 0, 0)
-            draw = self.crop_canvas.image_draw
-            for rect in [
+            for rect in (
                 self.crop_rect_1,
                 self.crop_rect_2,
                 self.crop_rect_3,
                 self.crop_rect_4,
-            ]:
+            ):
                 width = rect[2] - rect[0]
                 height = rect[3] - rect[1]
                 if width >= 0 and height >= 0:
-                    draw.rectangle(rect, fill=crop_black, width=1)
+                    self.crop_canvas.draw_rectangle(rect, fill=crop_black)
 
             # composite the crop canvas into the parameter canvas
-            canvas.image.alpha_composite(self.crop_canvas.image, dest=self.position)
+            canvas.composite(self.crop_canvas.image, self.position)
         self.changes_since_last_render = False
 
 
+GRADIENT_ORIENTATIONS = ("vertical", "horizontal", "radial")
+
+
 class GradientRectangle(Actor):
     """
-    A filled rectangle drawn as a gradient shaded from top to bottom.
+    A filled rectangle drawn as a gradient: shaded from top to bottom, from left to right,
+    or outwards from the center, through two or more colors.
+
+    The gradient is drawn once into an image, which is pasted onto the canvas on each
+    render, and redrawn only when its colors, size, or orientation change.
     """
 
     def __init__(
@@ -521,44 +763,137 @@ class GradientRectangle(Actor):
         size: tuple[int, int] = (63, 31),
         top_color: Color = (255, 255, 255, 255),
         bottom_color: Color = (0, 0, 0, 0),
+        orientation: str = "vertical",
+        stops: list[tuple[float, Color]] | None = None,
     ):
         """
 
         :param name: Optional name for this actor.
             If not set, a name will be automatically generated.
         :param position: The position of the upper left corner
-        :param size: The size of the rectangle
-        :param top_color: The color at the top of the rectangle. Can be RGB or RGBA/
+        :param size: The size of the rectangle, from its upper left corner to its lower right
+            corner, as for `Rectangle`
+        :param top_color: The color at the top of the rectangle. Can be RGB or RGBA.
+            For other orientations, the color at the left or at the center.
         :param bottom_color: The color at the bottom of the rectangle.
+            For other orientations, the color at the right or at the edge.
+        :param orientation: "vertical", "horizontal", or "radial"
+        :param stops: Colors to shade through, each at an offset from 0.0 to 1.0 along the
+            gradient, in order. Overrides `top_color` and `bottom_color`, which become the
+            colors of the first and last stops.
+        :raise ValueError: if the orientation or stops are not valid
         """
         name = name or _get_sequential_name("GradientRectangle")
         super().__init__(name, position)
         self.size = size
-        self.top_color = top_color
-        self.bottom_color = bottom_color
+        self.orientation = "vertical"
+        self.stops: list[tuple[float, Color]] = []
+        self.gradient_image: PILImage | None = None
+        self.set_orientation(orientation)
+        self.set_stops(stops or [(0.0, top_color), (1.0, bottom_color)])
+
+    @property
+    def top_color(self) -> Color:
+        return self.stops[0][1]
+
+    @property
+    def bottom_color(self) -> Color:
+        return self.stops[-1][1]
 
     def set_top_color(self, new_color: Color) -> None:
         if self.top_color != new_color:
-            self.changes_since_last_render = True
-        self.top_color = new_color
+            self.set_stops([(self.stops[0][0], new_color), *self.stops[1:]])
 
     def set_bottom_color(self, new_color: Color) -> None:
         if self.bottom_color != new_color:
+            self.set_stops([*self.stops[:-1], (self.stops[-1][0], new_color)])
+
+    def set_stops(self, stops: list[tuple[float, Color]]) -> None:
+        """
+        Set the colors to shade through.
+
+        :param stops: Colors, each at an offset from 0.0 to 1.0 along the gradient, in order
+        :raise ValueError: if there are fewer than two stops, or their offsets are out of order
+        """
+        offsets = [offset for offset, _ in stops]
+        if len(stops) < 2 or offsets != sorted(offsets) or offsets[0] < 0 or offsets[-1] > 1:
+            raise ValueError(f"Need two or more stops in order from 0.0 to 1.0, not {offsets}")
+        if stops != self.stops:
+            self.stops = list(stops)
+            self.gradient_image = None
             self.changes_since_last_render = True
-        self.bottom_color = new_color
 
-    def render(self, canvas: Canvas) -> None:
-        draw = canvas.image_draw
-        y_start = self.position[1]
-        y_end = self.position[1] + self.size[1]
-        x_start = self.position[0]
-        x_end = self.position[0] + self.size[0]
+    def set_orientation(self, orientation: str) -> None:
+        """
+        :param orientation: "vertical", "horizontal", or "radial"
+        :raise ValueError: if the orientation is not one of those
+        """
+        if orientation not in GRADIENT_ORIENTATIONS:
+            raise ValueError(f"Orientation must be one of {GRADIENT_ORIENTATIONS}")
+        if orientation != self.orientation:
+            self.orientation = orientation
+            self.gradient_image = None
+            self.changes_since_last_render = True
+
+    def set_size(self, size: tuple[int, int]) -> None:
+        if size != self.size:
+            self.size = size
+            self.gradient_image = None
+            self.changes_since_last_render = True
+
+    def color_at(self, factor: float) -> tuple[int, int, int, int]:
+        """
+        :param factor: How far along the gradient, from 0.0 to 1.0
+        :return: the RGBA color of the gradient there
+        """
+        (start_offset, start_color) = self.stops[0]
+        for end_offset, end_color in self.stops[1:]:
+            if factor <= end_offset:
+                span = end_offset - start_offset
+                blend_factor = (factor - start_offset) / span if span else 1.0
+                return self.interpolate_color(start_color, end_color, max(0.0, blend_factor))
+            start_offset, start_color = end_offset, end_color
+        return self.interpolate_color(start_color, start_color, 0.0)
+
+    def _draw_gradient(self) -> PILImage:
+        width, height = self.size[0] + 1, self.size[1] + 1
+        if self.orientation == "radial":
+            # distance from the center: 0 there, to 255 at the edge of the inscribed ellipse
+            distance = ImageMath.lambda_eval(
+                lambda args: (args["x"] * args["x"] + args["y"] * args["y"]) ** 0.5 * 255,
+                x=self._ramp(width, height, horizontal=True),
+                y=self._ramp(width, height, horizontal=False),
+            ).convert("L")
+            colors = [self.color_at(level / 255) for level in range(256)]
+            distance.putpalette(b"".join(bytes(color) for color in colors), "RGBA")
+            return distance.convert("RGBA")
+
+        # work out the colors along the gradient, then stretch them across the rectangle
+        length = height if self.orientation == "vertical" else width
+        colors = [self.color_at(step / max(1, length - 1)) for step in range(length)]
+        strip = Image.frombytes(
+            "RGBA",
+            (1, length) if self.orientation == "vertical" else (length, 1),
+            b"".join(bytes(color) for color in colors),
+        )
+        return strip.resize((width, height), Image.Resampling.NEAREST)
 
-        for y in range(y_start, y_end):
-            gradient_factor = y / self.size[1]
-            color = self.interpolate_color(self.top_color, self.bottom_color, gradient_factor)
-            draw.line((x_start, y, x_end, y), fill=color, width=1)
+    @staticmethod
+    def _ramp(width: int, height: int, horizontal: bool) -> PILImage:
+        """
+        A floating point image that ramps from -1.0 to 1.0 across or down its size
+        """
+        length = width if horizontal else height
+        half = (length - 1) / 2
+        ramp = array("f", [(step - half) / half if half else 0.0 for step in range(length)])
+        strip_size = (length, 1) if horizontal else (1, length)
+        strip = Image.frombytes("F", strip_size, ramp.tobytes())
+        return strip.resize((width, height), Image.Resampling.NEAREST)
 
+    def render(self, canvas: Canvas) -> None:
+        if self.gradient_image is None:
+            self.gradient_image = self._draw_gradient()
+        canvas.image.paste(self.gradient_image, self.position)
         self.changes_since_last_render = False
 
     @staticmethod
@@ -3,6 +3,7 @@ from abc import abstractmethod
 from collections.abc import Callable
 from colorsys import hsv_to_rgb, rgb_to_hsv
 from enum import Enum
+from functools import lru_cache
 from typing import cast
 
 from lmae.actor import MultiFrameImage, SpriteImage
@@ -111,6 +112,18 @@ class StraightMove(Animation):
         super().reset()
         self.accumulated_movement = (0, 0)
 
+    def reconfigure(
+        self,
+        actor: Actor,
+        distance: tuple[int, int],
+        repeat: bool = False,
+        duration: float = 1.0,
+        easing: Easing = Easing.LINEAR,
+    ) -> None:
+        self.distance = distance
+        self.easing = easing
+        super().reconfigure(actor, repeat=repeat, duration=duration)
+
     def is_finished(self) -> bool:
         return self.get_simulated_time() > self.duration
 
@@ -133,21 +146,15 @@ class StraightMove(Animation):
         net_d_x = d_x - self.accumulated_movement[0]
         net_d_y = d_y - self.accumulated_movement[1]
 
-        # apply movement
-        actor = cast(Actor, self.actor)
-        x = actor.position[0] + net_d_x
-        y = actor.position[1] + net_d_y
-        actor.position = (x, y)
-
-        # account for movement
-        self.accumulated_movement = (
-            self.accumulated_movement[0] + net_d_x,
-            self.accumulated_movement[1] + net_d_y,
-        )
-
-        # finally
+        # apply and account for movement, only when there is some, so that frames without
+        # any don't allocate new positions
         if net_d_x != 0 or net_d_y != 0:
+            actor = cast(Actor, self.actor)
+            actor.position = (actor.position[0] + net_d_x, actor.position[1] + net_d_y)
+            self.accumulated_movement = (d_x, d_y)
             actor.changes_since_last_render = True
+
+        # finally
         self.set_update_time(current_time)
 
 
@@ -159,6 +166,10 @@ class _SetVisibility(Animation):
         )  # pretty sure if this was 0.0, bad things would happen
         self.visible = visible
 
+    def reconfigure(self, actor: Actor, visible: bool = True) -> None:
+        self.visible = visible
+        super().reconfigure(actor, duration=0.001)
+
     def is_finished(self) -> bool:
         return self.get_simulated_time() > self.duration
 
@@ -175,12 +186,18 @@ class Show(_SetVisibility):
         name = name or _get_sequential_name(f"Show {actor.name}")
         super().__init__(name=name, actor=actor, visible=True)
 
+    def reconfigure(self, actor: Actor) -> None:
+        super().reconfigure(actor, visible=True)
+
 
 class Hide(_SetVisibility):
     def __init__(self, actor: Actor, name: str | None = None):
         name = name or _get_sequential_name(f"Hide {actor.name}")
         super().__init__(name=name, actor=actor, visible=False)
 
+    def reconfigure(self, actor: Actor) -> None:
+        super().reconfigure(actor, visible=False)
+
 
 class Sequence(Animation):
     def __init__(
@@ -198,6 +215,13 @@ class Sequence(Animation):
         self.seq_start_time = 0
         self._compute_duration()
 
+    def reconfigure(
+        self, actor: Actor, repeat: bool = False, animations: list[Animation] | None = None
+    ) -> None:
+        self.animations = animations or []
+        self._compute_duration()
+        super().reconfigure(actor, repeat=repeat, duration=self.duration)
+
     def add_animation(self, animation):
         self.animations.append(animation)
         self._compute_duration()
@@ -286,6 +310,13 @@ class Parallel(Animation):
         self.animations = animations or []
         self._compute_duration()
 
+    def reconfigure(
+        self, actor: Actor, repeat: bool = False, animations: list[Animation] | None = None
+    ) -> None:
+        self.animations = animations or []
+        self._compute_duration()
+        super().reconfigure(actor, repeat=repeat, duration=self.duration)
+
     def add_animation(self, animation: Animation) -> None:
         self.animations.append(animation)
         self._compute_duration()
@@ -317,7 +348,145 @@ class Parallel(Animation):
         self.set_update_time(current_time)
 
 
-class HueFade(Animation):
+# number of entries in a precomputed color ramp
+_COLOR_RAMP_STEPS = 256
+
+RampColor = tuple[int, int, int] | tuple[int, int, int, int]
+
+
+def _float_rgb_to_int(float_rgb_color: tuple[float, float, float]) -> tuple[int, int, int]:
+    return (
+        round(float_rgb_color[0] * 255),
+        round(float_rgb_color[1] * 255),
+        round(float_rgb_color[2] * 255),
+    )
+
+
+@lru_cache(maxsize=512)
+def _hue_fade_ramp(
+    initial_color: RampColor,
+    final_color: RampColor,
+    easing: Easing,
+    steps: int = _COLOR_RAMP_STEPS,
+) -> tuple[RampColor, ...]:
+    """
+    Compute the quantized color ramp for a hue fade. Ramps are cached, so all hue fades
+    with the same colors and easing share a single ramp.
+
+    :param initial_color: The starting color (RGB or RGBA)
+    :param final_color: The finishing color (RGB or RGBA)
+    :param easing: The easing function applied to the transition
+    :param steps: The number of entries in the ramp
+    :return: A tuple of colors, indexed by the quantized fraction of the fade duration.
+        Colors are RGBA when either color has alpha, RGB otherwise.
+    """
+    initial_hsv = rgb_to_hsv(
+        initial_color[0] / 255.0, initial_color[1] / 255.0, initial_color[2] / 255.0
+    )
+    final_hsv = rgb_to_hsv(final_color[0] / 255.0, final_color[1] / 255.0, final_color[2] / 255.0)
+
+    # Alpha interpolation: if either color has a 4th component, output RGBA.
+    # 3-component colors are treated as full alpha (255).
+    has_alpha = len(initial_color) == 4 or len(final_color) == 4
+    initial_alpha = initial_color[3] if len(initial_color) == 4 else 255
+    final_alpha = final_color[3] if len(final_color) == 4 else 255
+
+    ramp: list[RampColor] = []
+    for i in range(steps):
+        easing_fraction = easing.apply(i / (steps - 1))
+        inv = 1.0 - easing_fraction
+        adjusted_hue = initial_hsv[0] * inv + final_hsv[0] * easing_fraction
+        adjusted_sat = initial_hsv[1] * inv + final_hsv[1] * easing_fraction
+        adjusted_val = initial_hsv[2] * inv + final_hsv[2] * easing_fraction
+        rgb_color = _float_rgb_to_int(hsv_to_rgb(adjusted_hue, adjusted_sat, adjusted_val))
+        if has_alpha:
+            adjusted_alpha = round(initial_alpha * inv + final_alpha * easing_fraction)
+            ramp.append((*rgb_color, adjusted_alpha))
+        else:
+            ramp.append(rgb_color)
+    return tuple(ramp)
+
+
+@lru_cache(maxsize=512)
+def _hue_rotate_ramp(
+    initial_color: tuple[int, int, int], steps: int = _COLOR_RAMP_STEPS
+) -> tuple[tuple[int, int, int], ...]:
+    """
+    Compute the quantized color ramp for one full turn around the hue wheel.
+    Ramps are cached, so all hue rotations with the same initial color share a single ramp.
+
+    :param initial_color: The starting (and finishing) color
+    :param steps: The number of entries in the ramp
+    :return: A tuple of RGB colors, indexed by the quantized fraction of the rotation duration
+    """
+    initial_hsv = rgb_to_hsv(
+        initial_color[0] / 255.0, initial_color[1] / 255.0, initial_color[2] / 255.0
+    )
+    ramp: list[tuple[int, int, int]] = []
+    for i in range(steps):
+        adjusted_hue = (initial_hsv[0] + i / (steps - 1)) % 1.0
+        ramp.append(_float_rgb_to_int(hsv_to_rgb(adjusted_hue, initial_hsv[1], initial_hsv[2])))
+    return tuple(ramp)
+
+
+class _ColorRampAnimation(Animation):
+    """
+    Base class for color animations that play back a precomputed color ramp.
+    Per-frame evaluation is a table lookup, and the callback is only invoked
+    when the quantized color actually changes.
+    """
+
+    def __init__(
+        self,
+        actor: Actor,
+        callback: Callable,
+        ramp: tuple[RampColor, ...],
+        name: str | None = None,
+        duration: float = 10.0,
+        repeat: bool = False,
+    ):
+        super().__init__(name=name, actor=actor, duration=duration, repeat=repeat)
+        self.color_set_callback = callback
+        self._ramp = ramp
+        self._ramp_max_index = len(ramp) - 1
+        self._last_color: RampColor | None = None
+
+    def reset(self) -> None:
+        super().reset()
+        self._last_color = None
+
+    def reconfigure(
+        self,
+        actor: Actor,
+        callback: Callable,
+        ramp: tuple[RampColor, ...],
+        duration: float = 10.0,
+        repeat: bool = False,
+    ) -> None:
+        self.color_set_callback = callback
+        self._ramp = ramp
+        self._ramp_max_index = len(ramp) - 1
+        super().reconfigure(actor, repeat=repeat, duration=duration)
+
+    def is_finished(self) -> bool:
+        return self.get_simulated_time() > self.duration
+
+    def update_actor(self, current_time: float):
+        #  all times relative to start
+        elapsed_time = self.get_elapsed_time(current_time)
+        action_time = elapsed_time
+        if elapsed_time > self.duration:
+            action_time = self.duration
+        duration_fraction = 0.0 if self.duration == 0 else action_time / self.duration
+
+        color = self._ramp[int(duration_fraction * self._ramp_max_index + 0.5)]
+        if color != self._last_color:
+            self._last_color = color
+            self.color_set_callback(color)
+        self.set_update_time(current_time)
+
+
+class HueFade(_ColorRampAnimation):
     """
     Fade a color through HSV space to another color, with optional alpha.
 
@@ -329,6 +498,10 @@ class HueFade(Animation):
     because they are different (some have one color setting, some have
     multiple), the mechanism here to update the actor is through a callback
     function that the user must provide.
+
+    The fade is precomputed into a quantized color ramp that is shared by every
+    hue fade with the same colors and easing. The callback is only invoked when
+    the quantized color changes.
     """
 
     def __init__(
@@ -356,64 +529,52 @@ class HueFade(Animation):
         :param repeat: Whether this animation should repeat.
         """
         name = name or _get_sequential_name("HueFade")
-        super().__init__(name=name, actor=actor, duration=duration, repeat=repeat)
-        self.initial_hsv = rgb_to_hsv(
-            initial_color[0] / 255.0, initial_color[1] / 255.0, initial_color[2] / 255.0
-        )
-        self.final_hsv = rgb_to_hsv(
-            final_color[0] / 255.0, final_color[1] / 255.0, final_color[2] / 255.0
+        initial_color = cast(RampColor, tuple(initial_color))
+        final_color = cast(RampColor, tuple(final_color))
+        super().__init__(
+            name=name,
+            actor=actor,
+            callback=callback,
+            ramp=_hue_fade_ramp(initial_color, final_color, easing),
+            duration=duration,
+            repeat=repeat,
         )
+        self.initial_color = initial_color
+        self.final_color = final_color
         self.easing = easing
-        self.color_set_callback: Callable[
-            [tuple[int, int, int] | tuple[int, int, int, int]], None
-        ] = callback
-
-        # Alpha interpolation: if either color has a 4th component, output RGBA.
-        # 3-component colors are treated as full alpha (255).
-        self._has_alpha = len(initial_color) == 4 or len(final_color) == 4
-        self._initial_alpha = initial_color[3] if len(initial_color) == 4 else 255
-        self._final_alpha = final_color[3] if len(final_color) == 4 else 255
-
-    def is_finished(self) -> bool:
-        return self.get_simulated_time() > self.duration
-
-    def update_actor(self, current_time: float):
-        #  all times relative to start
-        elapsed_time = self.get_elapsed_time(current_time)
-        action_time = elapsed_time
-        if elapsed_time > self.duration:
-            action_time = self.duration
-        duration_fraction = 0.0 if self.duration == 0 else action_time / self.duration
-        easing_fraction = self.easing.apply(duration_fraction)
 
-        inv = 1.0 - easing_fraction
-        adjusted_hue = self.initial_hsv[0] * inv + self.final_hsv[0] * easing_fraction
-        adjusted_sat = self.initial_hsv[1] * inv + self.final_hsv[1] * easing_fraction
-        adjusted_val = self.initial_hsv[2] * inv + self.final_hsv[2] * easing_fraction
-
-        float_rgb_color = hsv_to_rgb(adjusted_hue, adjusted_sat, adjusted_val)
-        rgb_color = (
-            round(float_rgb_color[0] * 255),
-            round(float_rgb_color[1] * 255),
-            round(float_rgb_color[2] * 255),
+    def reconfigure(
+        self,
+        actor: Actor,
+        callback: Callable[[tuple[int, int, int] | tuple[int, int, int, int]], None],
+        initial_color: tuple[int, int, int] | tuple[int, int, int, int] = (255, 0, 0),
+        final_color: tuple[int, int, int] | tuple[int, int, int, int] = (0, 255, 255),
+        easing: Easing = Easing.LINEAR,
+        duration: float = 10.0,
+        repeat: bool = False,
+    ) -> None:
+        self.initial_color = cast(RampColor, tuple(initial_color))
+        self.final_color = cast(RampColor, tuple(final_color))
+        self.easing = easing
+        super().reconfigure(
+            actor,
+            callback=callback,
+            ramp=_hue_fade_ramp(self.initial_color, self.final_color, easing),
+            duration=duration,
+            repeat=repeat,
         )
 
-        if self._has_alpha:
-            adjusted_alpha = round(
-                self._initial_alpha * (1.0 - easing_fraction) + self._final_alpha * easing_fraction
-            )
-            self.color_set_callback((*rgb_color, adjusted_alpha))
-        else:
-            self.color_set_callback(rgb_color)
-        self.set_update_time(current_time)
-
 
-class HueRotate(Animation):
+class HueRotate(_ColorRampAnimation):
     """
     Cycle a color around the hue wheel in HSV space. This animation can be applied to any
     actor that has color settings, but because they are different (some have one color setting,
     some have multiple), the mechanism here to update the actor is through a callback function
     that the user must provide.
+
+    The rotation is precomputed into a quantized color ramp that is shared by every
+    hue rotation with the same initial color. The callback is only invoked when
+    the quantized color changes.
     """
 
     def __init__(
@@ -437,35 +598,34 @@ class HueRotate(Animation):
         :param repeat: Whether this animation should repeat.
         """
         name = name or _get_sequential_name("HueRotate")
-        super().__init__(name=name, actor=actor, duration=duration, repeat=repeat)
-        self.logger.debug(f"Repeat: {self.repeat}")
-        self.initial_hsv = rgb_to_hsv(
-            initial_color[0] / 255.0, initial_color[1] / 255.0, initial_color[2] / 255.0
+        initial_color = cast(tuple[int, int, int], tuple(initial_color[:3]))
+        super().__init__(
+            name=name,
+            actor=actor,
+            callback=callback,
+            ramp=_hue_rotate_ramp(initial_color),
+            duration=duration,
+            repeat=repeat,
         )
-        self.color_set_callback: Callable[[tuple[int, int, int]], None] = callback
-
-    def is_finished(self) -> bool:
-        return self.get_simulated_time() > self.duration
-
-    def update_actor(self, current_time: float):
-        #  all times relative to start
-        elapsed_time = self.get_elapsed_time(current_time)
-        action_time = elapsed_time
-        if elapsed_time > self.duration:
-            action_time = self.duration
-        duration_fraction = 0.0 if self.duration == 0 else action_time / self.duration
-
-        adjusted_hue = self.initial_hsv[0] + duration_fraction
-        adjusted_hue %= 1.0
+        self.logger.debug(f"Repeat: {self.repeat}")
+        self.initial_color = initial_color
 
-        float_rgb_color = hsv_to_rgb(adjusted_hue, self.initial_hsv[1], self.initial_hsv[2])
-        rgb_color = (
-            round(float_rgb_color[0] * 255),
-            round(float_rgb_color[1] * 255),
-            round(float_rgb_color[2] * 255),
+    def reconfigure(
+        self,
+        actor: Actor,
+        callback: Callable[[tuple[int, int, int]], None],
+        initial_color: tuple[int, int, int] = (255, 255, 255),
+        duration: float = 10.0,
+        repeat: bool = False,
+    ) -> None:
+        self.initial_color = cast(tuple[int, int, int], tuple(initial_color[:3]))
+        super().reconfigure(
+            actor,
+            callback=callback,
+            ramp=_hue_rotate_ramp(self.initial_color),
+            duration=duration,
+            repeat=repeat,
         )
-        self.color_set_callback(rgb_color)
-        self.set_update_time(current_time)
 
 
 class FrameSequence(Animation):
@@ -481,6 +641,10 @@ class FrameSequence(Animation):
         super().__init__(name=name, actor=actor, duration=1.0, repeat=repeat)
         self.frames_info = []
 
+    def reconfigure(self, actor: Actor, repeat: bool = False) -> None:
+        self.frames_info = []
+        super().reconfigure(actor, repeat=repeat, duration=1.0)
+
     def add_frame(self, frame_name: str, duration: float = 1.0 / 6, recompute: bool = True):
         """
         Add a single frame to this sequence.
@@ -591,6 +755,10 @@ class AnimatedImageSequence(FrameSequence):
         super().__init__(name=name, actor=actor, repeat=repeat)
         self.last_frame = -1
 
+    def reconfigure(self, actor: Actor, repeat: bool = False) -> None:
+        self.last_frame = -1
+        super().reconfigure(actor, repeat=repeat)
+
     def set_actor_frame(self, frame_name: str):
         frame_number = int(frame_name)
         if frame_number != self.last_frame:
@@ -4,10 +4,19 @@ import platform
 import time
 from abc import ABC, abstractmethod
 from collections.abc import Callable
+from datetime import tzinfo
 from threading import Lock
-from typing import Self, cast
+from typing import Any, Self, cast
 
+from PIL import ImageFont
+from PIL.Image import Image as PILImage
+
+from lmae.assets import AssetRegistry, asset_registry
 from lmae.core import Actor, Animation, Stage
+from lmae.gc_policy import GCPolicy
+from lmae.scheduling import ScheduledCall, TimerWheel
+from lmae.sinks import FrameSink
+from lmae.sprite_sheet import SpriteSheet
 
 os_name = platform.system()
 if os_name == "Linux":
@@ -28,23 +37,161 @@ class App(ABC):
     def __init__(self) -> None:
         self.matrix = None
         self.matrix_options = None
+        self.frame_sinks: list[FrameSink] = []
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.setLevel(logging.INFO)
         self.running = False
-
-    def set_matrix(self, matrix: RGBMatrix, options: RGBMatrixOptions) -> None:
+        self.scheduler = TimerWheel()
+        self.assets: AssetRegistry = asset_registry
+        self.gc_policy: GCPolicy | None = None
+
+    def set_matrix(
+        self,
+        matrix: RGBMatrix,
+        options: RGBMatrixOptions,
+        sinks: list[FrameSink] | None = None,
+    ) -> None:
         """
         Called to set the matrix object. Must be called before any abstract methods are called.
+        :param matrix: The matrix to display frames on
+        :param options: The matrix options
+        :param sinks: Other frame sinks to present frames to, such as recorders and viewers
         :return:
         """
         self.logger.debug("Set matrix in app")
         self.matrix = matrix
         self.matrix_options = options
+        self.frame_sinks = sinks or []
 
-    def prepare(self) -> None:  # noqa: B027
+    def prepare(self) -> None:
         """
         Apps can implement this method to prepare themselves before rendering.
+        Any calls scheduled by a previous run are cancelled, so apps should
+        schedule their calls here, after calling this method.
+        This app's assets become the ones that are kept when memory is tight.
+        """
+        self.cancel_all_scheduled()
+        self.assets.activate(self)
+
+    def load_image(self, path: str, mode: str = "RGBA") -> PILImage:
+        """
+        Load an image through the shared asset registry. The image may be shared with
+        other apps, so it must not be modified.
+        :param path: The image file path
+        :param mode: The image mode to convert to
+        :return: the image
+        """
+        return self.assets.image(path, mode=mode, owner=self)
+
+    def load_font(self, path: str, size: int) -> ImageFont.FreeTypeFont:
+        """
+        Load a font through the shared asset registry.
+        :param path: The font file path
+        :param size: The font size, in pixels
+        :return: the font
+        """
+        return self.assets.font(path, size, owner=self)
+
+    def load_sprite_sheet(self, image_path: str, spec_path: str) -> SpriteSheet:
+        """
+        Load a sprite sheet through the shared asset registry. The sheet may be shared with
+        other apps, and with every sprite image that draws from it.
+        :param image_path: The sprite sheet image file path
+        :param spec_path: The sprite spec JSON file path
+        :return: the sprite sheet
+        """
+        return self.assets.sprite_sheet(image_path, spec_path, owner=self)
+
+    def release_assets(self) -> None:
+        """
+        Give back this app's references to shared assets, e.g. when the app is discarded.
+        """
+        self.assets.release(self)
+
+    def call_at(self, when: float, callback: Callable[..., Any], *args: Any) -> ScheduledCall:
+        """
+        Schedule a function to be called from the run loop at a particular time.
+        :param when: The time to make the call, as a `time.monotonic()` value
+        :param callback: The function to call
+        :param args: Arguments for the function
+        :return: the scheduled call, which can be cancelled
+        """
+        return self.scheduler.call_at(when, callback, *args)
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> ScheduledCall:
+        """
+        Schedule a function to be called from the run loop after a delay.
+        :param delay: The delay, in seconds
+        :param callback: The function to call
+        :param args: Arguments for the function
+        :return: the scheduled call, which can be cancelled
+        """
+        return self.scheduler.call_later(delay, callback, *args)
+
+    def call_every(
+        self,
+        interval: float,
+        callback: Callable[..., Any],
+        *args: Any,
+        delay: float | None = None,
+    ) -> ScheduledCall:
+        """
+        Schedule a function to be called from the run loop repeatedly.
+        :param interval: The time between calls, in seconds
+        :param callback: The function to call
+        :param args: Arguments for the function
+        :param delay: The delay before the first call, in seconds. Defaults to the interval.
+        :return: the scheduled call, which can be cancelled to stop the repeats
+        """
+        return self.scheduler.call_every(interval, callback, *args, delay=delay)
+
+    def call_on(
+        self, boundary: str, callback: Callable[..., Any], *args: Any, tz: tzinfo | None = None
+    ) -> ScheduledCall:
+        """
+        Schedule a function to be called from the run loop every time the wall clock
+        crosses a boundary.
+        :param boundary: One of "second", "minute", "hour", or "day"
+        :param callback: The function to call
+        :param args: Arguments for the function
+        :param tz: The time zone for the wall clock. Defaults to local time.
+        :return: the scheduled call, which can be cancelled to stop the repeats
+        """
+        return self.scheduler.call_on(boundary, callback, *args, tz=tz)
+
+    def cancel_all_scheduled(self) -> None:
+        """
+        Cancel every scheduled call.
         """
+        self.scheduler.cancel_all()
+
+    def run_scheduled(self) -> None:
+        """
+        Make any scheduled calls that have come due. Run loops call this once per frame.
+        """
+        self.scheduler.advance()
+
+    async def wait_for_next_frame(
+        self, frame_time: float, min_time_per_frame: float, min_sleep: float = 0.0
+    ) -> None:
+        """
+        Wait out the rest of a frame's time budget. Run loops call this after each frame.
+        With a garbage collection policy, the frame is measured, and any collection that is
+        due is made while waiting.
+        :param frame_time: How long the frame took, in seconds
+        :param min_time_per_frame: The frame's time budget, in seconds
+        :param min_sleep: How long to sleep when there is no time left, in seconds
+        """
+        sleep_time = min_time_per_frame - frame_time
+        if self.gc_policy:
+            self.gc_policy.frame_finished(frame_time, min_time_per_frame)
+            sleep_time -= self.gc_policy.collect_while_idle(sleep_time)
+        if sleep_time > 0:
+            await asyncio.sleep(sleep_time)
+        elif min_sleep > 0:
+            await asyncio.sleep(min_sleep)
+        if self.gc_policy:
+            self.gc_policy.frame_started()
 
     @abstractmethod
     async def run(self) -> None:
@@ -58,6 +205,7 @@ class App(ABC):
     def stop(self) -> None:
         self.logger.debug("Got command to stop")
         self.running = False
+        self.cancel_all_scheduled()
 
     @classmethod
     @abstractmethod
@@ -109,12 +257,14 @@ class SingleStageRenderLoopApp(App):
         self.pre_render_callback = pre_render_callback
 
     def prepare(self) -> None:
+        super().prepare()
         if not self.stage:
             self.stage = Stage(
                 name=f"{self.__class__.__name__}-Stage",
                 size=self.size,
                 matrix=self.matrix,
                 matrix_options=self.matrix_options,
+                sinks=self.frame_sinks,
                 actors=self.actors,
                 animations=self.animations,
             )
@@ -131,6 +281,7 @@ class SingleStageRenderLoopApp(App):
         last_time = time.perf_counter()
         try:
             while self.running:
+                self.run_scheduled()
                 if self.pre_render_callback:
                     self.pre_render_callback()
 
@@ -139,9 +290,7 @@ class SingleStageRenderLoopApp(App):
 
                 render_end_time = time.perf_counter()
                 elapsed_render_time = render_end_time - last_time
-                if elapsed_render_time < min_time_per_frame:
-                    sleep_time = min_time_per_frame - elapsed_render_time
-                    await asyncio.sleep(sleep_time)
+                await self.wait_for_next_frame(elapsed_render_time, min_time_per_frame)
 
                 last_time = time.perf_counter()
         except Exception:
@@ -150,8 +299,7 @@ class SingleStageRenderLoopApp(App):
             self.logger.debug("Run stopped")
 
     def stop(self) -> None:
-        self.logger.debug("Got command to stop")
-        self.running = False
+        super().stop()
 
     @classmethod
     def get_app_instance(cls, **kwargs: object) -> Self:
@@ -191,6 +339,7 @@ class DisplayManagedApp(App, ABC):
                 name=f"{self.__class__.__name__}-Stage",
                 matrix=self.matrix,
                 matrix_options=self.matrix_options,
+                sinks=self.frame_sinks,
             )
         else:
             self.stage.blank_canvas()
@@ -223,6 +372,7 @@ class DisplayManagedApp(App, ABC):
         try:
             while self.running:
                 # update the view
+                self.run_scheduled()
                 self.update_view(elapsed_time=0.0)
                 if stage.needs_render:
                     stage.render_frame()
@@ -235,6 +385,7 @@ class DisplayManagedApp(App, ABC):
                 while waiting and self.running:
                     current_time = time.time()
                     elapsed_time = current_time - wait_start
+                    self.run_scheduled()
                     self.update_view(elapsed_time=elapsed_time)
                     stage.render_frame()
                     waiting = elapsed_time < self.refresh_time
@@ -244,12 +395,10 @@ class DisplayManagedApp(App, ABC):
 
                     # if we are rendering faster than max frame rate, slow down
                     elapsed_render_time = render_end_time - last_time
-                    if elapsed_render_time < min_time_per_frame:
-                        sleep_time = min_time_per_frame - elapsed_render_time
-                        await asyncio.sleep(sleep_time)
-                    else:
-                        # must yield some control, with minimal sleep amount
-                        await asyncio.sleep(min_time_per_frame / 10.0)
+                    # must yield some control even when behind, with minimal sleep amount
+                    await self.wait_for_next_frame(
+                        elapsed_render_time, min_time_per_frame, min_sleep=min_time_per_frame / 10.0
+                    )
 
                     # see if we're still running
                     if not self.running:
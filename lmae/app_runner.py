@@ -1,18 +1,23 @@
 import asyncio
+import atexit
 import configparser
 import contextlib
 import logging
 import os
 import sys
 
+from lmae import core
 from lmae.app import App
 from lmae.core import parse_matrix_options_command_line
+from lmae.gc_policy import GCPolicy
+from lmae.sinks import FrameSink, QueuedSink, RecorderSink, SocketSink
 
 try:
     from rgbmatrix import RGBMatrix, RGBMatrixOptions  # pyright: ignore[reportAttributeAccessIssue]
 
     virtual_leds = False
 except ImportError:
+    from lmae.display import HeadlessRGBMatrix, ViewerRGBMatrix
     from lmae.display import VirtualRGBMatrix as RGBMatrix
     from lmae.display import VirtualRGBMatrixOptions as RGBMatrixOptions
 
@@ -21,6 +26,8 @@ except ImportError:
 matrix: RGBMatrix
 logger: logging.Logger
 matrix_options: RGBMatrixOptions
+frame_sinks: list[FrameSink] = []
+gc_policy: GCPolicy | None = None
 
 
 def get_env_parameter(
@@ -82,11 +89,34 @@ def app_setup():
         global matrix_options
         matrix_options = parse_matrix_options_command_line()
         global matrix
-        if virtual_leds:
+        if virtual_leds and core.headless_leds:
+            logger.info("Initializing headless LED matrix")
+            matrix = HeadlessRGBMatrix(options=matrix_options)
+        elif virtual_leds and core.in_process_viewer:
             logger.info("Initializing virtual LED matrix")
+            matrix = RGBMatrix(options=matrix_options)
+        elif virtual_leds:
+            logger.info("Initializing virtual LED matrix in a viewer process")
+            matrix = ViewerRGBMatrix(options=matrix_options)
         else:
             logger.info("Initializing real LED matrix")
-        matrix = RGBMatrix(options=matrix_options)
+            matrix = RGBMatrix(options=matrix_options)
+
+        # other places frames go, each on its own queue so they never delay the matrix
+        if core.record_path:
+            logger.info(f"Recording frames to {core.record_path}")
+            frame_sinks.append(QueuedSink(RecorderSink(core.record_path), queue_size=8))
+        if core.viewer_port is not None:
+            frame_sinks.append(QueuedSink(SocketSink(port=core.viewer_port)))
+        for sink in frame_sinks:
+            atexit.register(sink.close)
+
+        # keep garbage collection out of frames, or at least measure when it gets in
+        if core.gc_policy_name != "automatic":
+            global gc_policy
+            gc_policy = GCPolicy(managed=core.gc_policy_name == "managed")
+            gc_policy.start()
+            atexit.register(gc_policy.close)
     _app_setup_happened = True
 
 
@@ -104,9 +134,21 @@ async def stop_app(app: App):
     app.stop()
 
 
+def prepare_app(app: App) -> None:
+    """
+    Prepare an app to run, under the garbage collection policy if there is one.
+    :param app: The app to prepare
+    """
+    app.gc_policy = gc_policy
+    if gc_policy:
+        gc_policy.prepare(app)
+    else:
+        app.prepare()
+
+
 async def run_app(app: App):
     logger.debug("run_app() called")
-    app.prepare()
+    prepare_app(app)
 
     logger.info("Creating stopper task")
     stopper_task = asyncio.create_task(stop_app(app))
@@ -121,7 +163,7 @@ async def run_app(app: App):
 
 def start_app(app: App):
     app_setup()
-    app.set_matrix(matrix=matrix, options=matrix_options)
+    app.set_matrix(matrix=matrix, options=matrix_options, sinks=frame_sinks)
     asyncio.run(run_app(app))
 
 
@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from PIL import Image, ImageFont
+from PIL.Image import Image as PILImage
+
+from lmae.bundle import AssetBundle, find_bundle
+from lmae.sprite_sheet import SpriteSheet
+
+logger = logging.getLogger("lmae.assets")
+
+# default memory budget for assets that the running app isn't using
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class _Asset:
+    """
+    A loaded asset, with the owners that hold references to it
+    """
+
+    __slots__ = ("key", "nbytes", "owners", "value")
+
+    def __init__(self, key: tuple, value: Any, nbytes: int):
+        self.key = key
+        self.value = value
+        self.nbytes = nbytes
+        self.owners: set[Hashable] = set()
+
+
+class AssetRegistry:
+    """
+    A process-wide registry of loaded fonts, images, and data files, shared between apps.
+
+    Assets are deduplicated by their real path and loading parameters, so apps that load
+    the same file get the same object. Shared images must not be modified; copy them first.
+
+    Each asset counts the owners, typically apps, that hold a reference to it. Loading an
+    asset takes a reference for the owner, and `release()` gives back all of an owner's
+    references. When the assets held in memory exceed the budget, assets that the active
+    owner is not using are evicted, least recently used first. An owner whose asset was
+    evicted gets a fresh copy the next time it loads it.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Create an asset registry. Use the module's `asset_registry` to share assets.
+
+        :param max_bytes: The memory budget, in bytes. Assets in use by the active owner
+            are always kept, even over budget.
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.active_owner: Hashable | None = None
+        self._assets: OrderedDict[tuple, _Asset] = OrderedDict()
+        self.bundles: list[AssetBundle] = []
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def __contains__(self, value: Any) -> bool:
+        return any(asset.value is value for asset in self._assets.values())
+
+    @staticmethod
+    def _real_path(path: str) -> str:
+        return os.path.realpath(path)
+
+    def _acquire(
+        self,
+        key: tuple,
+        load: Callable[[], tuple[Any, int]],
+        owner: Hashable | None,
+    ) -> Any:
+        asset = self._assets.get(key)
+        if asset is None:
+            value, nbytes = load()
+            logger.debug(f"Loaded asset {key} ({nbytes} bytes)")
+            asset = self._assets[key] = _Asset(key, value, nbytes)
+            self.total_bytes += nbytes
+        else:
+            self._assets.move_to_end(key)
+        if owner is not None:
+            asset.owners.add(owner)
+        self.trim()
+        return asset.value
+
+    def image(self, path: str, mode: str = "RGBA", owner: Hashable | None = None) -> PILImage:
+        """
+        Load an image, decoded and converted to a mode.
+
+        :param path: The image file path
+        :param mode: The image mode to convert to
+        :param owner: The owner taking a reference to the image, if any
+        :return: the shared image
+        """
+        real_path = self._real_path(path)
+
+        def load() -> tuple[PILImage, int]:
+            for bundle in self.bundles:
+                bundled = bundle.image(real_path, mode)
+                if bundled is not None:
+                    return bundled, bundled.width * bundled.height * len(bundled.getbands())
+            with Image.open(real_path) as image:
+                converted = image.convert(mode)
+            return converted, converted.width * converted.height * len(converted.getbands())
+
+        return self._acquire(("image", real_path, mode), load, owner)
+
+    def font(
+        self, path: str, size: int, index: int = 0, owner: Hashable | None = None
+    ) -> ImageFont.FreeTypeFont:
+        """
+        Load a TrueType or OpenType font at a size.
+
+        :param path: The font file path
+        :param size: The font size, in pixels
+        :param index: Which font face to load from the file
+        :param owner: The owner taking a reference to the font, if any
+        :return: the shared font
+        """
+        real_path = self._real_path(path)
+
+        def load() -> tuple[ImageFont.FreeTypeFont, int]:
+            font = None
+            for bundle in self.bundles:
+                font = bundle.font(real_path, size, index)
+                if font is not None:
+                    # a font loaded from memory keeps a copy of the file
+                    nbytes = len(font.font_bytes)
+                    break
+            if font is None:
+                font = ImageFont.truetype(real_path, size, index=index)
+                nbytes = os.path.getsize(real_path)
+            for bundle in self.bundles:
+                bundle.load_glyphs(font, real_path)
+            return font, nbytes
+
+        return self._acquire(("font", real_path, size, index), load, owner)
+
+    def json(self, path: str, owner: Hashable | None = None) -> Any:
+        """
+        Load a JSON file, such as a sprite sheet spec.
+
+        :param path: The JSON file path
+        :param owner: The owner taking a reference to the data, if any
+        :return: the shared data, which must not be modified
+        """
+        real_path = self._real_path(path)
+
+        def load() -> tuple[Any, int]:
+            for bundle in self.bundles:
+                bundled = bundle.json(real_path)
+                if bundled is not None:
+                    return bundled, 0
+            with open(real_path) as file:
+                return json.load(file), os.path.getsize(real_path)
+
+        return self._acquire(("json", real_path), load, owner)
+
+    def sprite_sheet(
+        self, image_path: str, spec_path: str, owner: Hashable | None = None
+    ) -> SpriteSheet:
+        """
+        Load a sprite sheet image and its spec, compiled into a sprite sheet.
+
+        :param image_path: The sprite sheet image file path
+        :param spec_path: The sprite spec JSON file path
+        :param owner: The owner taking a reference to the sheet, if any
+        :return: the shared sprite sheet
+        """
+        real_image_path = self._real_path(image_path)
+        real_spec_path = self._real_path(spec_path)
+
+        def load() -> tuple[SpriteSheet, int]:
+            image = self.image(real_image_path, owner=owner)
+            sheet = SpriteSheet(image, self.json(real_spec_path, owner=owner))
+            # the sprite crops that the sheet caches add up to at most the sheet image again
+            return sheet, image.width * image.height * len(image.getbands())
+
+        return self._acquire(("sprite_sheet", real_image_path, real_spec_path), load, owner)
+
+    def add_bundle(self, bundle: AssetBundle) -> None:
+        """
+        Load assets from a bundle, when it has them, instead of from their source files.
+
+        :param bundle: The bundle
+        """
+        if bundle not in self.bundles:
+            self.bundles.append(bundle)
+
+    def load_bundle(self, resource_path: str) -> AssetBundle | None:
+        """
+        Load assets from the bundle built in a resource directory, if there is one.
+
+        :param resource_path: The resource directory
+        :return: the bundle, or None if there isn't one
+        """
+        bundle_path = os.path.realpath(resource_path)
+        for bundle in self.bundles:
+            if os.path.dirname(os.path.realpath(bundle.path)) == bundle_path:
+                return bundle
+        bundle = find_bundle(resource_path)
+        if bundle is not None:
+            logger.info(f"Using asset bundle {bundle.path} with {len(bundle)} assets")
+            self.add_bundle(bundle)
+        return bundle
+
+    def activate(self, owner: Hashable | None) -> None:
+        """
+        Make an owner the active one, whose assets are kept regardless of the budget,
+        e.g. when an app starts running.
+
+        :param owner: The owner, or None for no active owner
+        """
+        self.active_owner = owner
+        self.trim()
+
+    def release(self, owner: Hashable) -> None:
+        """
+        Give back every reference an owner holds. The assets stay loaded, for quick reuse,
+        until they are evicted to stay within the budget.
+
+        :param owner: The owner
+        """
+        for asset in self._assets.values():
+            asset.owners.discard(owner)
+        self.trim()
+
+    def reference_count(self, value: Any) -> int:
+        """
+        :param value: A loaded asset, e.g. an image returned by `image()`
+        :return: the number of owners holding a reference to the asset, or 0 if it isn't held
+            by this registry
+        """
+        for asset in self._assets.values():
+            if asset.value is value:
+                return len(asset.owners)
+        return 0
+
+    def trim(self) -> None:
+        """
+        Evict assets that the active owner isn't using, least recently used first, until
+        the assets in memory fit within the budget. The most recently used asset is kept.
+        """
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key in list(self._assets)[:-1]:
+            if self.total_bytes <= self.max_bytes:
+                break
+            asset = self._assets[key]
+            if self.active_owner is not None and self.active_owner in asset.owners:
+                continue
+            logger.debug(f"Evicting asset {key} ({asset.nbytes} bytes)")
+            del self._assets[key]
+            self.total_bytes -= asset.nbytes
+
+    def clear(self) -> None:
+        """
+        Evict every asset.
+        """
+        self._assets.clear()
+        self.total_bytes = 0
+
+
+# the registry shared by every app in the process
+asset_registry = AssetRegistry()
@@ -0,0 +1,457 @@
+import argparse
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+import string
+import struct
+from typing import Any
+
+from PIL import Image, ImageFont
+from PIL.Image import Image as PILImage
+
+from lmae.glyphs import Glyph, GlyphAtlas, get_glyph_atlas
+
+logger = logging.getLogger("lmae.bundle")
+
+# file layout: header, JSON index, then the data blocks, each aligned for efficient access
+MAGIC = b"LMAEBNDL"
+FORMAT_VERSION = 4
+HEADER = struct.Struct("<8sII")  # magic, format version, index length
+ALIGNMENT = 64
+
+# the name a bundle is looked for under in a resource directory
+DEFAULT_BUNDLE_NAME = "assets.lmab"
+
+# the characters whose glyphs are pre-rasterized by default
+DEFAULT_CHARACTERS = string.printable.strip() + " °"
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _source_stamp(path: str) -> list:
+    # the size, modification time, and a hash of the contents: checkouts and copies to other
+    # machines change the modification time without changing the file, so when only the
+    # time differs, the contents decide
+    with open(path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        digest = hashlib.file_digest(file, "sha256").hexdigest()
+    return [stat.st_size, stat.st_mtime_ns, digest]
+
+
+class BundleBuilder:
+    """
+    Compiles assets into a bundle file: images are decoded and converted ahead of time,
+    data files are parsed, and glyphs are rasterized and measured, so that loading the
+    bundle needs no decoding at all.
+
+    Assets are recorded by their path relative to a root directory, usually the resource
+    directory that an app loads them from.
+    """
+
+    def __init__(self, root: str):
+        """
+        Create a bundle builder
+
+        :param root: The directory that asset paths are relative to
+        """
+        self.root = root
+        self.entries: list[dict[str, Any]] = []
+        self.blocks: list[bytes] = []
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(os.path.join(self.root, path), self.root).replace(os.sep, "/")
+
+    def _add_block(self, data: bytes) -> list[int]:
+        self.blocks.append(data)
+        return [len(self.blocks) - 1, len(data)]
+
+    def add_image(self, path: str, mode: str = "RGBA") -> None:
+        """
+        Add an image, decoded and converted to a mode.
+
+        :param path: The image path, relative to the root
+        :param mode: The image mode to convert to
+        """
+        source = os.path.join(self.root, path)
+        with Image.open(source) as image:
+            converted = image.convert(mode)
+        self.entries.append(
+            {
+                "kind": "image",
+                "path": self._relative(path),
+                "stamp": _source_stamp(source),
+                "mode": mode,
+                "size": list(converted.size),
+                "block": self._add_block(converted.tobytes()),
+            }
+        )
+
+    def add_json(self, path: str) -> None:
+        """
+        Add a JSON data file, such as a sprite spec.
+
+        :param path: The file path, relative to the root
+        """
+        source = os.path.join(self.root, path)
+        with open(source) as file:
+            data = json.load(file)
+        self.entries.append(
+            {
+                "kind": "json",
+                "path": self._relative(path),
+                "stamp": _source_stamp(source),
+                "data": data,
+            }
+        )
+
+    def add_sprite_sheet(self, image_path: str, spec_path: str) -> None:
+        """
+        Add a sprite sheet image and its spec.
+
+        :param image_path: The sheet image path, relative to the root
+        :param spec_path: The spec path, relative to the root
+        """
+        self.add_image(image_path)
+        self.add_json(spec_path)
+
+    def add_font(self, path: str) -> None:
+        """
+        Add a font file, so that the font can be loaded without reading its source file.
+        Fonts whose glyphs are added are added too.
+
+        :param path: The font path, relative to the root
+        """
+        relative = self._relative(path)
+        if any(entry["kind"] == "font" and entry["path"] == relative for entry in self.entries):
+            return
+        source = os.path.join(self.root, path)
+        with open(source, "rb") as file:
+            data = file.read()
+        self.entries.append(
+            {
+                "kind": "font",
+                "path": relative,
+                "stamp": _source_stamp(source),
+                "block": self._add_block(data),
+            }
+        )
+
+    def add_glyphs(
+        self,
+        font_path: str,
+        size: int,
+        stroke_width: int = 0,
+        characters: str = DEFAULT_CHARACTERS,
+        index: int = 0,
+    ) -> None:
+        """
+        Add the rasterized glyphs and measurements of a font, for a set of characters.
+
+        :param font_path: The font path, relative to the root
+        :param size: The font size, in pixels
+        :param stroke_width: The stroke width that the glyphs will be drawn with
+        :param characters: The characters to rasterize
+        :param index: Which face to load, for font collections
+        """
+        self.add_font(font_path)
+        source = os.path.join(self.root, font_path)
+        atlas = GlyphAtlas(ImageFont.truetype(source, size, index), stroke_width)
+        characters = "".join(dict.fromkeys(characters))
+
+        def glyph_entries(stroked: bool) -> dict[str, list]:
+            entries = {}
+            for char in characters:
+                glyph = atlas.glyph(char, stroked)
+                block = self._add_block(glyph.mask.tobytes()) if glyph.mask else None
+                entries[char] = [list(glyph.bbox), block]
+            return entries
+
+        kerning = {}
+        for left in characters:
+            for right in characters:
+                adjustment = atlas.kerning(left, right)
+                if adjustment:
+                    kerning[left + right] = adjustment
+        self.entries.append(
+            {
+                "kind": "glyphs",
+                "path": self._relative(font_path),
+                "stamp": _source_stamp(source),
+                "size": size,
+                "index": index,
+                "stroke_width": stroke_width,
+                "characters": characters,
+                "advances": {char: atlas.advance(char) for char in characters},
+                "kerning": kerning,
+                "glyphs": glyph_entries(stroked=False),
+                "stroked_glyphs": glyph_entries(stroked=True) if stroke_width else None,
+            }
+        )
+
+    def write(self, output_path: str) -> None:
+        """
+        Write the bundle file.
+
+        :param output_path: Where to write the bundle
+        """
+        # data block offsets are relative to the start of the data, which follows the index
+        offsets = []
+        offset = 0
+        for block in self.blocks:
+            offsets.append(offset)
+            offset = _aligned(offset + len(block))
+        index = {"entries": self.entries, "offsets": offsets}
+        index_bytes = json.dumps(index, ensure_ascii=False).encode()
+        data_start = _aligned(HEADER.size + len(index_bytes))
+
+        temp_path = f"{output_path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(index_bytes)))
+            file.write(index_bytes)
+            for block, block_offset in zip(self.blocks, offsets, strict=True):
+                file.write(b"\0" * (data_start + block_offset - file.tell()))
+                file.write(block)
+        os.replace(temp_path, output_path)
+        logger.info(f"Wrote bundle of {len(self.entries)} assets to {output_path}")
+
+
+class AssetBundle:
+    """
+    A bundle file, memory-mapped, that hands out assets without decoding them.
+
+    Images are read-only views straight onto the mapped file, so loading one costs only
+    the page faults to read its pixels. An asset whose source file has changed since the
+    bundle was built is not handed out, so that stale assets are never used; the source
+    file is loaded instead. A source whose size and modification time are unchanged is
+    taken to be unchanged, so checking it costs only a stat. Only when its modification time
+    has changed, e.g. after a checkout or a copy to another machine, are its contents hashed
+    to compare them. Source files don't need to be present to use the bundle.
+    """
+
+    def __init__(self, path: str, root: str | None = None, verify: bool = False):
+        """
+        Open a bundle file
+
+        :param path: The bundle file path
+        :param root: The directory that asset paths are relative to.
+            Defaults to the directory containing the bundle.
+        :param verify: If True, compare the contents of every source file, even those whose
+            modification time hasn't changed
+        """
+        self.path = path
+        self.verify = verify
+        self.root = root if root is not None else os.path.dirname(os.path.abspath(path))
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, version, index_length = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an asset bundle")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Bundle {path} has format version {version}, not {FORMAT_VERSION}")
+        index = json.loads(bytes(self._view[HEADER.size : HEADER.size + index_length]))
+        self._data_start = _aligned(HEADER.size + index_length)
+        self._offsets: list[int] = index["offsets"]
+        self._entries: dict[tuple, dict[str, Any]] = {}
+        # whether each source file is unchanged, by path, along with the size and modification
+        # time it was checked at, so that each file is only hashed again when it changes
+        self._checked: dict[str, tuple[int, int, bool]] = {}
+        self._warned_stale = False
+        for entry in index["entries"]:
+            real_path = os.path.realpath(os.path.join(self.root, entry["path"]))
+            if entry["kind"] == "image":
+                key: tuple = ("image", real_path, entry["mode"])
+            elif entry["kind"] == "glyphs":
+                key = ("glyphs", real_path, entry["size"], entry["index"], entry["stroke_width"])
+            else:
+                key = (entry["kind"], real_path)
+            self._entries[key] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _current(self, key: tuple) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        source = key[1]
+        if not os.path.exists(source) or self._unchanged(source, entry["stamp"]):
+            return entry
+        if not self._warned_stale:
+            self._warned_stale = True
+            logger.warning(
+                f"Bundle {self.path} is out of date: {source} and any other assets that have "
+                f"changed since it was built are loaded from their source files. "
+                "Rebuild it with python -m lmae.bundle."
+            )
+        else:
+            logger.debug(f"Not using bundled {source}, which has changed since it was bundled")
+        return None
+
+    def _unchanged(self, source: str, stamp: list) -> bool:
+        stat = os.stat(source)
+        if stat.st_size != stamp[0]:
+            return False
+        if stat.st_mtime_ns == stamp[1] and not self.verify:
+            return True
+        checked = self._checked.get(source)
+        if checked and checked[:2] == (stat.st_size, stat.st_mtime_ns):
+            return checked[2]
+        unchanged = _source_stamp(source)[2] == stamp[2]
+        self._checked[source] = (stat.st_size, stat.st_mtime_ns, unchanged)
+        return unchanged
+
+    def _block(self, block: list[int]) -> memoryview:
+        offset = self._data_start + self._offsets[block[0]]
+        return self._view[offset : offset + block[1]]
+
+    def buffer(self, path: str, mode: str = "RGBA") -> memoryview | None:
+        """
+        Get the raw pixel data of a bundled image, e.g. to wrap in an array without copying.
+
+        :param path: The image's source path
+        :param mode: The mode it was bundled in
+        :return: a read-only view of the pixel data, or None if it isn't bundled
+        """
+        entry = self._current(("image", os.path.realpath(path), mode))
+        return self._block(entry["block"]) if entry else None
+
+    def image(self, path: str, mode: str = "RGBA") -> PILImage | None:
+        """
+        Get a bundled image, as a read-only view onto the bundle. Drawing on it makes a copy.
+
+        :param path: The image's source path
+        :param mode: The mode it was bundled in
+        :return: the image, or None if it isn't bundled
+        """
+        entry = self._current(("image", os.path.realpath(path), mode))
+        if entry is None:
+            return None
+        size = tuple(entry["size"])
+        return Image.frombuffer(mode, size, self._block(entry["block"]), "raw", mode, 0, 1)
+
+    def json(self, path: str) -> Any:
+        """
+        Get a bundled data file.
+
+        :param path: The file's source path
+        :return: the parsed data, or None if it isn't bundled
+        """
+        entry = self._current(("json", os.path.realpath(path)))
+        return entry["data"] if entry else None
+
+    def font(self, path: str, size: int, index: int = 0) -> ImageFont.FreeTypeFont | None:
+        """
+        Load a bundled font file at a size.
+
+        :param path: The font's source path
+        :param size: The font size, in pixels
+        :param index: Which font face to load from the file
+        :return: the font, or None if it isn't bundled
+        """
+        entry = self._current(("font", os.path.realpath(path)))
+        if entry is None:
+            return None
+        return ImageFont.truetype(io.BytesIO(self._block(entry["block"])), size, index=index)
+
+    def load_glyphs(self, font: ImageFont.FreeTypeFont, path: str | None = None) -> int:
+        """
+        Seed the shared glyph atlases for a font with the glyphs bundled for it.
+
+        :param font: A font
+        :param path: The font's source path. Defaults to the path it was loaded from,
+            which must be given for a font loaded from memory, e.g. from a bundle.
+        :return: the number of stroke widths that glyphs were bundled for
+        """
+        path = path if path is not None else font.path
+        if not isinstance(path, str):
+            return 0
+        real_path = os.path.realpath(path)
+        loaded = 0
+        for key in self._entries:
+            if key[:4] != ("glyphs", real_path, font.size, font.index):
+                continue
+            entry = self._current(key)
+            atlas = get_glyph_atlas(font, key[4])
+            if entry is None or atlas is None:
+                continue
+            glyphs = self._glyphs(entry["glyphs"])
+            stroked = self._glyphs(entry["stroked_glyphs"]) if entry["stroked_glyphs"] else glyphs
+            characters = entry["characters"]
+            kerning = entry["kerning"]
+            atlas.preload(
+                glyphs,
+                stroked,
+                entry["advances"],
+                {a + b: kerning.get(a + b, 0.0) for a in characters for b in characters},
+            )
+            loaded += 1
+        return loaded
+
+    def _glyphs(self, entries: dict[str, list]) -> dict[str, Glyph]:
+        glyphs = {}
+        for char, (bbox, block) in entries.items():
+            mask = None
+            if block:
+                size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+                mask = Image.frombuffer("L", size, self._block(block), "raw", "L", 0, 1)
+            glyphs[char] = Glyph(tuple(bbox), mask)  # type: ignore[arg-type]
+        return glyphs
+
+
+def find_bundle(resource_path: str) -> AssetBundle | None:
+    """
+    Open the bundle in a resource directory, if one has been built there.
+
+    :param resource_path: The resource directory
+    :return: the bundle, or None if there isn't one
+    """
+    path = os.path.join(resource_path, DEFAULT_BUNDLE_NAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        return AssetBundle(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not open asset bundle {path}: {e}")
+        return None
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build an asset bundle")
+    parser.add_argument("--root", default=".", help="Directory that asset paths are relative to")
+    parser.add_argument(
+        "--output", help=f"Bundle file to write. Default: {DEFAULT_BUNDLE_NAME} in the root"
+    )
+    parser.add_argument("--image", action="append", default=[], help="An image to bundle")
+    parser.add_argument("--json", action="append", default=[], help="A JSON file to bundle")
+    parser.add_argument(
+        "--font",
+        action="append",
+        default=[],
+        nargs=3,
+        metavar=("PATH", "SIZE", "STROKE_WIDTH"),
+        help="A font whose glyphs to bundle",
+    )
+    parser.add_argument(
+        "--characters", default=DEFAULT_CHARACTERS, help="The characters to bundle glyphs for"
+    )
+    options = parser.parse_args(args)
+
+    builder = BundleBuilder(options.root)
+    for path in options.image:
+        builder.add_image(path)
+    for path in options.json:
+        builder.add_json(path)
+    for path, size, stroke_width in options.font:
+        builder.add_glyphs(path, int(size), int(stroke_width), options.characters)
+    builder.write(options.output or os.path.join(options.root, DEFAULT_BUNDLE_NAME))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Hashable
+from collections.abc import Sequence as SequenceABC
 
 from PIL import Image, ImageSequence
 
@@ -13,7 +16,15 @@ from lmae.animation import (
     Still,
     StraightMove,
 )
-from lmae.core import Actor, Animation, Canvas, _get_sequential_name
+from lmae.core import (
+    Actor,
+    Animation,
+    AnimationTemplate,
+    Canvas,
+    _get_sequential_name,
+    _retain_animation,
+)
+from lmae.frames import CompactFrameStore, StreamingFrames
 
 
 class LMAEComponent(Actor, ABC):
@@ -81,53 +92,35 @@ class Carousel(LMAEComponent):
 
     def get_animations(self) -> list[Animation]:
         if not self.animations:
-            self.logger.debug("Constructing individual animations")
-            animations = dict((actor.name, list()) for actor in self.panels)
+            self.logger.debug("Constructing animation template")
             spacing = self.crop_area[2] - self.crop_area[0] + 2
             total_carousel_width = spacing * (len(self.panels) - 1)
             self.logger.debug(f"Spacing: {spacing}, total carousel width: {total_carousel_width}")
 
-            for i, _actor in enumerate(self.panels):
-                for actor2 in self.panels:
-                    still = Still(
-                        name=f"Wait {i + 1} for {actor2.name}",
-                        duration=self.dwell_time,
-                        actor=actor2,
+            # every panel runs the same sequence, so define it once and instantiate it per panel
+            steps: list[AnimationTemplate] = []
+            for i in range(len(self.panels)):
+                steps.append(
+                    AnimationTemplate(
+                        Still, name=f"{self.name} wait {i + 1}", duration=self.dwell_time
                     )
-                    animations[actor2.name].append(still)
-                if i < len(self.panels) - 1:
-                    for actor2 in self.panels:
-                        move = StraightMove(
-                            name=f"Slide {i + 1} for {actor2.name}",
-                            duration=self.transition_time,
-                            easing=self.easing,
-                            distance=(-spacing, 0),
-                            actor=actor2,
-                        )
-                        animations[actor2.name].append(move)
-                else:
-                    for actor2 in self.panels:
-                        reset_move = StraightMove(
-                            name=f"Reset for {actor2.name}",
-                            duration=self.transition_time,
-                            easing=self.easing,
-                            distance=(total_carousel_width, 0),
-                            actor=actor2,
-                        )
-                        animations[actor2.name].append(reset_move)
-
-            self.logger.debug("Constructing sequences")
-            animation_sequences = []
-            for actor in self.panels:
-                sequence = Sequence(
-                    name=f"Carousel sequence for {actor.name}",
-                    actor=actor,
-                    animations=animations[actor.name],
-                    repeat=True,
                 )
-                animation_sequences.append(sequence)
+                last = i == len(self.panels) - 1
+                steps.append(
+                    AnimationTemplate(
+                        StraightMove,
+                        name=f"{self.name} reset" if last else f"{self.name} slide {i + 1}",
+                        duration=self.transition_time,
+                        easing=self.easing,
+                        distance=(total_carousel_width, 0) if last else (-spacing, 0),
+                    )
+                )
+            sequence_template = AnimationTemplate(
+                Sequence, name=f"{self.name} sequence", animations=steps, repeat=True
+            )
 
-            self.animations = animation_sequences
+            self.logger.debug("Constructing sequences")
+            self.animations = [sequence_template.instantiate(actor) for actor in self.panels]
 
         return self.animations
 
@@ -239,19 +232,22 @@ class AnimatedImage(LMAEComponent):
         self.repeat = repeat
         self.sequence: AnimatedImageSequence | None = None
         self.multi_frame_image: MultiFrameImage | None = multi_frame_image
+        # frames streamed from a file by this image, which it closes when done with them
+        self._streaming_frames: StreamingFrames | None = None
         if pil_source_image:
             self.set_from_pil_image(pil_source_image)
 
-    def set_from_pil_image(self, pil_image: Image):
-        self.sequence: AnimatedImageSequence = AnimatedImageSequence(
-            name=self.name + "_Sequence",
-            actor=self.multi_frame_image,
-            repeat=self.repeat,
-        )
+    def set_from_pil_image(self, pil_image: Image, compact: bool = True):
+        """
+        Set the frames from an animated PIL image, decoding them all now.
 
-        images = []
-        index = 0
-        self.sequence.reset_frame_info()
+        :param pil_image: A PIL image with an image sequence in it
+        :param compact: Whether to store the frames compactly, in a `CompactFrameStore`,
+            rather than as a list of RGBA images
+        """
+        # a compact store takes each frame as it is decoded, so they are never all held at once
+        images: CompactFrameStore | list[Image.Image] = CompactFrameStore() if compact else []
+        durations = []
         for frame in ImageSequence.Iterator(pil_image):
             frame_image: Image = frame.copy()
             duration: float = (
@@ -260,10 +256,28 @@ class AnimatedImage(LMAEComponent):
             if frame_image.mode != "RGBA":
                 frame_image = frame_image.convert("RGBA")
             images.append(frame_image)
-            # frame_image.save(f"frame_{index}.png")
-            self.sequence.add_frame(str(index), duration, False)
-            index = index + 1
+            durations.append(duration)
+        self.set_frames(images, durations)
 
+    def set_frames(self, images: SequenceABC[Image.Image], durations: list[float]):
+        """
+        Set the frames to animate, with how long to show each one.
+
+        :param images: The frames, in RGBA mode. Any sequence of images will do, such as
+            `StreamingFrames`, which decodes them only when they are shown.
+        :param durations: The duration of each frame, in seconds
+        """
+        if self._streaming_frames is not None and self._streaming_frames is not images:
+            self._streaming_frames.close()
+            self._streaming_frames = None
+        self.sequence: AnimatedImageSequence = AnimatedImageSequence(
+            name=self.name + "_Sequence",
+            actor=self.multi_frame_image,
+            repeat=self.repeat,
+        )
+        self.sequence.reset_frame_info()
+        for index, duration in enumerate(durations):
+            self.sequence.add_frame(str(index), duration, False)
         self.sequence.compute_aggregated_times()
 
         self.multi_frame_image = MultiFrameImage(
@@ -271,10 +285,32 @@ class AnimatedImage(LMAEComponent):
         )
         self.sequence.actor = self.multi_frame_image
 
-    def set_from_file(self, file_name: str):
+    def set_from_file(self, file_name: str, streaming: bool = False, compact: bool = True):
+        """
+        Set the frames from an animated image file.
+
+        :param file_name: The image file path
+        :param streaming: Whether to decode frames only as they are shown, keeping a few
+            in memory, rather than decoding them all now. Use this for long or large animations.
+        :param compact: Whether to store decoded frames compactly, when not streaming
+        """
+        if streaming:
+            frames = StreamingFrames(file_name)
+            self.set_frames(frames, frames.durations)
+            self._streaming_frames = frames
+            return
         with Image.open(file_name) as image:
             image.load()
-            self.set_from_pil_image(image)
+            self.set_from_pil_image(image, compact=compact)
+
+    def close(self) -> None:
+        """
+        Close the file that frames are streamed from, if any, and stop decoding ahead.
+        Call this when the image won't be shown again.
+        """
+        if self._streaming_frames is not None:
+            self._streaming_frames.close()
+            self._streaming_frames = None
 
     def get_animations(self) -> list[Animation]:
         return [self.sequence]
@@ -291,3 +327,226 @@ class AnimatedImage(LMAEComponent):
         super().set_position(position)
         if self.multi_frame_image:
             self.multi_frame_image.set_position(position)
+
+
+class FrameStrip:
+    """
+    One baked period of an animated actor: the distinct frames stacked vertically in a
+    single RGBA image, and a map from each frame time step to a row of the strip.
+    """
+
+    def __init__(self, image: Image.Image, frame_size: tuple[int, int], frame_map: list[int]):
+        self.image = image
+        self.frame_size = frame_size
+        self.frame_map = frame_map
+
+    @property
+    def nbytes(self) -> int:
+        return self.image.width * self.image.height * 4
+
+    def source_box(self, step: int) -> tuple[int, int, int, int]:
+        """
+        :param step: The frame time step within the period
+        :return: the box within the strip image that holds the frame for that step
+        """
+        top = self.frame_map[step % len(self.frame_map)] * self.frame_size[1]
+        return 0, top, self.frame_size[0], top + self.frame_size[1]
+
+
+class FrameStripCache:
+    """
+    A cache of baked frame strips, bounded by total pixel memory and evicted
+    least-recently-used first.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        """
+        :param max_bytes: The most memory, in bytes, that the cached strips may occupy
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._strips: OrderedDict[Hashable, FrameStrip] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._strips)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._strips
+
+    def get(self, key: Hashable) -> FrameStrip | None:
+        strip = self._strips.get(key)
+        if strip is not None:
+            self._strips.move_to_end(key)
+        return strip
+
+    def put(self, key: Hashable, strip: FrameStrip) -> None:
+        if key in self._strips:
+            self.total_bytes -= self._strips.pop(key).nbytes
+        self._strips[key] = strip
+        self.total_bytes += strip.nbytes
+        # never evict the strip we just added, even if it is over budget on its own
+        while self.total_bytes > self.max_bytes and len(self._strips) > 1:
+            _, evicted = self._strips.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        self._strips.clear()
+        self.total_bytes = 0
+
+
+frame_strip_cache = FrameStripCache()
+
+
+class _StripPlayback(Animation):
+    """
+    Steps a baked loop through its frame strip based on elapsed time.
+    """
+
+    def __init__(self, baked: BakedLoop, name: str | None = None):
+        name = name or _get_sequential_name("StripPlayback")
+        super().__init__(actor=baked, name=name, duration=baked.period, repeat=True)
+        self.baked = baked
+
+    def is_finished(self) -> bool:
+        return self.get_simulated_time() > self.duration
+
+    def update_actor(self, current_time: float):
+        elapsed_time = min(self.get_elapsed_time(current_time), self.duration)
+        self.baked.set_step(int(elapsed_time * self.baked.frame_rate))
+        self.set_update_time(current_time)
+
+
+class BakedLoop(LMAEComponent):
+    """
+    Plays back an actor and its looping animations from a pre-rendered frame strip.
+
+    The first time it is needed (or ahead of time, by calling ``bake()``), one period of
+    the actor's animations is simulated at a fixed frame rate and each frame is captured
+    from the given bounds. After that, playback just composites the right part of the strip,
+    with no per-frame work by the actor or its animations. Identical frames are stored once,
+    so still stretches such as a carousel's dwell time cost almost nothing.
+
+    The animations must be deterministic functions of time that loop over the period.
+    The actor's position and visibility are restored after baking. The baked actor and its
+    animations should not be added to the stage themselves. Strips are shared between baked
+    loops with the same key, through a memory-bounded LRU cache. Loops hold only the key,
+    and look the strip up each time they are drawn, so an evicted strip's memory is freed;
+    it is baked again if it is needed again.
+    """
+
+    def __init__(
+        self,
+        actor: Actor,
+        period: float,
+        key: Hashable,
+        animations: list[Animation] | None = None,
+        name: str | None = None,
+        bounds: tuple[int, int, int, int] = (0, 0, 64, 32),
+        frame_rate: float = 30.0,
+        cache: FrameStripCache | None = None,
+    ):
+        """
+        Initialize a baked loop
+
+        :param actor: The actor to bake
+        :param period: The length of one loop of the animations, in seconds
+        :param key: Identifies the baked content in the cache. Loops that use the same key
+            must render identically.
+        :param animations: The animations to bake. Defaults to the actor's own animations,
+            if it is a component.
+        :param name: The name of this baked loop
+        :param bounds: The area of the stage to capture, as (left, top, right, bottom),
+            exclusive of the right and bottom edges
+        :param frame_rate: The number of frames per second to bake
+        :param cache: The frame strip cache to use. Defaults to the shared cache.
+        """
+        name = name or _get_sequential_name("BakedLoop")
+        super().__init__(name=name, position=(bounds[0], bounds[1]))
+        self.actor = actor
+        if animations is None:
+            animations = actor.get_animations() if isinstance(actor, LMAEComponent) else []
+        self.source_animations = animations
+        self.period = period
+        self.key = key
+        self.bounds = bounds
+        self.size = (bounds[2] - bounds[0], bounds[3] - bounds[1])
+        self.frame_rate = frame_rate
+        self.cache = cache if cache is not None else frame_strip_cache
+        self.step = 0
+        self.playback = _StripPlayback(self, name=f"{name}_Playback")
+
+    def get_animations(self) -> list[Animation]:
+        return [self.playback]
+
+    def set_step(self, step: int) -> None:
+        if step != self.step:
+            self.step = step
+            self.changes_since_last_render = True
+
+    def bake(self) -> FrameStrip:
+        """
+        Get the frame strip for this loop, rendering it if it is not already cached.
+        :return: the frame strip
+        """
+        strip = self.cache.get(self.key)
+        if strip is None:
+            strip = self._render_strip()
+            self.cache.put(self.key, strip)
+        return strip
+
+    def _render_strip(self) -> FrameStrip:
+        frame_count = max(1, round(self.period * self.frame_rate))
+        self.logger.debug(f"Baking {frame_count} frames")
+        canvas = Canvas(
+            name=f"{self.name}_bake_Canvas",
+            size=(self.bounds[2], self.bounds[3]),
+            background_fill=False,
+        )
+        for anim in self.source_animations:
+            anim.reset()
+        initial_position = self.actor.position
+        initial_visible = self.actor.visible
+
+        # simulate the stage's frame loop, with a synthetic clock
+        start_time = 1.0
+        frames: list[Image.Image] = []
+        frame_indices: dict[bytes, int] = {}
+        frame_map: list[int] = []
+        for step in range(frame_count):
+            current_time = start_time + step / self.frame_rate
+            for anim in self.source_animations:
+                if not anim.is_started():
+                    anim.start(current_time)
+                anim.update_actor(current_time)
+                anim.last_update_time = current_time
+            self.actor.update()
+            canvas.blank()
+            if self.actor.visible:
+                self.actor.render(canvas)
+            self.actor.changes_since_last_render = False
+            frame = canvas.image.crop(self.bounds)
+            frame_bytes = frame.tobytes()
+            if frame_bytes not in frame_indices:
+                frame_indices[frame_bytes] = len(frames)
+                frames.append(frame)
+            frame_map.append(frame_indices[frame_bytes])
+            for anim in self.source_animations:
+                _retain_animation(anim)
+
+        for anim in self.source_animations:
+            anim.reset()
+        self.actor.set_position(initial_position)
+        self.actor.set_visible(initial_visible)
+
+        strip_image = Image.new("RGBA", (self.size[0], self.size[1] * len(frames)))
+        for index, frame in enumerate(frames):
+            strip_image.paste(frame, (0, index * self.size[1]))
+        self.logger.debug(f"Baked {len(frames)} distinct frames")
+        return FrameStrip(strip_image, self.size, frame_map)
+
+    def render(self, canvas: Canvas):
+        strip = self.bake()
+        canvas.image.alpha_composite(
+            strip.image, dest=self.position, source=strip.source_box(self.step)
+        )
+        self.changes_since_last_render = False
@@ -1,11 +1,16 @@
 import argparse
+import asyncio
 import logging
+import os
 import time
 from abc import ABC, abstractmethod
-from typing import cast
+from collections.abc import Callable
+from typing import Any, cast
 
 from PIL import Image, ImageDraw
 
+from lmae.sinks import FrameSink
+
 try:
     from rgbmatrix import RGBMatrix, RGBMatrixOptions  # pyright: ignore[reportAttributeAccessIssue]
 except ImportError:
@@ -17,6 +22,9 @@ logger.setLevel(logging.INFO)
 
 _current_sequence: dict[str, int] = {}
 
+# how many colors a canvas remembers the drawing ink of
+MAX_CACHED_INKS = 256
+
 
 def _get_sequential_name(class_name: str = "Object") -> str:
     if class_name not in _current_sequence:
@@ -54,15 +62,75 @@ class Canvas(LMAEObject):
         # self.logger.debug(f"Background fill: {self.background_fill}")
         self.image = Image.new("RGBA", self.size, (0, 0, 0, 255 if background_fill else 0))
         self.image_draw = ImageDraw.Draw(self.image)
+        # drawing goes straight to the images' core, as Pillow's own ImageDraw does, since
+        # the public image methods allocate on every call
+        self._bounds = (0, 0, *self.size)
+        self._blank_color = (0, 0, 0, 255 if background_fill else 0)
+        self._inks: dict[tuple[int, ...], int] = {}
+        self._scratch: dict[tuple[int, int], Image.Image] = {}
         self.blank()
 
     def blank(self):
-        # draw = ImageDraw.Draw(self.image)
-        self.image_draw.rectangle(
-            ((0, 0), (self.size[0] - 1, self.size[1] - 1)),
-            fill=(0, 0, 0, 255 if self.background_fill else 0),
-            width=1,
-        )
+        self.image.im.paste(self._blank_color, self._bounds)
+
+    def _ink(self, color: tuple[int, ...]) -> int:
+        ink = self._inks.get(color)
+        if ink is None:
+            if len(self._inks) >= MAX_CACHED_INKS:
+                self._inks.clear()
+            ink = self._inks[color] = self.image_draw.draw.draw_ink(color)
+        return ink
+
+    def draw_rectangle(
+        self,
+        xy: tuple[int, int, int, int],
+        fill: tuple[int, ...] | None = None,
+        outline: tuple[int, ...] | None = None,
+        width: int = 1,
+    ) -> None:
+        """
+        Draw a rectangle, as `ImageDraw.rectangle()` does, without allocating once its
+        colors have been drawn before.
+
+        :param xy: The left, top, right and bottom of the rectangle, inclusive
+        :param fill: The fill color
+        :param outline: The outline color
+        :param width: The outline width
+        """
+        fill_ink = None if fill is None else self._ink(fill)
+        ink = None if outline is None else self._ink(outline)
+        if fill_ink is not None:
+            self.image_draw.draw.draw_rectangle(xy, fill_ink, 1)
+        if ink is not None and ink != fill_ink and width != 0:
+            self.image_draw.draw.draw_rectangle(xy, ink, 0, width)
+
+    def composite(
+        self, image: Image.Image, position: tuple[int, int], binary_alpha: bool = False
+    ) -> None:
+        """
+        Alpha composite an image onto this canvas in place, with the same result as
+        `Image.alpha_composite()`. Once an image of the same size has been composited before,
+        this allocates no Python objects, but Pillow's alpha compositing still allocates one
+        pixel buffer for its result each time, as big as the image.
+
+        :param image: The image, in RGBA mode
+        :param position: Where the image's top left corner goes
+        :param binary_alpha: Whether every pixel of the image is either fully opaque or
+            fully transparent, as with pixel fonts. On an opaque canvas, such images are
+            pasted through their alpha, which gives the same result and allocates nothing.
+        """
+        x, y = position
+        width, height = image.size
+        if binary_alpha and self.background_fill:
+            self.image.im.paste(image.im, (x, y, x + width, y + height), image.im)
+            return
+        background = self._scratch.get(image.size)
+        if background is None:
+            background = self._scratch[image.size] = Image.new("RGBA", image.size)
+        # composite over a copy of the canvas under the image, then paste the result back
+        background.im.paste(self.image.im, (-x, -y, self.size[0] - x, self.size[1] - y))
+        result = Image.core.alpha_composite(background.im, image.im)
+        self.image.im.paste(result, (x, y, x + width, y + height))
 
 
 class Actor(LMAEObject, ABC):
@@ -152,6 +220,10 @@ class Animation(LMAEObject, ABC):
         self.start_time: float = 0.0
         self.last_update_time: float = 0.0
         self.end_time: float = 0.0
+        # the template this animation was instantiated from, if any
+        self.template: AnimationTemplate | None = None
+        # the handle tracking this animation while it is on a stage, if any
+        self.handle: AnimationHandle | None = None
 
     def reset(self):
         self.started = False
@@ -159,6 +231,23 @@ class Animation(LMAEObject, ABC):
         self.last_update_time = 0.0
         self.end_time = 0.0
 
+    def reconfigure(self, actor: Actor, repeat: bool = False, duration: float = 1.0) -> None:
+        """
+        Set up a pooled instance again for a new actor and parameters, and reset it, so that
+        it behaves like a new instance constructed with them. Subclasses with parameters of
+        their own override this, with the same parameters and defaults as their constructor
+        (less the name, which is kept), and pass the base parameters on.
+
+        :param actor: The actor the animation applies to
+        :param repeat: Whether the animation repeats
+        :param duration: The duration of the animation, in seconds
+        """
+        self.actor = actor
+        self.repeat = repeat
+        self.duration = duration
+        self.handle = None
+        self.reset()
+
     def start(self, current_time: float):
         # self.logger.debug(f"Starting at {current_time}")
         self.started = True
@@ -215,6 +304,249 @@ class Animation(LMAEObject, ABC):
         self.last_update_time = current_time
 
 
+class AnimationHandle:
+    """
+    Tracks an animation that has been added to a stage, and reports when it is done.
+    An animation is done when it finishes, or when it is cancelled by being removed from
+    the stage before it finishes. Repeating animations only end by being cancelled.
+
+    Handles are awaitable from the stage's event loop. Awaiting returns `True` if the
+    animation finished, or `False` if it was cancelled::
+
+        finished = await stage.add_animation(sequence)
+    """
+
+    _PENDING = "PENDING"
+    _FINISHED = "FINISHED"
+    _CANCELLED = "CANCELLED"
+
+    def __init__(self, animation: Animation, stage: "Stage"):
+        self.animation = animation
+        self.stage = stage
+        self._state = AnimationHandle._PENDING
+        self._callbacks: list[Callable[[AnimationHandle], None]] = []
+        self._future: asyncio.Future[bool] | None = None
+
+    def done(self) -> bool:
+        """
+        :return: `True` if the animation has finished or was cancelled
+        """
+        return self._state != AnimationHandle._PENDING
+
+    def cancelled(self) -> bool:
+        """
+        :return: `True` if the animation was removed from the stage before it finished
+        """
+        return self._state == AnimationHandle._CANCELLED
+
+    def cancel(self) -> bool:
+        """
+        Remove the animation from its stage, leaving its actor as it is now.
+        :return: `True` if the animation was cancelled, `False` if it was already done
+        """
+        if self.done():
+            return False
+        self.stage.remove_animation(self.animation)
+        return True
+
+    def add_done_callback(self, callback: Callable[["AnimationHandle"], None]) -> None:
+        """
+        Add a function to be called with this handle when the animation is done.
+        If it is already done, the function is called right away.
+        :param callback: The function to call
+        """
+        if self.done():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _complete(self, cancelled: bool) -> None:
+        if self.done():
+            return
+        self._state = AnimationHandle._CANCELLED if cancelled else AnimationHandle._FINISHED
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                self.animation.logger.exception("Exception in animation done callback")
+        if self._future is not None and not self._future.done():
+            self._future.set_result(not cancelled)
+
+    def __await__(self):
+        if not self.done():
+            if self._future is None:
+                self._future = asyncio.get_running_loop().create_future()
+            return (yield from self._future.__await__())
+        return not self.cancelled()
+
+
+class TemplateParameter:
+    """
+    A placeholder in an animation template, filled in from the overrides given
+    when the template is instantiated. Placeholders may appear anywhere in a tree
+    of nested templates, so a single set of overrides can parameterize a whole sequence.
+    """
+
+    _NO_DEFAULT = object()
+
+    def __init__(self, key: str, default: Any = _NO_DEFAULT):
+        """
+        Create a template parameter
+
+        :param key: The name of the override that supplies this value
+        :param default: Value to use if no override is supplied. If omitted, the
+            override is required.
+        """
+        self.key = key
+        self.default = default
+
+    def resolve(self, values: dict[str, Any]) -> Any:
+        if self.key in values:
+            return values[self.key]
+        if self.default is TemplateParameter._NO_DEFAULT:
+            raise KeyError(f"No value supplied for template parameter '{self.key}'")
+        return self.default
+
+
+class ActorMethod:
+    """
+    A placeholder in an animation template for a method of the target actor, such as
+    the color callback of a hue fade. The method is bound when the template is instantiated.
+    """
+
+    def __init__(self, method_name: str):
+        """
+        :param method_name: The name of the method on the target actor, e.g. ``"set_color"``
+        """
+        self.method_name = method_name
+
+    def resolve(self, actor: Actor) -> Callable:
+        return getattr(actor, self.method_name)
+
+
+class AnimationTemplate(LMAEObject):
+    """
+    A reusable definition of an animation. A template is defined once, and then
+    instantiated against a target actor with parameter overrides.
+
+    Parameter values may be nested templates (or lists of them, e.g. the animations of a
+    sequence), ``TemplateParameter`` placeholders, or ``ActorMethod`` placeholders.
+    Nested templates target the same actor as their parent, unless they bind an ``actor``
+    parameter of their own.
+
+    Finished instances are handed back with ``release()``, which the stage does automatically
+    when a templated animation finishes or is cleared. Released instances are pooled, and
+    set up again with ``Animation.reconfigure()`` rather than reallocated the next time the
+    template is instantiated.
+    Because of that, callers must not hold on to an instance after it has been released.
+    """
+
+    def __init__(
+        self,
+        animation_class: type[Animation],
+        name: str | None = None,
+        max_pool_size: int = 8,
+        **params: Any,
+    ):
+        """
+        Define an animation template
+
+        :param animation_class: The animation class to instantiate
+        :param name: Optional name for this template. It is also used as the name of
+            every instance, so instances don't each create their own logger.
+        :param max_pool_size: The most released instances to keep for reuse
+        :param params: Keyword arguments for the animation class constructor
+        """
+        super().__init__(name=name or _get_sequential_name(f"{animation_class.__name__}Template"))
+        self.animation_class = animation_class
+        self.instance_name = name
+        self.max_pool_size = max_pool_size
+        self.params = params
+        self.created_count = 0
+        self._pool: list[Animation] = []
+        self.placeholder_keys: set[str] = set()
+        self._collect_placeholder_keys(params.values())
+
+    def _collect_placeholder_keys(self, values) -> None:
+        for value in values:
+            if isinstance(value, TemplateParameter):
+                self.placeholder_keys.add(value.key)
+            elif isinstance(value, AnimationTemplate):
+                self.placeholder_keys.update(value.placeholder_keys)
+            elif isinstance(value, list):
+                self._collect_placeholder_keys(value)
+
+    def pool_size(self) -> int:
+        """
+        :return: the number of released instances waiting to be reused
+        """
+        return len(self._pool)
+
+    def instantiate(self, actor: Actor, **overrides: Any) -> Animation:
+        """
+        Create an animation from this template, reusing a pooled instance if one is available.
+
+        :param actor: The actor the animation applies to
+        :param overrides: Values that fill in ``TemplateParameter`` placeholders here and in
+            nested templates. Any other override is passed to this template's animation
+            constructor, replacing the template parameter of the same name.
+        :return: the animation, ready to be added to a stage
+        """
+        param_overrides = {
+            key: value for key, value in overrides.items() if key not in self.placeholder_keys
+        }
+        return self._instantiate(actor, param_overrides, overrides)
+
+    def _instantiate(
+        self, actor: Actor, param_overrides: dict[str, Any], placeholder_values: dict[str, Any]
+    ) -> Animation:
+        params = dict(self.params)
+        params.update(param_overrides)
+        actor = params.pop("actor", actor)
+        kwargs = {
+            key: self._resolve(value, actor, placeholder_values) for key, value in params.items()
+        }
+
+        if self._pool:
+            animation = self._pool.pop()
+            animation.reconfigure(actor, **kwargs)
+        else:
+            name = self.instance_name or _get_sequential_name(self.animation_class.__name__)
+            animation = self.animation_class(actor=actor, name=name, **kwargs)  # type: ignore[call-arg]
+            self.created_count += 1
+        animation.template = self
+        return animation
+
+    def _resolve(self, value: Any, actor: Actor, placeholder_values: dict[str, Any]) -> Any:
+        if isinstance(value, AnimationTemplate):
+            return value._instantiate(actor, {}, placeholder_values)
+        if isinstance(value, TemplateParameter):
+            return value.resolve(placeholder_values)
+        if isinstance(value, ActorMethod):
+            return value.resolve(actor)
+        if isinstance(value, list):
+            return [self._resolve(item, actor, placeholder_values) for item in value]
+        return value
+
+    def release(self, animation: Animation) -> None:
+        """
+        Hand a finished instance back to this template, along with any templated
+        child animations it contains. The instance is reset and pooled for reuse.
+
+        :param animation: An animation previously returned by ``instantiate()``
+        """
+        if animation.template is not self:
+            raise ValueError(f"Animation {animation.name} was not instantiated from {self.name}")
+        animation.template = None
+        for child in cast(list[Animation], getattr(animation, "animations", [])):
+            if child.template is not None:
+                child.template.release(child)
+        animation.reset()
+        if len(self._pool) < self.max_pool_size:
+            self._pool.append(animation)
+
+
 def _retain_animation(anim: Animation) -> bool:
     """
     Determine whether this animation should be kept in the list or not,
@@ -235,6 +567,14 @@ class Stage(LMAEObject):
 
     Rendering to the canvas is double-buffered, to avoid seeing intermediate renders on
     the LED matrix.
+
+    Each frame shown on the matrix is also presented to the stage's frame sinks, such as
+    recorders and viewers. Wrap slow sinks in a `QueuedSink`, so that they don't delay the
+    matrix.
+
+    In steady state, rendering a frame allocates no Python objects: buffers are reused from
+    frame to frame, including the frame image itself, so anything that keeps a frame must copy
+    it. Compositing images with partial transparency still allocates a pixel buffer each time.
     """
 
     def __init__(
@@ -245,6 +585,8 @@ class Stage(LMAEObject):
         animations: list[Animation] | None = None,
         matrix: RGBMatrix | None = None,
         matrix_options: RGBMatrixOptions | None = None,
+        sinks: list[FrameSink] | None = None,
+        clock: Callable[[], float] | None = None,
     ):
         name = name or _get_sequential_name("Stage")
         super().__init__(name)
@@ -258,21 +600,54 @@ class Stage(LMAEObject):
             self.logger.warning("No matrix or matrix options were provided to the stage")
         else:
             self.double_buffer = self.matrix.CreateFrameCanvas()
+        self.sinks = sinks if sinks is not None else []
+        # the frame shown on the matrix, reused for each frame
+        self.frame = Image.new("RGB", self.size)
+        self._frame_box = (0, 0, *self.size)
         self.needs_render = True
+        self._clock = clock
+
+    def clock(self) -> float:
+        """
+        :return: the current time on this stage's clock, which animations are timed against.
+            Defaults to `time.perf_counter()`.
+        """
+        return self._clock() if self._clock else time.perf_counter()
 
-    def add_animation(self, animation: Animation):
+    def add_animation(self, animation: Animation) -> AnimationHandle:
         """
         Add an animation to this stage
         :param animation: the animation to add
+        :return: a handle that reports when the animation is done, and can be awaited
         """
         self.animations.append(animation)
+        animation.handle = AnimationHandle(animation, self)
+        return animation.handle
 
-    def add_animations(self, animations: list[Animation]):
+    def add_animations(self, animations: list[Animation]) -> list[AnimationHandle]:
         """
         Add a bunch of animations to this stage
         :param animations: a list of animations to add
+        :return: a list of handles for the animations, in the same order
+        """
+        return [self.add_animation(animation) for animation in animations]
+
+    async def play(self, animation: Animation) -> bool:
+        """
+        Add an animation to this stage, and wait until it is done.
+        :param animation: the animation to play
+        :return: `True` if the animation finished, `False` if it was cancelled
         """
-        self.animations.extend(animations)
+        return await self.add_animation(animation)
+
+    def remove_animation(self, animation: Animation) -> None:
+        """
+        Remove an animation from this stage, cancelling it if it has not finished
+        :param animation: the animation to remove
+        """
+        if animation in self.animations:
+            self.animations.remove(animation)
+            self._retire_animation(animation, cancelled=True)
 
     def get_animations_for(self, actor: Actor) -> list[Animation]:
         """
@@ -287,7 +662,21 @@ class Stage(LMAEObject):
         Remove animations for a particular actor
         :param actor: The actor for which we should remove animations
         """
-        self.animations = [anim for anim in self.animations if anim.actor != actor]
+        retained = []
+        for anim in self.animations:
+            if anim.actor != actor:
+                retained.append(anim)
+            else:
+                self._retire_animation(anim, cancelled=True)
+        self.animations = retained
+
+    def clear_animations(self) -> None:
+        """
+        Remove all animations from this stage
+        """
+        animations, self.animations = self.animations, []
+        for anim in animations:
+            self._retire_animation(anim, cancelled=True)
 
     def clear_animations_for_all(self, actors: list[Actor]):
         """
@@ -308,7 +697,7 @@ class Stage(LMAEObject):
         """
         Let all the actors update themselves, including applying animations
         """
-        current_time = time.perf_counter()
+        current_time = self.clock()
         # self.logger.debug(f"Current time: {current_time}")
 
         # run all the animations
@@ -349,16 +738,52 @@ class Stage(LMAEObject):
         Perform post-render activities.
         """
         # clean up finished animations
-        self.animations = [anim for anim in self.animations if _retain_animation(anim)]
+        if not self.animations:
+            return
+        # the list is only rebuilt on frames when an animation finishes
+        retained: list[Animation] | None = None
+        for index, anim in enumerate(self.animations):
+            if _retain_animation(anim):
+                if retained is not None:
+                    retained.append(anim)
+            else:
+                if retained is None:
+                    retained = self.animations[:index]
+                self._retire_animation(anim)
+        if retained is not None:
+            self.animations = retained
+
+    @staticmethod
+    def _retire_animation(anim: Animation, cancelled: bool = False) -> None:
+        """
+        Dispose of an animation that has been removed from the stage.
+        Its handle is completed, and templated animations are handed back
+        to their template for reuse.
+        :param anim: the animation
+        :param cancelled: `True` if the animation was removed before it finished
+        """
+        if anim.handle is not None:
+            handle, anim.handle = anim.handle, None
+            handle._complete(cancelled)
+        if anim.template is not None:
+            anim.template.release(anim)
 
     def display_frame(self):
         """
-        Swap out the rendered frame on a vertical sync
+        Swap out the rendered frame on a vertical sync, then present it to the frame sinks.
+        The frame image is reused for the next frame.
         :return:
         """
-        self.double_buffer.SetImage(self.canvas.image.convert("RGB"), 0, 0)
-        matrix = cast(RGBMatrix, self.matrix)  # avoids null typecheck
-        self.double_buffer = matrix.SwapOnVSync(self.double_buffer)
+        frame = self.frame
+        frame.im.paste(self.canvas.image.im, self._frame_box)
+        if self.matrix:
+            self.double_buffer.SetImage(frame, 0, 0)
+            matrix = cast(RGBMatrix, self.matrix)  # avoids null typecheck
+            self.double_buffer = matrix.SwapOnVSync(self.double_buffer)
+        if self.sinks:
+            timestamp = time.time()
+            for sink in self.sinks:
+                sink.present(frame, timestamp)
 
     def render_frame(self):
         """
@@ -382,6 +807,11 @@ class Stage(LMAEObject):
 
 
 virtual_leds = False
+headless_leds = False
+in_process_viewer = False
+record_path: str | None = None
+viewer_port: int | None = None
+gc_policy_name = "automatic"
 _have_parsed_matrix_options = False
 
 
@@ -537,6 +967,49 @@ def parse_matrix_options_command_line():
         help="Draw to virtual LED display on screen instead of real LED panel.",
         default=False,
     )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        dest="headless_leds",
+        help="Without a real LED panel, publish frames to shared memory instead of drawing "
+        "them on screen. Also set by the LMAE_HEADLESS environment variable.",
+        default=bool(os.environ.get("LMAE_HEADLESS")),
+    )
+    parser.add_argument(
+        "--in-process-viewer",
+        action="store_true",
+        dest="in_process_viewer",
+        help="Draw the virtual LED display in the app's own process, instead of in a "
+        "separate viewer process.",
+        default=False,
+    )
+    parser.add_argument(
+        "--record",
+        action="store",
+        dest="record_path",
+        help="Record the frames shown to a file, which lmae.sinks.read_frames() plays back.",
+        default=None,
+        type=str,
+    )
+    parser.add_argument(
+        "--viewer-port",
+        action="store",
+        dest="viewer_port",
+        help="Stream the frames shown to viewers that connect to this port on localhost, "
+        "e.g. with python -m lmae.viewer --port.",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--gc-policy",
+        action="store",
+        dest="gc_policy_name",
+        help="How to garbage collect: automatically as Python does, instrumented to log "
+        "collection pauses and the frame overruns they cause, or managed to also collect only "
+        "between frames. Also set by the LMAE_GC_POLICY environment variable.",
+        choices=["automatic", "instrumented", "managed"],
+        default=os.environ.get("LMAE_GC_POLICY", "automatic"),
+    )
     parser.set_defaults(drop_privileges=True)
 
     args = parser.parse_args()
@@ -557,6 +1030,16 @@ def parse_matrix_options_command_line():
     options.panel_type = args.led_panel_type
     global virtual_leds
     virtual_leds = args.virtual_leds
+    global headless_leds
+    headless_leds = args.headless_leds
+    global in_process_viewer
+    in_process_viewer = args.in_process_viewer
+    global record_path
+    record_path = args.record_path
+    global viewer_port
+    viewer_port = args.viewer_port
+    global gc_policy_name
+    gc_policy_name = args.gc_policy_name
 
     if args.led_show_refresh:
         options.show_refresh_rate = 1
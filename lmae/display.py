@@ -1,12 +1,26 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import os
+import subprocess
+import sys
 from enum import Enum, auto
 from typing import Literal, cast
 
-import pygame
 from PIL import Image
 
+from lmae.frame_ring import DEFAULT_RING_NAME, DEFAULT_SLOTS, FrameRing
+
+try:
+    import pygame
+except ImportError:
+    # the headless matrix works without pygame
+    pygame = None  # type: ignore[assignment]
+
+# marks where the LEDs show through the overlay that blacks out the gaps between them
+LED_COLOR_KEY = (255, 0, 255)
+
 
 class PixelShape(Enum):
     ROUND = auto()
@@ -88,6 +102,8 @@ class VirtualRGBMatrix:
     def __init__(self, options: VirtualRGBMatrixOptions):
         self.logger = logging.getLogger("VirtualRGBMatrix")
         self.logger.info("Initializing")
+        if pygame is None:
+            raise RuntimeError("The virtual LED display needs pygame; use HeadlessRGBMatrix")
         pygame.init()
         if not options:
             self.logger.error("Missing RGBMatrixOptions")
@@ -95,7 +111,9 @@ class VirtualRGBMatrix:
         self.matrix_options: VirtualRGBMatrixOptions = options
         self.window_specs = WindowSpecs(matrix_options=self.matrix_options)
         self._create_pygame_window()
+        self._prepare_led_rendering()
         pygame.display.update()
+        self._front_canvas = self.CreateFrameCanvas()
 
     def _create_pygame_window(self):
         width = self.window_specs.width
@@ -121,54 +139,190 @@ class VirtualRGBMatrix:
         return new_colors
 
     @staticmethod
-    def _get_image_pixel(image: Image.Image, x: int, y: int) -> tuple[int, int, int]:
-        if 0 <= x < image.size[0] and 0 <= y < image.size[1]:
-            pixel_value = cast(tuple[int, int, int], image.getpixel((x, y)))
-            return pixel_value
-        else:
-            return 0, 0, 0
+    def brightness_table(adjustment: float) -> list[int]:
+        """
+        Make a lookup table that adjusts brightness as `adjust_brightness()` does,
+        for use with `Image.point()` on an RGB image.
 
-    def SwapOnVSync(self, frame_canvas: VirtualFrameCanvas) -> VirtualFrameCanvas:
-        # draw the frame canvas to the window
-        image = cast(Image.Image, frame_canvas.image)
-        surface = pygame.display.get_surface()
+        :param adjustment: The brightness adjustment
+        :return: the 256 adjusted values of each band, for the three bands
+        """
+        levels = list(range(256))
+        adjusted = [
+            VirtualRGBMatrix.adjust_brightness((level, 0, 0), adjustment)[0] for level in levels
+        ]
+        return adjusted * 3
+
+    def _draw_led_stamp(self) -> Image.Image:
+        """
+        Draw one LED, in white, in a cell the size of the LED pitch, with the same drawing
+        calls that would draw it in place, and return its shape as an "L" mode mask.
+        """
         spacing = self.window_specs.led_pixel_spacing
         pix_size = self.window_specs.led_pixel_size
-        pixel_shape = self.window_specs.pixel_shape
         half_pixel = pix_size / 2
         pix_radius = pix_size - half_pixel
+        pitch = pix_size + spacing
+        cell = pygame.Surface((pitch, pitch))
+        cell.fill((0, 0, 0))
+        white = (255, 255, 255)
+        if self.window_specs.pixel_shape == PixelShape.ROUND:
+            pygame.draw.circle(
+                cell, white, (spacing + half_pixel, spacing + half_pixel), pix_radius
+            )
+        elif self.window_specs.pixel_shape == PixelShape.ROUND_RECT:
+            pygame.draw.rect(cell, white, (spacing, spacing, pix_size, pix_size), border_radius=3)
+        else:  # pixel_shape == PixelShape.SQUARE
+            pygame.draw.rect(cell, white, (spacing, spacing, pix_size, pix_size))
+        stamp = Image.frombytes("RGB", (pitch, pitch), pygame.image.tobytes(cell, "RGB"))
+        return stamp.convert("L").point(lambda level: 255 if level else 0)
 
-        # clear surface
+    def _prepare_led_rendering(self) -> None:
+        """
+        Precompute what drawing a frame needs: the brightness lookup table, and an overlay
+        that blacks out the gaps between LEDs, with the LED shape tiled across the display.
+        """
+        self._brightness_table = self.brightness_table(self.window_specs.brightness_adjustment)
+        stamp = self._draw_led_stamp()
+        cols, rows = self.matrix_options.cols, self.matrix_options.rows
+        row_mask = Image.new("L", (cols * stamp.width, stamp.height))
+        for x in range(cols):
+            row_mask.paste(stamp, (x * stamp.width, 0))
+        led_mask = Image.new("L", (row_mask.width, rows * stamp.height))
+        for y in range(rows):
+            led_mask.paste(row_mask, (0, y * stamp.height))
+
+        # the overlay is black, except where the LEDs are, which are see-through
+        overlay = Image.new("RGB", led_mask.size, (0, 0, 0))
+        overlay.paste(LED_COLOR_KEY, (0, 0, *led_mask.size), led_mask)
+        self._led_overlay = pygame.image.frombytes(overlay.tobytes(), overlay.size, "RGB")
+        self._led_overlay.set_colorkey(LED_COLOR_KEY)
+
+        surface = pygame.display.get_surface()
         surface.fill((0, 0, 0))
-        # pygame.draw.rect(surface, (0, 0, 0), (0, 0, self.matrix_options.rows))
-
-        # draw LED equivalents of image pixels
-        for y in range(0, self.matrix_options.rows):
-            offset_y = (pix_size + spacing) * y + spacing + self.window_specs.border_size
-            for x in range(0, self.matrix_options.cols):
-                offset_x = (pix_size + spacing) * x + spacing + self.window_specs.border_size
-                colors = self.adjust_brightness(
-                    colors=self._get_image_pixel(image, x, y),
-                    adjustment=self.window_specs.brightness_adjustment,
-                )
-                if pixel_shape == PixelShape.ROUND:
-                    pygame.draw.circle(
-                        surface,
-                        colors,
-                        (offset_x + half_pixel, offset_y + half_pixel),
-                        pix_radius,
-                    )
-                elif pixel_shape == PixelShape.ROUND_RECT:
-                    pygame.draw.rect(
-                        surface,
-                        colors,
-                        (offset_x, offset_y, pix_size, pix_size),
-                        border_radius=3,
-                    )
-                else:  # pixel_shape == PixelShape.SQUARE
-                    pygame.draw.rect(surface, colors, (offset_x, offset_y, pix_size, pix_size))
-
-        # swap it over
+        border = self.window_specs.border_size
+        self._led_area = surface.subsurface((border, border, *led_mask.size))
+        self._frame_image = Image.new("RGB", (cols, rows))
+
+    def SwapOnVSync(self, frame_canvas: VirtualFrameCanvas) -> VirtualFrameCanvas:
+        self.show_frame(cast(Image.Image, frame_canvas.image))
         pygame.event.get()  # discarding these for now
+        # like the LED matrix, hand back the canvas that was shown before, to draw on next
+        frame_canvas, self._front_canvas = self._front_canvas, frame_canvas
+        return frame_canvas
+
+    def show_frame(self, frame: Image.Image) -> None:
+        """
+        Draw a frame to the window as LEDs: brightness-adjust it, scale each pixel up
+        to an LED cell, then black out the gaps between LEDs.
+
+        :param frame: The frame
+        """
+        if frame.size != self._frame_image.size or frame.mode != "RGB":
+            # pixels beyond the frame are off
+            self._frame_image.paste((0, 0, 0), (0, 0, *self._frame_image.size))
+            self._frame_image.paste(frame.convert("RGB"), (0, 0))
+            frame = self._frame_image
+        frame = frame.point(self._brightness_table)
+        frame_surface = pygame.image.frombuffer(frame.tobytes(), frame.size, "RGB").convert()
+        pygame.transform.scale(frame_surface, self._led_area.get_size(), self._led_area)
+        self._led_area.blit(self._led_overlay, (0, 0))
         pygame.display.flip()
-        return self.CreateFrameCanvas()
+
+
+# noinspection PyPep8Naming,PyMethodMayBeStatic
+# we are mocking the method names from the rgbmatrix library
+class HeadlessRGBMatrix:
+    """
+    A stand-in for the LED matrix that draws nothing and needs no display or pygame.
+    Each presented frame is published to a shared memory frame ring, where viewers,
+    recorders, and tests in other processes can read it.
+    """
+
+    def __init__(
+        self,
+        options: VirtualRGBMatrixOptions,
+        ring_name: str | None = None,
+        slots: int = DEFAULT_SLOTS,
+    ):
+        """
+        :param options: The matrix options, for the display size
+        :param ring_name: The shared memory name to publish frames under. Defaults to the
+            `LMAE_FRAME_RING` environment variable, or "lmae-frames".
+        :param slots: How many frames the ring holds
+        """
+        self.logger = logging.getLogger(type(self).__name__)
+        self.matrix_options = options
+        self.width = options.cols
+        self.height = options.rows
+        name = ring_name or os.environ.get("LMAE_FRAME_RING") or DEFAULT_RING_NAME
+        self.frame_ring = FrameRing.create((self.width, self.height), name=name, slots=slots)
+        self.logger.info(f"Publishing {self.width} x {self.height} frames to {name}")
+        self._frame_image = Image.new("RGB", (self.width, self.height))
+        self._front_canvas = self.CreateFrameCanvas()
+
+    def CreateFrameCanvas(self) -> VirtualFrameCanvas:
+        return VirtualFrameCanvas()
+
+    def SwapOnVSync(self, frame_canvas: VirtualFrameCanvas) -> VirtualFrameCanvas:
+        frame = cast(Image.Image, frame_canvas.image)
+        if frame.size != self._frame_image.size or frame.mode != "RGB":
+            # pixels beyond the frame are off
+            self._frame_image.paste((0, 0, 0), (0, 0, *self._frame_image.size))
+            self._frame_image.paste(frame.convert("RGB"), (0, 0))
+            frame = self._frame_image
+        self.frame_ring.publish(frame)
+        # like the LED matrix, hand back the canvas that was shown before, to draw on next
+        frame_canvas, self._front_canvas = self._front_canvas, frame_canvas
+        return frame_canvas
+
+    def close(self) -> None:
+        """
+        Stop publishing frames, and remove the frame ring.
+        """
+        self.frame_ring.close()
+
+
+class ViewerRGBMatrix(HeadlessRGBMatrix):
+    """
+    A virtual LED display drawn by a separate viewer process, so that drawing the window
+    and handling its events never compete with rendering. Frames are published to a shared
+    memory frame ring, which the viewer reads at its own pace, skipping frames if it falls
+    behind rather than slowing down the app.
+    """
+
+    def __init__(
+        self,
+        options: VirtualRGBMatrixOptions,
+        ring_name: str | None = None,
+        slots: int = DEFAULT_SLOTS,
+    ):
+        """
+        :param options: The matrix options, for the display size
+        :param ring_name: The shared memory name to publish frames under. Defaults to a
+            name unique to this process.
+        :param slots: How many frames the ring holds
+        """
+        super().__init__(options, ring_name=ring_name or f"lmae-frames-{os.getpid()}", slots=slots)
+        # make sure the viewer imports this same lmae package
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        python_path = os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")]))
+        self.viewer = subprocess.Popen(
+            [sys.executable, "-m", "lmae.viewer", "--ring", self.frame_ring.name],
+            env={**os.environ, "PYTHONPATH": python_path},
+        )
+        self.logger.info(f"Started viewer process {self.viewer.pid}")
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        """
+        Stop the viewer process, and remove the frame ring.
+        """
+        atexit.unregister(self.close)
+        if self.viewer.poll() is None:
+            self.viewer.terminate()
+            try:
+                self.viewer.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.viewer.kill()
+        super().close()
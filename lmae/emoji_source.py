@@ -0,0 +1,365 @@
+import io
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterable
+
+from PIL import Image
+from PIL.Image import Image as PILImage
+from pilmoji.helpers import NodeType, to_nodes
+from pilmoji.source import BaseSource, MicrosoftEmojiSource
+
+logger = logging.getLogger("lmae.emoji_source")
+
+# where downloaded emoji images are kept, in a subdirectory per emoji style
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "lmae", "emoji")
+
+# how long to wait before fetching an emoji again after fetching it failed, in seconds
+FETCH_RETRY_DELAY = 60.0
+
+
+def find_emoji(strings: Iterable[str]) -> list[str]:
+    """
+    Find the emoji in some strings.
+
+    :param strings: The strings to search
+    :return: each emoji found, once, in the order found
+    """
+    found: dict[str, None] = {}
+    for string in strings:
+        for line in to_nodes(string):
+            for node in line:
+                if node.type is NodeType.emoji:
+                    found[node.content] = None
+    return list(found)
+
+
+def _encode_png(image: PILImage) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class CachedEmojiSource(BaseSource):
+    """
+    An emoji image source that keeps the images from another source in memory and on disk.
+
+    Each emoji is fetched from the upstream source at most once, then read from the disk
+    cache in later runs. Drawing never waits on the network: an emoji that isn't cached
+    when it is drawn is fetched on a background thread, and isn't drawn until the fetch
+    finishes. In offline mode, or when the upstream source has no image for an emoji,
+    emoji that aren't cached are not drawn. When fetching fails, e.g. during a network
+    outage, the emoji isn't drawn either, and it is fetched again after
+    `FETCH_RETRY_DELAY` seconds rather than every frame.
+    Use `prefetch()` to fill the cache ahead of time for strings that will be shown;
+    it waits for the fetches, and retries failed emoji straight away.
+    """
+
+    def __init__(
+        self,
+        source: BaseSource | type[BaseSource] = MicrosoftEmojiSource,
+        cache_dir: str | None = None,
+        offline: bool = False,
+    ):
+        """
+        Create a cached emoji source
+
+        :param source: The upstream source, or its class
+        :param cache_dir: The directory to cache images in. Defaults to a subdirectory of
+            `DEFAULT_CACHE_DIR` named for the upstream source's emoji style.
+        :param offline: If True, never fetch from the upstream source
+        """
+        self.source = source() if isinstance(source, type) else source
+        style = getattr(self.source, "STYLE", None) or type(self.source).__name__
+        self.cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_DIR, style)
+        self.offline = offline
+        self._images: dict[str, bytes | None] = {}
+        # when fetching each emoji last failed, by emoji
+        self._failures: dict[str, float] = {}
+        # emoji waiting to be fetched in the background, and the thread that fetches them
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def _cache_path(self, emoji: str) -> str:
+        name = "-".join(f"{ord(char):x}" for char in emoji)
+        return os.path.join(self.cache_dir, f"{name}.png")
+
+    def get_emoji_bytes(self, emoji: str, retry: bool = False, wait: bool = True) -> bytes | None:
+        """
+        Get the encoded image of an emoji, from memory, disk, or the upstream source.
+
+        :param emoji: The emoji
+        :param retry: If True, fetch an emoji whose fetch failed without waiting for
+            the retry delay
+        :param wait: If False, don't wait for the upstream source: fetch the emoji in
+            the background instead, and return None until it has been fetched
+        :return: the image data, or None if it isn't available
+        """
+        if emoji in self._images:
+            return self._images[emoji]
+        failed_at = self._failures.get(emoji)
+        if failed_at is not None and not retry and time.monotonic() - failed_at < FETCH_RETRY_DELAY:
+            return None
+
+        data = None
+        path = self._cache_path(emoji)
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                data = file.read()
+        elif not self.offline:
+            if not wait:
+                self._fetch_in_background(emoji)
+                return None
+            try:
+                data = self._fetch(emoji)
+            except Exception as e:
+                # not remembered for good, so that it's fetched again once the network is back
+                logger.warning(f"Could not fetch emoji {emoji!r} from {self.source}: {e}")
+                self._failures[emoji] = time.monotonic()
+                return None
+            if data:
+                self._store(path, data)
+        self._failures.pop(emoji, None)
+        self._images[emoji] = data
+        return data
+
+    def _fetch_in_background(self, emoji: str) -> None:
+        with self._lock:
+            if emoji in self._pending:
+                return
+            self._pending.add(emoji)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._fetch_pending, name=f"fetch-{self.source}", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(emoji)
+
+    def _fetch_pending(self) -> None:
+        while True:
+            emoji = self._queue.get()
+            try:
+                self.get_emoji_bytes(emoji)
+            finally:
+                with self._lock:
+                    self._pending.discard(emoji)
+                self._queue.task_done()
+
+    def is_pending(self, emoji: str) -> bool:
+        """
+        :param emoji: The emoji
+        :return: whether the emoji is waiting to be fetched in the background
+        """
+        return emoji in self._pending
+
+    def wait_for_fetches(self) -> None:
+        """
+        Wait until every emoji queued to be fetched in the background has been fetched.
+        """
+        self._queue.join()
+
+    def _fetch(self, emoji: str) -> bytes | None:
+        stream = self.source.get_emoji(emoji)
+        if not stream:
+            logger.warning(f"No image for emoji {emoji!r} from {self.source}")
+            return None
+        return stream.getvalue()
+
+    def _store(self, path: str, data: bytes) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # write then rename, so that an interrupted write doesn't leave a broken file
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache emoji image at {path}: {e}")
+
+    def get_emoji(self, emoji: str, /) -> io.BytesIO | None:
+        data = self.get_emoji_bytes(emoji, wait=False)
+        return io.BytesIO(data) if data else None
+
+    def get_discord_emoji(self, id: int, /) -> io.BytesIO | None:
+        # Discord emoji aren't cached, so they are never drawn
+        return None
+
+    def prefetch(self, strings: Iterable[str]) -> list[str]:
+        """
+        Fetch and cache the images of every emoji in some strings, ahead of rendering them.
+
+        :param strings: The strings that will be shown
+        :return: the emoji that could not be fetched
+        """
+        return [
+            emoji
+            for emoji in find_emoji(strings)
+            if self.get_emoji_bytes(emoji, retry=True) is None
+        ]
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.source!r} at {self.cache_dir}>"
+
+
+_shared_sources: dict[type[BaseSource], CachedEmojiSource] = {}
+
+
+def get_cached_emoji_source(source_class: type[BaseSource]) -> CachedEmojiSource:
+    """
+    Get the shared cached source for an upstream emoji source class, creating it if needed.
+
+    :param source_class: The upstream source class, e.g. `MicrosoftEmojiSource`
+    :return: the cached source
+    """
+    source = _shared_sources.get(source_class)
+    if source is None:
+        source = _shared_sources[source_class] = CachedEmojiSource(source_class)
+    return source
+
+
+class EmojiAtlas:
+    """
+    Emoji images already scaled to the widths they are drawn at, so that drawing them
+    needs no download and no resampling. An atlas can be built once, saved as a single
+    image with an index beside it, and loaded at startup.
+    """
+
+    def __init__(self):
+        self.images: dict[tuple[str, int], PILImage] = {}
+        self._encoded: dict[tuple[str, int], bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    def add(self, emoji: str, width: int, image: PILImage) -> None:
+        """
+        Add an emoji image, scaling it to a width if it isn't already that width.
+
+        :param emoji: The emoji
+        :param width: The width it will be drawn at, in pixels
+        :param image: The emoji image, at any size
+        """
+        image = image.convert("RGBA")
+        if image.width != width:
+            # the same scaling that Pilmoji applies when drawing
+            height = math.ceil(image.height / image.width * width)
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        self.images[(emoji, width)] = image
+        self._encoded.pop((emoji, width), None)
+
+    def get(self, emoji: str, width: int) -> PILImage | None:
+        """
+        :param emoji: The emoji
+        :param width: The width it will be drawn at, in pixels
+        :return: the scaled image, or None if the atlas doesn't have it
+        """
+        return self.images.get((emoji, width))
+
+    def get_bytes(self, emoji: str, width: int) -> bytes | None:
+        """
+        :param emoji: The emoji
+        :param width: The width it will be drawn at, in pixels
+        :return: the scaled image, encoded as PNG, or None if the atlas doesn't have it
+        """
+        key = (emoji, width)
+        data = self._encoded.get(key)
+        if data is None and key in self.images:
+            data = self._encoded[key] = _encode_png(self.images[key])
+        return data
+
+    @classmethod
+    def build(
+        cls, source: CachedEmojiSource, strings: Iterable[str], widths: Iterable[int]
+    ) -> "EmojiAtlas":
+        """
+        Build an atlas of the emoji in some strings, at the widths they will be drawn at.
+
+        :param source: Where to get the emoji images
+        :param strings: The strings that will be shown
+        :param widths: The widths to scale each emoji to, in pixels
+        :return: the atlas
+        """
+        atlas = cls()
+        widths = list(widths)
+        for emoji in find_emoji(strings):
+            data = source.get_emoji_bytes(emoji)
+            if not data:
+                continue
+            with Image.open(io.BytesIO(data)) as image:
+                for width in widths:
+                    atlas.add(emoji, width, image)
+        return atlas
+
+    def save(self, path: str) -> None:
+        """
+        Save the atlas as one PNG image at `path`, with a JSON index at `path` + ".json".
+
+        :param path: Where to save the atlas image
+        """
+        keys = sorted(self.images)
+        width = max((self.images[key].width for key in keys), default=1)
+        height = max(sum(self.images[key].height for key in keys), 1)
+        sheet = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        index = []
+        top = 0
+        for emoji, emoji_width in keys:
+            image = self.images[(emoji, emoji_width)]
+            sheet.paste(image, (0, top))
+            index.append(
+                {
+                    "emoji": emoji,
+                    "width": emoji_width,
+                    "box": [0, top, image.width, top + image.height],
+                }
+            )
+            top += image.height
+        sheet.save(path, format="PNG")
+        with open(f"{path}.json", "w") as file:
+            json.dump(index, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "EmojiAtlas":
+        """
+        Load an atlas saved with `save()`.
+
+        :param path: The path of the atlas image
+        :return: the atlas
+        """
+        atlas = cls()
+        with open(f"{path}.json") as file:
+            index = json.load(file)
+        with Image.open(path) as sheet:
+            sheet = sheet.convert("RGBA")
+            for entry in index:
+                atlas.images[(entry["emoji"], entry["width"])] = sheet.crop(tuple(entry["box"]))
+        return atlas
+
+
+class AtlasEmojiSource(BaseSource):
+    """
+    An emoji source that serves images from an atlas at one width, and falls back to
+    another source for emoji the atlas doesn't have.
+    """
+
+    def __init__(self, atlas: EmojiAtlas, width: int, fallback: BaseSource):
+        """
+        :param atlas: The atlas
+        :param width: The width that emoji will be drawn at, in pixels
+        :param fallback: Where to get emoji that the atlas doesn't have
+        """
+        self.atlas = atlas
+        self.width = width
+        self.fallback = fallback
+
+    def get_emoji(self, emoji: str, /) -> io.BytesIO | None:
+        data = self.atlas.get_bytes(emoji, self.width)
+        return io.BytesIO(data) if data else self.fallback.get_emoji(emoji)
+
+    def get_discord_emoji(self, id: int, /) -> io.BytesIO | None:
+        return self.fallback.get_discord_emoji(id)
@@ -0,0 +1,179 @@
+import logging
+import struct
+import time
+from multiprocessing import shared_memory
+
+from PIL import Image
+
+logger = logging.getLogger("lmae.frame_ring")
+
+# the name that frames are published under, unless another is given
+DEFAULT_RING_NAME = "lmae-frames"
+DEFAULT_SLOTS = 4
+
+# layout: a header, then a ring of slots, each holding one RGB frame
+MAGIC = b"LMAERING"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIII")  # magic, format version, width, height, slot count
+LATEST = struct.Struct("<Q")  # the sequence number of the latest frame, after the header
+LATEST_OFFSET = HEADER.size
+SLOT_HEADER = struct.Struct("<Qd")  # sequence number, or 0 while being written; timestamp
+SLOTS_OFFSET = 64
+ALIGNMENT = 64
+
+
+class Frame:
+    """
+    A frame read from a frame ring
+    """
+
+    __slots__ = ("image", "sequence", "timestamp")
+
+    def __init__(self, sequence: int, timestamp: float, image: Image.Image):
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.image = image
+
+
+class FrameRing:
+    """
+    A ring of RGB frames in shared memory, written by one process and read by any number
+    of others on the same machine, such as viewers, recorders, and tests.
+
+    Frames are numbered in sequence from 1. The writer never waits for readers: each frame
+    goes into the next slot, overwriting the oldest, so a reader that falls behind skips
+    frames. A reader checks a slot's sequence number before and after copying its pixels,
+    so it never returns a frame that was overwritten while it was being read.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self.memory = memory
+        self.owner = owner
+        self.buffer = memory.buf
+        magic, version, width, height, slots = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory {memory.name} is not a frame ring")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Frame ring {memory.name} has format version {version}")
+        self.size = (width, height)
+        self.slots = slots
+        self.frame_bytes = width * height * 3
+        self.slot_stride = _aligned(SLOT_HEADER.size + self.frame_bytes)
+        self.sequence = self.latest_sequence() if owner else 0
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    @classmethod
+    def create(
+        cls, size: tuple[int, int], name: str = DEFAULT_RING_NAME, slots: int = DEFAULT_SLOTS
+    ) -> "FrameRing":
+        """
+        Create a frame ring to publish frames to. A ring left behind under the same name,
+        e.g. by a process that crashed, is replaced.
+
+        :param size: The frame size, in pixels
+        :param name: The shared memory name that readers attach to
+        :param slots: How many frames the ring holds
+        :return: the frame ring
+        """
+        nbytes = SLOTS_OFFSET + slots * _aligned(SLOT_HEADER.size + size[0] * size[1] * 3)
+        try:
+            memory = shared_memory.SharedMemory(name, create=True, size=nbytes, track=False)
+        except FileExistsError:
+            logger.warning(f"Replacing frame ring {name} left behind by another process")
+            stale = shared_memory.SharedMemory(name, track=False)
+            stale.close()
+            stale.unlink()
+            memory = shared_memory.SharedMemory(name, create=True, size=nbytes, track=False)
+        HEADER.pack_into(memory.buf, 0, MAGIC, FORMAT_VERSION, size[0], size[1], slots)
+        LATEST.pack_into(memory.buf, LATEST_OFFSET, 0)
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str = DEFAULT_RING_NAME) -> "FrameRing":
+        """
+        Attach to a frame ring that another process publishes to.
+
+        :param name: The ring's shared memory name
+        :return: the frame ring
+        :raise FileNotFoundError: if there is no ring with that name
+        """
+        return cls(shared_memory.SharedMemory(name, track=False), owner=False)
+
+    def _slot_offset(self, sequence: int) -> int:
+        return SLOTS_OFFSET + ((sequence - 1) % self.slots) * self.slot_stride
+
+    def publish(self, image: Image.Image, timestamp: float | None = None) -> int:
+        """
+        Write a frame into the next slot.
+
+        :param image: The frame, in RGB mode and of the ring's frame size
+        :param timestamp: When the frame was presented. Defaults to now.
+        :return: the frame's sequence number
+        """
+        if image.mode != "RGB" or image.size != self.size:
+            raise ValueError(f"Frame must be an RGB image of size {self.size}")
+        self.sequence += 1
+        offset = self._slot_offset(self.sequence)
+        pixels = offset + SLOT_HEADER.size
+        SLOT_HEADER.pack_into(self.buffer, offset, 0, 0.0)
+        self.buffer[pixels : pixels + self.frame_bytes] = image.tobytes()
+        stamp = time.time() if timestamp is None else timestamp
+        SLOT_HEADER.pack_into(self.buffer, offset, self.sequence, stamp)
+        LATEST.pack_into(self.buffer, LATEST_OFFSET, self.sequence)
+        return self.sequence
+
+    def latest_sequence(self) -> int:
+        """
+        :return: the sequence number of the latest frame, or 0 if none has been published
+        """
+        return LATEST.unpack_from(self.buffer, LATEST_OFFSET)[0]
+
+    def read(self, sequence: int) -> Frame | None:
+        """
+        Read a frame, if it is still in the ring.
+
+        :param sequence: The frame's sequence number
+        :return: the frame, or None if it hasn't been published or has been overwritten
+        """
+        if sequence < 1:
+            return None
+        offset = self._slot_offset(sequence)
+        pixels = offset + SLOT_HEADER.size
+        before, timestamp = SLOT_HEADER.unpack_from(self.buffer, offset)
+        if before != sequence:
+            return None
+        data = bytes(self.buffer[pixels : pixels + self.frame_bytes])
+        if SLOT_HEADER.unpack_from(self.buffer, offset)[0] != sequence:
+            return None
+        return Frame(sequence, timestamp, Image.frombytes("RGB", self.size, data))
+
+    def read_latest(self) -> Frame | None:
+        """
+        Read the latest frame.
+
+        :return: the frame, or None if none has been published
+        """
+        for _ in range(self.slots):
+            sequence = self.latest_sequence()
+            if not sequence:
+                return None
+            frame = self.read(sequence)
+            if frame is not None:
+                return frame
+        return None
+
+    def close(self) -> None:
+        """
+        Detach from the ring. The process that created it also removes it.
+        """
+        self.buffer = None  # type: ignore[assignment]
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,402 @@
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from typing import BinaryIO, overload
+
+from PIL import Image, ImageChops, ImageSequence
+from PIL.Image import Image as PILImage
+
+logger = logging.getLogger("lmae.frames")
+
+# how long to show a frame that doesn't say, in seconds
+DEFAULT_FRAME_DURATION = 1.0 / 6
+
+# how many decoded frames a streaming image keeps, and how many it decodes ahead
+DEFAULT_CACHE_SIZE = 8
+DEFAULT_PREFETCH = 2
+
+# how many expanded frames a compact frame store keeps, and how often it stores a whole frame
+DEFAULT_EXPANDED_CACHE_SIZE = 4
+DEFAULT_KEYFRAME_INTERVAL = 16
+
+
+def _frame_duration(milliseconds: int | None) -> float:
+    return milliseconds / 1000.0 if milliseconds else DEFAULT_FRAME_DURATION
+
+
+def _skip_sub_blocks(file: BinaryIO) -> None:
+    while size := file.read(1)[0]:
+        file.seek(size, 1)
+
+
+def _read_gif_durations(file: BinaryIO) -> list[float]:
+    """
+    Read the frame durations of a GIF from its block structure, without decoding any frames.
+    """
+    header = file.read(13)
+    if len(header) < 13 or header[:3] != b"GIF":
+        raise ValueError("Not a GIF file")
+    flags = header[10]
+    if flags & 0x80:
+        file.seek(3 << ((flags & 7) + 1), 1)  # global color table
+
+    durations = []
+    duration = None
+    while (introducer := file.read(1)) and introducer != b";":
+        if introducer == b"!":
+            label = file.read(1)[0]
+            if label == 0xF9:
+                # graphic control extension, which sets up the next image
+                block = file.read(file.read(1)[0])
+                duration = int.from_bytes(block[1:3], "little") * 10
+            _skip_sub_blocks(file)
+        elif introducer == b",":
+            descriptor = file.read(9)
+            if descriptor[8] & 0x80:
+                file.seek(3 << ((descriptor[8] & 7) + 1), 1)  # local color table
+            file.seek(1, 1)  # LZW minimum code size
+            _skip_sub_blocks(file)
+            durations.append(_frame_duration(duration))
+            duration = None
+        else:
+            break
+    return durations
+
+
+def read_frame_durations(image: PILImage) -> list[float]:
+    """
+    Read how long to show each frame of an animated image. The frames of a GIF are
+    not decoded; other formats are read frame by frame.
+
+    :param image: An image opened from a file, which may be animated
+    :return: the duration of each frame, in seconds
+    """
+    if image.format == "GIF" and image.filename:
+        with open(image.filename, "rb") as file:
+            try:
+                return _read_gif_durations(file)
+            except (ValueError, IndexError) as e:
+                logger.warning(f"Could not read frame timing from {image.filename}: {e}")
+    current = image.tell()
+    durations = [
+        _frame_duration(frame.info.get("duration")) for frame in ImageSequence.Iterator(image)
+    ]
+    image.seek(current)
+    return durations
+
+
+class StreamingFrames(Sequence[PILImage]):
+    """
+    The frames of an animated image file, decoded to RGBA on demand.
+
+    Only a few decoded frames are kept, least recently used first out, so long animations
+    don't have to fit in memory. After a frame is asked for, the next frames are decoded
+    on a background thread, so that playback rarely waits for a frame to decode. Frame
+    timing is read when the file is opened, without decoding frames where the format allows.
+
+    Frames are shared, so they must not be modified.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        prefetch: int = DEFAULT_PREFETCH,
+    ):
+        """
+        Open an animated image file for streaming
+
+        :param file_name: The image file path
+        :param cache_size: How many decoded frames to keep
+        :param prefetch: How many frames to decode ahead of the last frame asked for
+        """
+        if cache_size <= prefetch:
+            raise ValueError(f"Cache size {cache_size} must be larger than prefetch {prefetch}")
+        self.file_name = file_name
+        self.cache_size = cache_size
+        self.prefetch = prefetch
+        self.image = Image.open(file_name)
+        self.durations = read_frame_durations(self.image)
+        self.size = self.image.size
+        self.decode_count = 0
+        self._frames: OrderedDict[int, PILImage] = OrderedDict()
+        self._lock = threading.Lock()
+        self._wanted = threading.Condition(self._lock)
+        self._next_index: int | None = None
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    @overload
+    def __getitem__(self, index: int) -> PILImage: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[PILImage]: ...
+
+    def __getitem__(self, index: int | slice) -> PILImage | list[PILImage]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Frame {index} out of range")
+        with self._lock:
+            frame = self._frame(index)
+            if self.prefetch and not self._closed:
+                self._next_index = index + 1
+                self._wanted.notify()
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._prefetch_frames, name=f"prefetch-{self.file_name}", daemon=True
+                    )
+                    self._thread.start()
+        return frame
+
+    def _frame(self, index: int) -> PILImage:
+        frame = self._frames.get(index)
+        if frame is not None:
+            self._frames.move_to_end(index)
+            return frame
+        if self._closed:
+            raise ValueError(f"Frames of {self.file_name} are closed")
+        return self._insert(index, self._decode(self.image, index))
+
+    @staticmethod
+    def _decode(image: PILImage, index: int) -> PILImage:
+        image.seek(index)
+        return image.convert("RGBA")
+
+    def _insert(self, index: int, frame: PILImage) -> PILImage:
+        self._frames[index] = frame
+        self._frames.move_to_end(index)
+        self.decode_count += 1
+        while len(self._frames) > self.cache_size:
+            self._frames.popitem(last=False)
+        return frame
+
+    def _prefetch_frames(self) -> None:
+        # the thread decodes from its own handle on the file, so that it can decode
+        # without holding the lock, and a frame being shown never waits for it
+        with Image.open(self.file_name) as image:
+            while True:
+                with self._lock:
+                    while self._next_index is None and not self._closed:
+                        self._wanted.wait()
+                    if self._closed:
+                        return
+                    start, self._next_index = self._next_index, None
+                for offset in range(self.prefetch):
+                    index = (start + offset) % len(self)
+                    with self._lock:
+                        if self._closed or self._next_index is not None:
+                            break
+                        if index in self._frames:
+                            continue
+                    try:
+                        frame = self._decode(image, index)
+                    except (OSError, EOFError, ValueError) as e:
+                        logger.warning(f"Could not decode frame {index} of {self.file_name}: {e}")
+                        break
+                    with self._lock:
+                        if self._closed:
+                            return
+                        # the frame may have been decoded to show it in the meantime
+                        if index not in self._frames:
+                            self._insert(index, frame)
+
+    def cached_frames(self) -> list[int]:
+        """
+        :return: the indexes of the frames that are decoded, least recently used first
+        """
+        with self._lock:
+            return list(self._frames)
+
+    def close(self) -> None:
+        """
+        Stop prefetching, close the file, and drop the decoded frames.
+        """
+        with self._lock:
+            self._closed = True
+            self._wanted.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.image.close()
+        self._frames.clear()
+
+
+class _StoredFrame:
+    """
+    A distinct frame in a compact frame store: the region that changed since the previous
+    distinct frame, as palette indexes or RGBA pixels in the store's buffer
+    """
+
+    __slots__ = ("box", "length", "mode", "offset")
+
+    def __init__(self, box: tuple[int, int, int, int], mode: str, offset: int, length: int):
+        self.box = box
+        self.mode = mode
+        self.offset = offset
+        self.length = length
+
+
+class CompactFrameStore(Sequence[PILImage]):
+    """
+    The frames of an animation, stored compactly and expanded to RGBA when they are shown.
+
+    Frames that are exact duplicates of an earlier frame are stored once. Each distinct
+    frame is stored as just the region that changed since the previous distinct frame,
+    with a whole frame stored every so often so that expanding one never goes too far back.
+    Regions are stored as indexes into a palette shared by the whole store while its colors
+    fit in 256 entries, and as RGBA pixels otherwise, all in one buffer. Storage is lossless:
+    expanded frames are identical to the frames that were stored.
+
+    A few expanded frames are cached, so playing the frames in order expands each one once,
+    from the frame before it. Expanded frames are shared, so they must not be modified.
+    """
+
+    def __init__(
+        self,
+        images: Iterable[PILImage] = (),
+        cache_size: int = DEFAULT_EXPANDED_CACHE_SIZE,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    ):
+        """
+        Store frames compactly
+
+        :param images: The frames, all the same size. They are converted to RGBA if needed.
+            They are stored one at a time, so an iterator need not hold them all at once.
+        :param cache_size: How many expanded frames to keep
+        :param keyframe_interval: How many distinct frames to store between whole frames
+        """
+        self.cache_size = cache_size
+        self.keyframe_interval = keyframe_interval
+        self.size: tuple[int, int] = (0, 0)
+        self.buffer: bytearray = bytearray()
+        self.palette: list[int] = []  # colors as RGBA packed into native-order integers
+        self._palette_indexes: dict[int, int] = {}
+        self._palette_bytes = b""
+        self._stored: list[_StoredFrame] = []
+        self._frame_map: list[int] = []  # the distinct frame shown for each frame
+        self._distinct: dict[bytes, int] = {}  # the distinct frame for each frame digest
+        self._previous: PILImage | None = None  # the last distinct frame stored
+        self._expanded: OrderedDict[int, PILImage] = OrderedDict()
+        self.expand_count = 0
+
+        for image in images:
+            self.append(image)
+
+    def append(self, image: PILImage) -> None:
+        """
+        Store another frame after the ones already stored
+
+        :param image: The frame, the same size as the others. It is converted to RGBA if needed.
+        :raise ValueError: if the frame is not the same size as the others
+        """
+        if not self._frame_map:
+            self.size = image.size
+        elif image.size != self.size:
+            raise ValueError(f"Frame is {image.size}, not {self.size}")
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16).digest()
+        if digest not in self._distinct:
+            self._distinct[digest] = len(self._stored)
+            self._store(image, self._previous)
+            self._previous = image
+        self._frame_map.append(self._distinct[digest])
+
+    def _store(self, image: PILImage, previous: PILImage | None) -> None:
+        box: tuple[int, int, int, int] | None = (0, 0, *image.size)
+        if previous is not None and len(self._stored) % self.keyframe_interval:
+            box = ImageChops.difference(image, previous).getbbox(alpha_only=False)
+        if box is None:
+            # a distinct frame always differs somewhere, but keep an empty region just in case
+            box = (0, 0, 0, 0)
+        region = image.crop(box)
+        pixels = array("I", region.tobytes())
+        colors = set(pixels)
+        new_colors = colors.difference(self._palette_indexes)
+        if len(self.palette) + len(new_colors) <= 256:
+            for color in new_colors:
+                self._palette_indexes[color] = len(self.palette)
+                self.palette.append(color)
+            if new_colors:
+                self._palette_bytes = array("I", self.palette).tobytes()
+            data = bytes(map(self._palette_indexes.__getitem__, pixels))
+            mode = "P"
+        else:
+            data = pixels.tobytes()
+            mode = "RGBA"
+        self._stored.append(_StoredFrame(box, mode, len(self.buffer), len(data)))
+        self.buffer += data
+
+    @property
+    def distinct_frames(self) -> int:
+        """
+        The number of distinct frames stored
+        """
+        return len(self._stored)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes of frame data and palette stored
+        """
+        return len(self.buffer) + len(self.palette) * 4
+
+    def __len__(self) -> int:
+        return len(self._frame_map)
+
+    @overload
+    def __getitem__(self, index: int) -> PILImage: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[PILImage]: ...
+
+    def __getitem__(self, index: int | slice) -> PILImage | list[PILImage]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._expand(self._frame_map[index])
+
+    def _expand(self, distinct_index: int) -> PILImage:
+        frame = self._expanded.get(distinct_index)
+        if frame is not None:
+            self._expanded.move_to_end(distinct_index)
+            return frame
+
+        # go back to the nearest frame that is expanded already, or was stored whole
+        start = distinct_index
+        base = None
+        while start % self.keyframe_interval:
+            base = self._expanded.get(start - 1)
+            if base is not None:
+                break
+            start -= 1
+        frame = base.copy() if base is not None else Image.new("RGBA", self.size)
+        for index in range(start, distinct_index + 1):
+            self._paste_region(frame, self._stored[index])
+        self.expand_count += 1
+
+        self._expanded[distinct_index] = frame
+        while len(self._expanded) > self.cache_size:
+            self._expanded.popitem(last=False)
+        return frame
+
+    def _paste_region(self, frame: PILImage, stored: _StoredFrame) -> None:
+        box = stored.box
+        size = (box[2] - box[0], box[3] - box[1])
+        if not size[0] or not size[1]:
+            return
+        data = memoryview(self.buffer)[stored.offset : stored.offset + stored.length]
+        if stored.mode == "P":
+            region = Image.frombuffer("P", size, data, "raw", "P", 0, 1)
+            region.putpalette(self._palette_bytes, "RGBA")
+            region = region.convert("RGBA")
+        else:
+            region = Image.frombuffer("RGBA", size, data, "raw", "RGBA", 0, 1)
+        frame.paste(region, box[:2])
@@ -0,0 +1,221 @@
+import gc
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger("lmae.gc_policy")
+
+GENERATIONS = 3
+
+# a generation that is this many times over its threshold is collected whether or not its
+# collection fits in the idle time, so that garbage can't pile up when frames overrun
+OVERDUE_FACTOR = 4
+
+# how much each collection's duration moves the estimate for its generation
+ESTIMATE_WEIGHT = 0.25
+
+DEFAULT_REPORT_INTERVAL = 300.0  # seconds
+
+
+class GCPolicy:
+    """
+    Keeps Python's cyclic garbage collector out of the frame loop, and measures its pauses.
+
+    Once started, every collection is timed, and frames that overran their time budget are
+    counted along with whether a collection paused them, and whether the pause alone made
+    them overrun. A summary is logged every report interval.
+
+    When managed, automatic collection is disabled. Instead, each generation is collected
+    when it is due by its usual threshold, in the idle time between frames, if its last
+    collections took less time than there is to spare. Apps are prepared with their objects
+    frozen afterwards, so that the fonts, images and stages they keep for as long as they
+    run are never examined again.
+    """
+
+    def __init__(
+        self,
+        managed: bool = True,
+        report_interval: float = DEFAULT_REPORT_INTERVAL,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """
+        :param managed: Whether to disable automatic collection and collect in idle time,
+            rather than only measuring
+        :param report_interval: How often to log a summary, in seconds
+        :param clock: The clock that times collections, in seconds
+        """
+        self.managed = managed
+        self.report_interval = report_interval
+        self.clock = clock
+        self.thresholds = gc.get_threshold()
+        self.started = False
+
+        # collections of each generation, and the time they took, in seconds
+        self.collections = [0] * GENERATIONS
+        self.collection_time = [0.0] * GENERATIONS
+        self.longest_collection = [0.0] * GENERATIONS
+        self.estimates = [0.0] * GENERATIONS
+
+        # frames, and those that overran their budget: paused by a collection at all, and
+        # paused for long enough that they would not have overrun without it
+        self.frames = 0
+        self.overruns = 0
+        self.overruns_paused = 0
+        self.overruns_from_pauses = 0
+        self.frames_paused = 0
+        self.longest_frame_pause = 0.0
+
+        self._collection_start = 0.0
+        self._scheduled = False
+        self._frame_pause = 0.0
+        self._last_report = 0.0
+
+    def start(self) -> None:
+        """
+        Start timing collections and, if managed, take over from automatic collection.
+        """
+        if self.started:
+            return
+        gc.callbacks.append(self.on_collection)
+        if self.managed:
+            gc.disable()
+        self._last_report = self.clock()
+        self.started = True
+        logger.info(f"Garbage collection {'managed' if self.managed else 'instrumented'}")
+
+    def close(self) -> None:
+        """
+        Stop timing collections, and hand collection back to Python.
+        """
+        if not self.started:
+            return
+        self.started = False
+        gc.callbacks.remove(self.on_collection)
+        if self.managed:
+            gc.unfreeze()
+            gc.enable()
+        logger.info(self.summary())
+
+    def prepare(self, app: Any) -> None:
+        """
+        Prepare an app to run. If managed, collect afterwards, then freeze everything that
+        is left, so that later collections only look at objects made while the app runs.
+
+        :param app: The app to prepare
+        """
+        if not self.managed:
+            app.prepare()
+            return
+        # objects frozen for an earlier app become collectable again, in case that app has
+        # let go of them
+        gc.unfreeze()
+        app.prepare()
+        self._collect(GENERATIONS - 1)
+        gc.freeze()
+        logger.debug(f"Froze {gc.get_freeze_count()} objects")
+
+    def collect_while_idle(self, idle_time: float) -> float:
+        """
+        Collect the oldest generation that is due, if its collection is expected to fit in
+        the idle time, or if it is overdue. At most one collection is made.
+
+        :param idle_time: How long there is until the next frame, in seconds
+        :return: how long collecting took, in seconds
+        """
+        if not (self.managed and self.started):
+            return 0.0
+        counts = gc.get_count()
+        for generation in range(GENERATIONS - 1, -1, -1):
+            threshold = self.thresholds[generation]
+            if counts[generation] < threshold:
+                continue
+            if (
+                self.estimates[generation] <= idle_time
+                or counts[generation] >= threshold * OVERDUE_FACTOR
+            ):
+                start = self.clock()
+                self._collect(generation)
+                return self.clock() - start
+        return 0.0
+
+    def frame_started(self) -> None:
+        """
+        Note that a frame has started, so that only collections during the frame count
+        against it.
+        """
+        self._frame_pause = 0.0
+
+    def frame_finished(self, frame_time: float, frame_budget: float) -> None:
+        """
+        Note that a frame has finished, and how long it took.
+
+        :param frame_time: How long the frame took, in seconds
+        :param frame_budget: How long the frame could take at the app's frame rate, in seconds
+        """
+        self.frames += 1
+        pause = self._frame_pause
+        self._frame_pause = 0.0
+        if pause:
+            self.frames_paused += 1
+            self.longest_frame_pause = max(self.longest_frame_pause, pause)
+        if frame_time > frame_budget:
+            self.overruns += 1
+            if pause:
+                self.overruns_paused += 1
+                if frame_time - pause <= frame_budget:
+                    self.overruns_from_pauses += 1
+                    logger.debug(
+                        f"Frame took {frame_time * 1000:.1f} ms, over its budget of "
+                        f"{frame_budget * 1000:.1f} ms, with {pause * 1000:.1f} ms collecting"
+                    )
+        now = self.clock()
+        if now - self._last_report >= self.report_interval:
+            self._last_report = now
+            logger.info(self.summary())
+
+    def summary(self) -> str:
+        """
+        :return: a description of the collections and frame overruns so far
+        """
+        generations = ", ".join(
+            f"gen {generation} {self.collections[generation]} "
+            f"({self.collection_time[generation] * 1000:.1f} ms, "
+            f"longest {self.longest_collection[generation] * 1000:.1f} ms)"
+            for generation in range(GENERATIONS)
+        )
+        return (
+            f"Collections: {generations}. Frames: {self.frames}, {self.frames_paused} paused "
+            f"by collection (longest {self.longest_frame_pause * 1000:.1f} ms), "
+            f"{self.overruns} over budget, {self.overruns_paused} of those paused, "
+            f"{self.overruns_from_pauses} only over budget because of the pause"
+        )
+
+    def on_collection(self, phase: str, info: dict[str, int]) -> None:
+        """
+        Time a collection. Called by the garbage collector, from `gc.callbacks`.
+
+        :param phase: "start" or "stop"
+        :param info: The collection's details, including its generation
+        """
+        if phase == "start":
+            self._collection_start = self.clock()
+            return
+        duration = self.clock() - self._collection_start
+        generation = info["generation"]
+        self.collections[generation] += 1
+        self.collection_time[generation] += duration
+        self.longest_collection[generation] = max(self.longest_collection[generation], duration)
+        estimate = self.estimates[generation]
+        self.estimates[generation] = (
+            estimate + ESTIMATE_WEIGHT * (duration - estimate) if estimate else duration
+        )
+        if not self._scheduled:
+            self._frame_pause += duration
+
+    def _collect(self, generation: int) -> None:
+        self._scheduled = True
+        try:
+            gc.collect(generation)
+        finally:
+            self._scheduled = False
@@ -0,0 +1,428 @@
+import logging
+import math
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw, ImageFont, ImageMath
+
+logger = logging.getLogger("lmae.glyphs")
+
+# spacing between lines of multi-line text, the same as Pillow's default
+DEFAULT_LINE_SPACING = 4
+
+# how many recent layouts each atlas remembers
+LAYOUT_CACHE_SIZE = 128
+
+# text alignment anchors, as in Pillow: horizontal (left, middle, right)
+# then vertical (ascender, middle, baseline, descender)
+HORIZONTAL_ANCHORS = "lmr"
+VERTICAL_ANCHORS = "amsd"
+
+# alignment of the lines of multi-line text
+ALIGNMENTS = ("left", "center", "right")
+
+BBox = tuple[int, int, int, int]
+
+
+def check_layout_options(anchor: str, align: str) -> None:
+    """
+    Check that an anchor and an alignment are valid
+
+    :param anchor: A two-letter anchor, e.g. "la" or "ms"
+    :param align: One of "left", "center", or "right"
+    :raises ValueError: if either is not valid
+    """
+    if len(anchor) != 2 or anchor[0] not in HORIZONTAL_ANCHORS or anchor[1] not in VERTICAL_ANCHORS:
+        raise ValueError(
+            f"Unknown anchor '{anchor}', expected one of '{HORIZONTAL_ANCHORS}' "
+            f"followed by one of '{VERTICAL_ANCHORS}'"
+        )
+    if align not in ALIGNMENTS:
+        raise ValueError(f"Unknown alignment '{align}', expected one of {', '.join(ALIGNMENTS)}")
+
+
+class Glyph:
+    """
+    A cached glyph: its coverage mask, and where the mask goes relative to the pen position
+    on the ascender line (anchor "la").
+    """
+
+    __slots__ = ("bbox", "mask")
+
+    def __init__(self, bbox: BBox, mask: Image.Image | None):
+        self.bbox = bbox
+        self.mask = mask
+
+
+class TextLayout:
+    """
+    Where the lines of some text go, measured from cached glyphs without rendering anything.
+    Positions are relative to the text origin, at the start of the first line's ascender line.
+    """
+
+    __slots__ = ("bbox", "height", "line_origins", "lines", "width")
+
+    def __init__(
+        self,
+        lines: list[str],
+        line_origins: list[tuple[int, int]],
+        bbox: BBox,
+        width: float,
+        height: int,
+    ):
+        """
+        :param lines: The lines of text, after wrapping
+        :param line_origins: Where each line starts, on its ascender line
+        :param bbox: The bounding box of the stroked text
+        :param width: The advance width of the widest line
+        :param height: The distance from the first line's ascender to the last line's descender
+        """
+        self.lines = lines
+        self.line_origins = line_origins
+        self.bbox = bbox
+        self.width = width
+        self.height = height
+
+    def anchor_offset(self, anchor: str, ascent: int) -> tuple[int, int]:
+        """
+        Find where the text origin is relative to an anchor point.
+
+        :param anchor: A two-letter anchor, e.g. "ma" to center text horizontally
+        :param ascent: The font's ascent, the distance from the ascender line to the baseline
+        :return: the offset from the anchor point to the text origin
+        """
+        horizontal, vertical = anchor
+        x = 0
+        if horizontal == "m":
+            x = -round(self.width / 2)
+        elif horizontal == "r":
+            x = -round(self.width)
+        y = 0
+        if vertical == "m":
+            y = -round(self.height / 2)
+        elif vertical == "s":
+            y = -ascent
+        elif vertical == "d":
+            y = -self.height
+        return x, y
+
+
+class GlyphAtlas:
+    """
+    A cache of rasterized glyphs for one font and stroke width, used to lay out strings
+    without rendering them through FreeType each time.
+
+    Each glyph is rasterized once, both plain and stroked, and its advance and its kerning
+    with neighboring glyphs are measured once. A string is then laid out by placing the
+    cached glyph masks at their pen positions. The result matches Pillow's own text
+    rendering pixel for pixel. Strings are laid out glyph by glyph, so ligatures and other
+    complex shaping are not applied.
+    """
+
+    def __init__(self, font: ImageFont.FreeTypeFont, stroke_width: int = 0):
+        """
+        Create a glyph atlas. Use `get_glyph_atlas()` to share atlases between actors.
+
+        :param font: The font to rasterize
+        :param stroke_width: The width of the stroke around stroked glyphs
+        """
+        self.font = font
+        self.stroke_width = stroke_width
+        self._glyphs: dict[str, Glyph] = {}
+        self._stroked_glyphs: dict[str, Glyph] = {}
+        self._advances: dict[str, float] = {}
+        self._kerning: dict[str, float] = {}
+        self._line_height: int | None = None
+        self._layouts: OrderedDict[tuple, TextLayout] = OrderedDict()
+        self.ascent, self.descent = font.getmetrics()
+
+    def advance(self, char: str) -> float:
+        """
+        :param char: A character
+        :return: how far the pen moves after drawing the character, in pixels
+        """
+        advance = self._advances.get(char)
+        if advance is None:
+            advance = self._advances[char] = self.font.getlength(char)
+        return advance
+
+    def kerning(self, left: str, right: str) -> float:
+        """
+        :param left: A character
+        :param right: The character that follows it
+        :return: the adjustment to the pen position between the two characters, in pixels
+        """
+        pair = left + right
+        kerning = self._kerning.get(pair)
+        if kerning is None:
+            kerning = self.font.getlength(pair) - self.advance(left) - self.advance(right)
+            self._kerning[pair] = kerning
+        return kerning
+
+    def glyph(self, char: str, stroked: bool = False) -> Glyph:
+        """
+        Get a glyph, rasterizing it if it is not already cached.
+
+        :param char: The character
+        :param stroked: Whether to get the stroked glyph, rather than the plain one
+        :return: the glyph
+        """
+        glyphs = self._stroked_glyphs if stroked else self._glyphs
+        glyph = glyphs.get(char)
+        if glyph is None:
+            glyph = glyphs[char] = self._rasterize(char, self.stroke_width if stroked else 0)
+        return glyph
+
+    def _rasterize(self, char: str, stroke_width: int) -> Glyph:
+        bbox = self.font.getbbox(char, stroke_width=stroke_width, anchor="la")
+        bbox = (int(bbox[0]), int(bbox[1]), int(bbox[2]), int(bbox[3]))
+        width, height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+        if width <= 0 or height <= 0:
+            return Glyph(bbox, None)
+        mask = Image.new("L", (width, height), 0)
+        ImageDraw.Draw(mask).text(
+            (-bbox[0], -bbox[1]),
+            char,
+            fill=255,
+            font=self.font,
+            anchor="la",
+            stroke_width=stroke_width,
+            stroke_fill=255,
+        )
+        return Glyph(bbox, mask)
+
+    def preload(
+        self,
+        glyphs: dict[str, Glyph],
+        stroked_glyphs: dict[str, Glyph],
+        advances: dict[str, float],
+        kerning: dict[str, float],
+    ) -> None:
+        """
+        Add glyphs and measurements that were rasterized and measured ahead of time,
+        e.g. by an asset bundle.
+
+        :param glyphs: Plain glyphs, by character
+        :param stroked_glyphs: Stroked glyphs, by character
+        :param advances: Advances, by character
+        :param kerning: Kerning adjustments, by pair of characters
+        """
+        self._glyphs.update(glyphs)
+        self._stroked_glyphs.update(stroked_glyphs)
+        self._advances.update(advances)
+        self._kerning.update(kerning)
+
+    def pen_positions(self, line: str) -> list[int]:
+        """
+        :param line: A single line of text
+        :return: the pen position of each character, in whole pixels from the line start
+        """
+        positions = []
+        pen = 0.0
+        previous = None
+        for char in line:
+            if previous is not None:
+                pen += self.kerning(previous, char)
+            positions.append(math.floor(pen + 0.5))
+            pen += self.advance(char)
+            previous = char
+        return positions
+
+    def line_length(self, line: str) -> float:
+        """
+        :param line: A single line of text
+        :return: how far the pen moves after drawing the line, in pixels
+        """
+        length = 0.0
+        previous = None
+        for char in line:
+            if previous is not None:
+                length += self.kerning(previous, char)
+            length += self.advance(char)
+            previous = char
+        return length
+
+    @property
+    def line_height(self) -> int:
+        """
+        The distance between the tops of lines of multi-line text, as Pillow spaces them.
+        """
+        if self._line_height is None:
+            bottom = self.font.getbbox("A", stroke_width=self.stroke_width, anchor="la")[3]
+            self._line_height = int(bottom) + self.stroke_width + DEFAULT_LINE_SPACING
+        return self._line_height
+
+    def measure_line(self, line: str) -> BBox:
+        """
+        Measure a line of text without rendering it.
+
+        :param line: A single line of text
+        :return: the bounding box of the stroked line, relative to its start on the ascender line
+        """
+        if not line:
+            sw = self.stroke_width
+            return -sw, -sw, sw, sw
+        bbox: BBox | None = None
+        for char, x in zip(line, self.pen_positions(line), strict=True):
+            glyph_bbox = self.glyph(char, stroked=True).bbox
+            if bbox is None:
+                bbox = (glyph_bbox[0] + x, glyph_bbox[1], glyph_bbox[2] + x, glyph_bbox[3])
+            else:
+                bbox = (
+                    min(bbox[0], glyph_bbox[0] + x),
+                    min(bbox[1], glyph_bbox[1]),
+                    max(bbox[2], glyph_bbox[2] + x),
+                    max(bbox[3], glyph_bbox[3]),
+                )
+        return bbox  # type: ignore[return-value]
+
+    def measure(self, text: str) -> BBox:
+        """
+        Measure text, which may have multiple lines, without rendering it.
+        This matches `ImageDraw.textbbox()` at (0, 0) with this atlas's font and stroke width.
+
+        :param text: The text
+        :return: the bounding box of the stroked text
+        """
+        return self.layout(text).bbox
+
+    def wrap(self, text: str, width: int) -> list[str]:
+        """
+        Break text into lines that fit within a width, breaking at spaces.
+        Existing line breaks are kept, and words too long for the width get a line of their own.
+
+        :param text: The text
+        :param width: The width to fit, in pixels, including the stroke
+        :return: the lines of text
+        """
+        lines = []
+        for paragraph in text.split("\n"):
+            words = paragraph.split(" ")
+            line = words[0]
+            for word in words[1:]:
+                candidate = f"{line} {word}"
+                if self.measure_line(candidate)[2] <= width:
+                    line = candidate
+                else:
+                    lines.append(line)
+                    line = word
+            lines.append(line)
+        return lines
+
+    def layout(self, text: str, align: str = "left", wrap_width: int | None = None) -> TextLayout:
+        """
+        Lay out text, which may have multiple lines, without rendering it.
+        Recent layouts are cached, so laying out the same text again costs a lookup.
+
+        :param text: The text
+        :param align: How to align lines of multi-line text: "left", "center", or "right"
+        :param wrap_width: If given, the width in pixels to wrap the text to
+        :return: the layout
+        """
+        key = (text, align, wrap_width)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            self._layouts.move_to_end(key)
+            return layout
+
+        lines = text.split("\n") if wrap_width is None else self.wrap(text, wrap_width)
+        lengths = [self.line_length(line) for line in lines]
+        width = max(lengths)
+        line_origins = []
+        bbox: BBox | None = None
+        for index, (line, length) in enumerate(zip(lines, lengths, strict=True)):
+            x = 0
+            if align == "center":
+                x = round((width - length) / 2)
+            elif align == "right":
+                x = round(width - length)
+            y = index * self.line_height
+            line_origins.append((x, y))
+            line_bbox = self.measure_line(line)
+            line_bbox = (line_bbox[0] + x, line_bbox[1] + y, line_bbox[2] + x, line_bbox[3] + y)
+            if bbox is None:
+                bbox = line_bbox
+            else:
+                bbox = (
+                    min(bbox[0], line_bbox[0]),
+                    min(bbox[1], line_bbox[1]),
+                    max(bbox[2], line_bbox[2]),
+                    max(bbox[3], line_bbox[3]),
+                )
+        height = (len(lines) - 1) * self.line_height + self.ascent + self.descent
+        layout = TextLayout(lines, line_origins, bbox, width, height)  # type: ignore[arg-type]
+
+        self._layouts[key] = layout
+        if len(self._layouts) > LAYOUT_CACHE_SIZE:
+            self._layouts.popitem(last=False)
+        return layout
+
+    def draw_line(
+        self, mask: Image.Image, origin: tuple[int, int], line: str, stroked: bool = False
+    ) -> None:
+        """
+        Draw the coverage of a line of text into a mask, by placing cached glyphs.
+        For multi-line text, draw each line `line_height` pixels below the one before.
+
+        :param mask: An "L" mode image to draw into
+        :param origin: Where the line starts, on its ascender line
+        :param line: A single line of text
+        :param stroked: Whether to draw the stroked glyphs, rather than the plain ones
+        """
+        for char, x in zip(line, self.pen_positions(line), strict=True):
+            glyph = self.glyph(char, stroked)
+            if glyph.mask is None:
+                continue
+            position = (origin[0] + x + glyph.bbox[0], origin[1] + glyph.bbox[1])
+            self._combine(mask, glyph.mask, position)
+
+    @staticmethod
+    def _combine(mask: Image.Image, glyph_mask: Image.Image, position: tuple[int, int]) -> None:
+        box = (
+            position[0],
+            position[1],
+            position[0] + glyph_mask.width,
+            position[1] + glyph_mask.height,
+        )
+        region = mask.crop(box)
+        if region.getbbox() is None:
+            # nothing there yet, so the glyph's coverage is the result
+            mask.paste(glyph_mask, position)
+            return
+        # combined the way FreeType's string renderer does it: a + b - a * b / 255, with the
+        # product rounded like Pillow's MULDIV255, so laying out cached glyphs gives the same
+        # pixels as rendering the whole string at once
+        combined = ImageMath.lambda_eval(
+            lambda args: args["a"] + args["b"] - (args["a"] * args["b"] + 127) / 255,
+            a=region,
+            b=glyph_mask,
+        )
+        mask.paste(combined.convert("L"), position)
+
+
+_glyph_atlases: dict[tuple, GlyphAtlas] = {}
+
+
+def _font_key(font: ImageFont.FreeTypeFont) -> tuple:
+    if isinstance(font.path, str):
+        return font.path, font.size, font.index, font.encoding, font.layout_engine
+    # fonts loaded from file objects can't be told apart, so key them by identity;
+    # the atlas keeps the font alive, so the identity won't be reused
+    return (id(font),)
+
+
+def get_glyph_atlas(font: ImageFont.ImageFont, stroke_width: int = 0) -> GlyphAtlas | None:
+    """
+    Get the shared glyph atlas for a font and stroke width, creating it if needed.
+
+    :param font: The font
+    :param stroke_width: The stroke width
+    :return: the glyph atlas, or `None` if the font is not a FreeType font
+    """
+    if not isinstance(font, ImageFont.FreeTypeFont):
+        return None
+    key = (*_font_key(font), stroke_width)
+    atlas = _glyph_atlases.get(key)
+    if atlas is None:
+        logger.debug(f"Creating glyph atlas for {key}")
+        atlas = _glyph_atlases[key] = GlyphAtlas(font, stroke_width)
+    return atlas
@@ -0,0 +1,271 @@
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, tzinfo
+from typing import Any
+
+logger = logging.getLogger("lmae.scheduling")
+
+# the wall-clock boundaries that `TimerWheel.call_on()` understands
+BOUNDARIES = ("second", "minute", "hour", "day")
+
+
+def next_boundary(boundary: str, now: datetime) -> datetime:
+    """
+    Find the next wall-clock boundary strictly after a point in time.
+
+    :param boundary: One of "second", "minute", "hour", or "day"
+    :param now: The current date and time
+    :return: the date and time of the next boundary
+    """
+    if boundary == "second":
+        return now.replace(microsecond=0) + timedelta(seconds=1)
+    if boundary == "minute":
+        return now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    if boundary == "hour":
+        return now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    if boundary == "day":
+        return now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    raise ValueError(f"Unknown boundary '{boundary}', expected one of {', '.join(BOUNDARIES)}")
+
+
+class ScheduledCall:
+    """
+    A callback that has been scheduled on a timer wheel. Keep it to cancel the call.
+    """
+
+    __slots__ = ("args", "callback", "cancelled", "deadline_tick", "interval", "sequence", "when")
+
+    def __init__(
+        self,
+        when: float,
+        callback: Callable[..., Any],
+        args: tuple,
+        interval: float | None,
+        sequence: int,
+    ):
+        self.when = when
+        self.deadline_tick = 0
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self.sequence = sequence
+
+    def cancel(self) -> None:
+        """
+        Cancel this call. If it repeats, no further calls will be made.
+        """
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    A hashed timer wheel for scheduling callbacks against a monotonic clock.
+
+    Calls are kept in a ring of slots, one slot per tick, hashed by the tick they are due.
+    Advancing the wheel only visits the slots for the ticks that have passed, so checking
+    for due calls every frame costs almost nothing when nothing is due, however many calls
+    are waiting. Calls due more than one revolution ahead stay in their slot until their
+    tick comes around.
+
+    The wheel does not run by itself; its owner calls `advance()` regularly, e.g. once per
+    frame. Callbacks run inside `advance()`, so they should be quick.
+    """
+
+    def __init__(
+        self,
+        tick: float = 0.01,
+        slots: int = 512,
+        clock: Callable[[], float] | None = None,
+    ):
+        """
+        Create a timer wheel
+
+        :param tick: The resolution of the wheel, in seconds
+        :param slots: The number of slots in the wheel
+        :param clock: The monotonic clock that times are measured against.
+            Defaults to `time.monotonic()`.
+        """
+        self.tick = tick
+        self.slots: list[list[ScheduledCall]] = [[] for _ in range(slots)]
+        self._clock = clock
+        self.current_tick = self._tick_for(self.clock())
+        self._count = 0
+        self._sequence = 0
+
+    def clock(self) -> float:
+        """
+        :return: the current time on this wheel's clock
+        """
+        # look up time.monotonic when called, so that it can be patched in tests
+        return self._clock() if self._clock else time.monotonic()
+
+    def __len__(self) -> int:
+        """
+        :return: the number of scheduled calls, including cancelled ones not yet discarded
+        """
+        return self._count
+
+    def _tick_for(self, when: float) -> int:
+        return int(when // self.tick)
+
+    def _insert(self, call: ScheduledCall) -> None:
+        # anything already due goes into the next tick to be processed
+        call.deadline_tick = max(self._tick_for(call.when), self.current_tick + 1)
+        self.slots[call.deadline_tick % len(self.slots)].append(call)
+        self._count += 1
+
+    def call_at(self, when: float, callback: Callable[..., Any], *args: Any) -> ScheduledCall:
+        """
+        Call a function at a particular time.
+
+        :param when: The time to make the call, on this wheel's clock
+        :param callback: The function to call
+        :param args: Arguments for the function
+        :return: the scheduled call
+        """
+        self._sequence += 1
+        call = ScheduledCall(when, callback, args, None, self._sequence)
+        self._insert(call)
+        return call
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> ScheduledCall:
+        """
+        Call a function after a delay.
+
+        :param delay: The delay, in seconds
+        :param callback: The function to call
+        :param args: Arguments for the function
+        :return: the scheduled call
+        """
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def call_every(
+        self,
+        interval: float,
+        callback: Callable[..., Any],
+        *args: Any,
+        delay: float | None = None,
+    ) -> ScheduledCall:
+        """
+        Call a function repeatedly. Calls are spaced from when they were scheduled rather
+        than when they ran, so they do not drift. Calls missed while the wheel was not
+        being advanced are skipped rather than made all at once.
+
+        :param interval: The time between calls, in seconds
+        :param callback: The function to call
+        :param args: Arguments for the function
+        :param delay: The delay before the first call, in seconds. Defaults to the interval.
+        :return: the scheduled call, which can be cancelled to stop the repeats
+        """
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        self._sequence += 1
+        first = self.clock() + (interval if delay is None else delay)
+        call = ScheduledCall(first, callback, args, interval, self._sequence)
+        self._insert(call)
+        return call
+
+    def call_on(
+        self, boundary: str, callback: Callable[..., Any], *args: Any, tz: tzinfo | None = None
+    ) -> ScheduledCall:
+        """
+        Call a function every time the wall clock crosses a boundary, such as the top of
+        the minute or the hour. Each call is timed on the monotonic clock, then checked
+        against the wall clock, so changes to the system time don't cause early calls.
+
+        :param boundary: One of "second", "minute", "hour", or "day"
+        :param callback: The function to call
+        :param args: Arguments for the function
+        :param tz: The time zone for the wall clock. Defaults to local time.
+        :return: a scheduled call, which can be cancelled to stop the repeats
+        """
+        # the returned handle stands for the whole series of calls, each of which checks it
+        target = next_boundary(boundary, datetime.now(tz))
+        handle = ScheduledCall(0.0, callback, args, None, 0)
+
+        def on_boundary(boundary_time: datetime) -> None:
+            if handle.cancelled:
+                return
+            now = datetime.now(tz)
+            if now < boundary_time:
+                # woke up early by the wall clock, so wait out the remainder
+                self._arm(boundary_time, tz, on_boundary)
+                return
+            self._arm(next_boundary(boundary, now), tz, on_boundary)
+            callback(*args)
+
+        self._arm(target, tz, on_boundary)
+        return handle
+
+    def _arm(
+        self, boundary_time: datetime, tz: tzinfo | None, on_boundary: Callable[[datetime], None]
+    ) -> None:
+        delay = (boundary_time - datetime.now(tz)).total_seconds()
+        self.call_later(max(delay, 0.0), on_boundary, boundary_time)
+
+    def cancel_all(self) -> None:
+        """
+        Cancel and discard every scheduled call.
+        """
+        for slot in self.slots:
+            for call in slot:
+                call.cancelled = True
+            slot.clear()
+        self._count = 0
+
+    def advance(self, now: float | None = None) -> int:
+        """
+        Move the wheel forward to the current time, making every call that has come due.
+
+        :param now: The current time on this wheel's clock. Defaults to reading the clock.
+        :return: the number of calls made
+        """
+        target_tick = self._tick_for(self.clock() if now is None else now)
+        if target_tick <= self.current_tick:
+            return 0
+        if self._count == 0:
+            self.current_tick = target_tick
+            return 0
+
+        due: list[ScheduledCall] = []
+        slot_count = len(self.slots)
+        if target_tick - self.current_tick >= slot_count:
+            # we've gone all the way around, so visit every slot once
+            ticks = range(self.current_tick + 1, self.current_tick + 1 + slot_count)
+        else:
+            ticks = range(self.current_tick + 1, target_tick + 1)
+        for tick in ticks:
+            slot = self.slots[tick % slot_count]
+            if not slot:
+                continue
+            remaining = []
+            for call in slot:
+                if call.cancelled:
+                    self._count -= 1
+                elif call.deadline_tick <= target_tick:
+                    due.append(call)
+                    self._count -= 1
+                else:
+                    remaining.append(call)
+            slot[:] = remaining
+        self.current_tick = target_tick
+
+        due.sort(key=lambda c: (c.when, c.sequence))
+        made = 0
+        for call in due:
+            if call.cancelled:
+                continue
+            if call.interval is not None:
+                # skip any repeats that we missed, then schedule the next one
+                current = target_tick * self.tick
+                missed = max(0, int((current - call.when) // call.interval))
+                call.when += (missed + 1) * call.interval
+                self._insert(call)
+            try:
+                call.callback(*call.args)
+            except Exception:
+                logger.exception(f"Exception in scheduled call to {call.callback}")
+            made += 1
+        return made
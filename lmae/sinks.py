@@ -0,0 +1,299 @@
+import logging
+import socket
+import struct
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Iterator
+from typing import Any, BinaryIO
+
+from PIL import Image, ImageChops
+
+logger = logging.getLogger("lmae.sinks")
+
+# the port that the viewer socket listens on, unless another is given
+DEFAULT_VIEWER_PORT = 7890
+DEFAULT_QUEUE_SIZE = 2
+
+# frame stream layout: a header, then one packet per frame. Each packet holds the region
+# of the frame that changed since the previous packet, or the whole frame for a key frame.
+MAGIC = b"LMAEFRMS"
+FORMAT_VERSION = 1
+STREAM_HEADER = struct.Struct("<8sIHH")  # magic, format version, width, height
+PACKET_HEADER = struct.Struct("<dHHHH")  # timestamp; left, top, width, height of the region
+
+
+class FrameSink(ABC):
+    """
+    Somewhere that presented frames go, such as an LED matrix, a recording or a viewer.
+    Frames are RGB images, shared between all the sinks, so sinks must not modify them.
+    The stage reuses its frame image for the next frame, so sinks that keep a frame after
+    presenting it must copy it.
+    """
+
+    @abstractmethod
+    def present(self, frame: Image.Image, timestamp: float) -> None:
+        """
+        Present a frame.
+
+        :param frame: The frame, an RGB image
+        :param timestamp: When the frame was presented, as from `time.time()`
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Release anything the sink holds. No frames are presented after this.
+        """
+        pass
+
+
+class MatrixSink(FrameSink):
+    """
+    Presents frames on an LED matrix, or anything else with the `RGBMatrix` interface,
+    such as a `ViewerRGBMatrix` to watch a real panel's frames on screen.
+    """
+
+    def __init__(self, matrix: Any):
+        """
+        :param matrix: The matrix
+        """
+        self.matrix = matrix
+        self.double_buffer = matrix.CreateFrameCanvas()
+
+    def present(self, frame: Image.Image, timestamp: float) -> None:
+        self.double_buffer.SetImage(frame, 0, 0)
+        self.double_buffer = self.matrix.SwapOnVSync(self.double_buffer)
+
+    def close(self) -> None:
+        if hasattr(self.matrix, "close"):
+            self.matrix.close()
+
+
+class DeltaEncoder:
+    """
+    Encodes frames as packets of a frame stream, each holding only the region that changed
+    since the previous frame.
+    """
+
+    def __init__(self):
+        self.previous: Image.Image | None = None
+
+    def encode(self, frame: Image.Image, timestamp: float, key_frame: bool = False) -> bytes:
+        """
+        Encode a frame.
+
+        :param frame: The frame, an RGB image
+        :param timestamp: When the frame was presented
+        :param key_frame: Whether to encode the whole frame, rather than what changed
+        :return: the packet
+        """
+        if key_frame or self.previous is None or self.previous.size != frame.size:
+            box = (0, 0, *frame.size)
+        else:
+            box = ImageChops.difference(self.previous, frame).getbbox() or (0, 0, 0, 0)
+        if self.previous is None or self.previous.size != frame.size:
+            self.previous = frame.copy()
+        else:
+            self.previous.paste(frame)
+        left, top, right, bottom = box
+        header = PACKET_HEADER.pack(timestamp, left, top, right - left, bottom - top)
+        if right == left:
+            return header
+        return header + frame.crop(box).tobytes()
+
+
+def encode_stream_header(size: tuple[int, int]) -> bytes:
+    """
+    :param size: The frame size, in pixels
+    :return: the header that starts a frame stream
+    """
+    return STREAM_HEADER.pack(MAGIC, FORMAT_VERSION, size[0], size[1])
+
+
+def read_frames(stream: BinaryIO) -> Iterator[tuple[float, Image.Image]]:
+    """
+    Read the frames of a frame stream, such as a recording or a viewer socket connection,
+    until the stream ends.
+
+    :param stream: The stream, opened for reading bytes
+    :return: an iterator of (timestamp, frame) pairs
+    :raise ValueError: if the stream isn't a frame stream
+    """
+    header = stream.read(STREAM_HEADER.size)
+    if len(header) < STREAM_HEADER.size:
+        return
+    magic, version, width, height = STREAM_HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not a frame stream")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Frame stream has format version {version}")
+    frame = Image.new("RGB", (width, height))
+    while True:
+        packet = stream.read(PACKET_HEADER.size)
+        if len(packet) < PACKET_HEADER.size:
+            return
+        timestamp, left, top, region_width, region_height = PACKET_HEADER.unpack(packet)
+        if region_width:
+            data = stream.read(region_width * region_height * 3)
+            if len(data) < region_width * region_height * 3:
+                return
+            region = Image.frombytes("RGB", (region_width, region_height), data)
+            frame.paste(region, (left, top))
+        yield timestamp, frame.copy()
+
+
+class RecorderSink(FrameSink):
+    """
+    Records frames to a file as a frame stream, which `read_frames()` plays back.
+    """
+
+    def __init__(self, path: str, key_frame_interval: int = 300):
+        """
+        :param path: The recording's file path. An existing file is replaced.
+        :param key_frame_interval: How often to record a whole frame, in frames
+        """
+        self.path = path
+        self.key_frame_interval = key_frame_interval
+        self.file = open(path, "wb")  # noqa: SIM115 - open for the life of the sink
+        self.encoder = DeltaEncoder()
+        self.frame_count = 0
+
+    def present(self, frame: Image.Image, timestamp: float) -> None:
+        if not self.frame_count:
+            self.file.write(encode_stream_header(frame.size))
+        key_frame = self.frame_count % self.key_frame_interval == 0
+        self.file.write(self.encoder.encode(frame, timestamp, key_frame=key_frame))
+        self.frame_count += 1
+
+    def close(self) -> None:
+        self.file.close()
+        logger.info(f"Recorded {self.frame_count} frames to {self.path}")
+
+
+class SocketSink(FrameSink):
+    """
+    Streams frames to viewers that connect to a socket on this machine. Each viewer gets
+    the current frame whole when it connects, then only the regions that change.
+    """
+
+    def __init__(self, port: int = DEFAULT_VIEWER_PORT, host: str = "127.0.0.1"):
+        """
+        :param port: The port to listen on. Use 0 to pick a free one, then see `port`.
+        :param host: The address to listen on
+        """
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.port = self.listener.getsockname()[1]
+        self.viewers: list[socket.socket] = []
+        self.encoder = DeltaEncoder()
+        logger.info(f"Streaming frames to viewers on {host} port {self.port}")
+
+    def _accept_viewers(self, frame: Image.Image, timestamp: float) -> list[socket.socket]:
+        new_viewers = []
+        while True:
+            try:
+                viewer, address = self.listener.accept()
+            except BlockingIOError:
+                return new_viewers
+            logger.info(f"Viewer connected from {address}")
+            viewer.setblocking(True)
+            viewer.settimeout(1.0)
+            start = encode_stream_header(frame.size) + DeltaEncoder().encode(frame, timestamp)
+            if self._send(viewer, start):
+                new_viewers.append(viewer)
+
+    @staticmethod
+    def _send(viewer: socket.socket, data: bytes) -> bool:
+        try:
+            viewer.sendall(data)
+            return True
+        except OSError as e:
+            logger.info(f"Viewer disconnected: {e}")
+            viewer.close()
+            return False
+
+    def present(self, frame: Image.Image, timestamp: float) -> None:
+        new_viewers = self._accept_viewers(frame, timestamp)
+        packet = self.encoder.encode(frame, timestamp)
+        self.viewers = [viewer for viewer in self.viewers if self._send(viewer, packet)]
+        self.viewers.extend(new_viewers)
+
+    def close(self) -> None:
+        for viewer in self.viewers:
+            viewer.close()
+        self.viewers = []
+        self.listener.close()
+
+
+class QueuedSink(FrameSink):
+    """
+    Presents frames to another sink on a thread of its own, so that a slow sink never holds
+    up the one driving the LED panel. Frames wait in a short queue; when it is full, the
+    oldest frame is dropped.
+    """
+
+    def __init__(self, sink: FrameSink, queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        :param sink: The sink to present frames to
+        :param queue_size: How many frames can wait to be presented
+        """
+        self.sink = sink
+        self.queue: deque[tuple[Image.Image, float]] = deque(maxlen=queue_size)
+        self.condition = threading.Condition()
+        self.busy = False
+        self.closing = False
+        self.dropped_frames = 0
+        self.thread = threading.Thread(
+            target=self._run, name=f"{type(sink).__name__}-queue", daemon=True
+        )
+        self.thread.start()
+
+    def present(self, frame: Image.Image, timestamp: float) -> None:
+        with self.condition:
+            if self.closing:
+                return
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped_frames += 1
+            # the frame is reused by the stage, so the queue keeps a copy
+            self.queue.append((frame.copy(), timestamp))
+            self.condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+                while not self.queue and not self.closing:
+                    self.condition.wait()
+                if not self.queue:
+                    return
+                frame, timestamp = self.queue.popleft()
+                self.busy = True
+            try:
+                self.sink.present(frame, timestamp)
+            except Exception:
+                logger.exception(f"Error presenting a frame to {type(self.sink).__name__}")
+
+    def wait_until_idle(self, timeout: float | None = None) -> bool:
+        """
+        Wait until every queued frame has been presented.
+
+        :param timeout: The longest to wait, in seconds
+        :return: whether the queue was emptied in time
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.queue and not self.busy, timeout)
+
+    def close(self) -> None:
+        """
+        Present the frames still queued, then close the sink.
+        """
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        self.thread.join(timeout=5)
+        if self.dropped_frames:
+            logger.info(f"{type(self.sink).__name__} dropped {self.dropped_frames} frames")
+        self.sink.close()
@@ -0,0 +1,122 @@
+import copy
+import json
+import logging
+from collections.abc import Iterator
+
+from PIL import Image
+from PIL.Image import Image as PILImage
+
+logger = logging.getLogger("lmae.sprite_sheet")
+
+Box = tuple[int, int, int, int]
+
+
+class Sprite:
+    """
+    A sprite's rectangle on a sprite sheet
+    """
+
+    __slots__ = ("box", "name", "position", "size")
+
+    def __init__(self, name: str, position: tuple[int, int], size: tuple[int, int]):
+        self.name = name
+        self.position = position
+        self.size = size
+        self.box: Box = (position[0], position[1], position[0] + size[0], position[1] + size[1])
+
+
+class SpriteSheet:
+    """
+    A sprite sheet image with its spec compiled into sprite rectangles.
+
+    The spec is a dict of sprites by name, each with a `position` and a `size` on the
+    sheet, as in `weather-sprites.json`. It is parsed once, when the sheet is created, and
+    the cropped image of each sprite is cached the first time it is asked for, so that one
+    sheet can be shared by every sprite image actor that draws from it.
+    """
+
+    def __init__(self, image: PILImage, spec: dict):
+        """
+        Create a sprite sheet
+
+        :param image: The sheet image, in RGBA mode
+        :param spec: The sprite specification: a dict of objects with position and size info
+        :raise ValueError: if a sprite in the spec lacks a position or size, or lies outside
+            the sheet image
+        """
+        self.image = image
+        self.spec = spec
+        self.sprites: dict[str, Sprite] = {}
+        for name, entry in spec.items():
+            try:
+                position = (int(entry["position"][0]), int(entry["position"][1]))
+                size = (int(entry["size"][0]), int(entry["size"][1]))
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                raise ValueError(f"Sprite {name!r} needs a position and size: {e}") from e
+            sprite = Sprite(name, position, size)
+            if min(sprite.box) < 0 or sprite.box[2] > image.width or sprite.box[3] > image.height:
+                raise ValueError(f"Sprite {name!r} at {sprite.box} lies outside the sheet")
+            self.sprites[name] = sprite
+        self._crops: dict[str, PILImage] = {}
+
+    @classmethod
+    def from_files(cls, image_filename: str, spec_filename: str) -> "SpriteSheet":
+        """
+        Load a sprite sheet from its image and spec files.
+
+        :param image_filename: The sheet image file path
+        :param spec_filename: The sprite spec JSON file path
+        :return: the sprite sheet
+        """
+        logger.debug(f"Loading sprite sheet image from {image_filename}")
+        with Image.open(image_filename) as image:
+            sheet_image = image.convert("RGBA")
+        logger.debug(f"Loading spec file from {spec_filename}")
+        with open(spec_filename) as spec_file:
+            spec = json.load(spec_file)
+        return cls(sheet_image, spec)
+
+    def with_image(self, image: PILImage) -> "SpriteSheet":
+        """
+        Make a sheet with the same sprites drawn from another image of the same size,
+        e.g. a shadow or recolored version of this sheet. The sprite rectangles are shared.
+
+        :param image: The other sheet image, in RGBA mode
+        :return: the new sprite sheet
+        """
+        if image.size != self.image.size:
+            raise ValueError(f"Sheet image is {image.size}, not {self.image.size}")
+        sheet = copy.copy(self)
+        sheet.image = image
+        sheet._crops = {}
+        return sheet
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.sprites
+
+    def __len__(self) -> int:
+        return len(self.sprites)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sprites)
+
+    def get(self, name: str | None) -> Sprite | None:
+        """
+        :param name: A sprite name
+        :return: the sprite, or None if there is no sprite with that name
+        """
+        return self.sprites.get(name) if name is not None else None
+
+    def crop(self, name: str) -> PILImage:
+        """
+        Get the image of a sprite, cropped from the sheet and cached. The image is shared,
+        so it must not be modified.
+
+        :param name: The sprite name
+        :return: the sprite's image
+        :raise KeyError: if there is no sprite with that name
+        """
+        crop = self._crops.get(name)
+        if crop is None:
+            crop = self._crops[name] = self.image.crop(self.sprites[name].box)
+        return crop
@@ -0,0 +1,126 @@
+import argparse
+import logging
+import os
+import socket
+import time
+
+from lmae.display import VirtualRGBMatrix, VirtualRGBMatrixOptions
+from lmae.frame_ring import DEFAULT_RING_NAME, FrameRing
+from lmae.sinks import read_frames
+
+try:
+    import pygame
+except ImportError:
+    pygame = None  # type: ignore[assignment]
+
+logger = logging.getLogger("lmae.viewer")
+
+# how often to look for a new frame, in seconds
+POLL_INTERVAL = 1.0 / 240
+
+
+def attach(ring_name: str, timeout: float) -> FrameRing:
+    """
+    Attach to a frame ring, waiting for it to be created.
+
+    :param ring_name: The ring's shared memory name
+    :param timeout: How long to wait, in seconds
+    :return: the frame ring
+    :raise FileNotFoundError: if the ring isn't created in time
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return FrameRing.attach(ring_name)
+        except FileNotFoundError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def run_viewer(ring_name: str = DEFAULT_RING_NAME, timeout: float = 10.0) -> None:
+    """
+    Show the frames published to a frame ring on a virtual LED display, until the window
+    is closed or the process that started the viewer exits.
+
+    Only the latest frame is shown; frames published while the viewer was busy are skipped.
+
+    :param ring_name: The ring's shared memory name
+    :param timeout: How long to wait for the ring to be created, in seconds
+    """
+    ring = attach(ring_name, timeout)
+    options = VirtualRGBMatrixOptions()
+    options.cols, options.rows = ring.size
+    matrix = VirtualRGBMatrix(options)
+    pygame.display.set_caption(f"Virtual LED Display - {ring_name}")
+    parent_pid = os.getppid()
+    shown_sequence = 0
+    skipped = 0
+    try:
+        while os.getppid() == parent_pid:
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            sequence = ring.latest_sequence()
+            if sequence == shown_sequence:
+                time.sleep(POLL_INTERVAL)
+                continue
+            frame = ring.read_latest()
+            if frame is None:
+                continue
+            if shown_sequence:
+                skipped += frame.sequence - shown_sequence - 1
+            shown_sequence = frame.sequence
+            matrix.show_frame(frame.image)
+    finally:
+        logger.info(f"Viewer stopping after frame {shown_sequence}, skipped {skipped} frames")
+        ring.close()
+        pygame.quit()
+
+
+def run_socket_viewer(port: int, host: str = "127.0.0.1") -> None:
+    """
+    Show the frames streamed by a `SocketSink` on a virtual LED display, until the window
+    is closed or the stream ends.
+
+    :param port: The port the sink listens on
+    :param host: The address the sink listens on
+    """
+    with socket.create_connection((host, port)) as connection:
+        stream = connection.makefile("rb")
+        matrix = None
+        try:
+            for _, frame in read_frames(stream):
+                if matrix is None:
+                    options = VirtualRGBMatrixOptions()
+                    options.cols, options.rows = frame.size
+                    matrix = VirtualRGBMatrix(options)
+                    pygame.display.set_caption(f"Virtual LED Display - port {port}")
+                if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                    break
+                matrix.show_frame(frame)
+        finally:
+            stream.close()
+            pygame.quit()
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Show published frames on a virtual LED display")
+    parser.add_argument(
+        "--ring", default=DEFAULT_RING_NAME, help="The frame ring's shared memory name"
+    )
+    parser.add_argument(
+        "--timeout", default=10.0, type=float, help="Seconds to wait for the frame ring"
+    )
+    parser.add_argument(
+        "--port", default=None, type=int, help="Read frames from a viewer socket instead"
+    )
+    options = parser.parse_args(args)
+    if options.port is not None:
+        run_socket_viewer(options.port)
+    else:
+        run_viewer(options.ring, options.timeout)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
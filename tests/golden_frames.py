@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+
+from lmae.core import Actor, Animation, Stage
+from tests.testing_matrix import TestingRGBMatrix, TestingRGBMatrixOptions
+
+GOLDEN_DIRECTORY = os.path.join(os.path.dirname(__file__), "golden")
+
+# set this environment variable to write the golden frames from the current rendering
+UPDATE_GOLDEN_ENV = "LMAE_UPDATE_GOLDEN"
+
+
+class SimulatedClock:
+    """
+    A clock for a stage that only moves when it is told to, so that a scene renders the
+    same frames however fast or slow the machine running it is.
+    """
+
+    def __init__(self, start: float = 1.0):
+        self.time = start
+
+    def __call__(self) -> float:
+        return self.time
+
+    def advance(self, seconds: float) -> None:
+        self.time += seconds
+
+
+def render_scene(
+    actors: list[Actor],
+    animations: list[Animation] | None = None,
+    frame_count: int = 30,
+    frame_rate: float = 30.0,
+    size: tuple[int, int] = (64, 32),
+) -> tuple[TestingRGBMatrix, list[str]]:
+    """
+    Render a scene on a testing matrix under a simulated clock.
+
+    :param actors: The actors on the stage
+    :param animations: The animations to run
+    :param frame_count: How many frames to run the scene for
+    :param frame_rate: The frame rate to run at, in frames per second
+    :param size: The stage size, in pixels
+    :return: the matrix, which recorded the frames presented, and the hash of the frame
+        showing on the matrix after each frame, or "" before any frame was presented
+    """
+    options = TestingRGBMatrixOptions()
+    options.cols, options.rows = size
+    matrix = TestingRGBMatrix(options)
+    clock = SimulatedClock()
+    stage = Stage(size=size, actors=actors, animations=animations, matrix=matrix, clock=clock)
+    hashes = []
+    for _ in range(frame_count):
+        stage.render_frame()
+        hashes.append(matrix.frames.hashes[-1] if matrix.frames.hashes else "")
+        clock.advance(1.0 / frame_rate)
+    return matrix, hashes
+
+
+class GoldenFrameTestCase(unittest.TestCase):
+    """
+    A test case that checks the frames a scene renders against golden frame hashes, stored
+    in tests/golden. Run with LMAE_UPDATE_GOLDEN=1 to store the current frames as golden,
+    after a change that is meant to change what is rendered.
+    """
+
+    def assertMatchesGolden(self, name: str, matrix: TestingRGBMatrix, hashes: list[str]):
+        path = os.path.join(GOLDEN_DIRECTORY, f"{name}.json")
+        if os.environ.get(UPDATE_GOLDEN_ENV):
+            os.makedirs(GOLDEN_DIRECTORY, exist_ok=True)
+            with open(path, "w") as file:
+                json.dump({"frames": hashes}, file, indent=1)
+                file.write("\n")
+            return
+        if not os.path.exists(path):
+            self.fail(f"No golden frames for {name}; run with {UPDATE_GOLDEN_ENV}=1 to store them")
+        with open(path) as file:
+            golden = json.load(file)["frames"]
+        if hashes == golden:
+            return
+        if len(hashes) != len(golden):
+            self.fail(f"{name} ran for {len(hashes)} frames, golden has {len(golden)}")
+        index = next(i for i, (a, b) in enumerate(zip(hashes, golden, strict=True)) if a != b)
+        # save the frame that differs, to look at
+        image_path = os.path.join(tempfile.gettempdir(), f"lmae-golden-{name}-{index}.png")
+        if hashes[index]:
+            matrix.frames[matrix.frames.hashes.index(hashes[index])].save(image_path)
+        self.fail(f"{name} differs from golden at frame {index}, saved to {image_path}")
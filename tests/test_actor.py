@@ -1,9 +1,10 @@
 import os
 import unittest
+from unittest.mock import patch
 
 from PIL import Image, ImageDraw, ImageFont
 
-from lmae.actor import Text
+from lmae.actor import GradientRectangle, Text
 from lmae.core import Canvas
 
 
@@ -53,3 +54,104 @@ class TextTest(unittest.TestCase):
             for x in range(text_dimensions[0] + 1, canvas.size[0]):
                 for y in range(text_dimensions[1] + 1, canvas.size[1]):
                     self.assertEqual((0, 0, 0, 255), canvas.image.getpixel((x, y)))
+
+    def test_recolor_does_not_lay_out_text(self):
+        font = ImageFont.truetype(
+            os.path.join(
+                os.path.dirname(__file__),
+                "../examples/fonts/teeny-tiny-pixls-font/TeenyTinyPixls-o2zo.ttf",
+            ),
+            5,
+        )
+        text = Text(font=font, text="12:45", stroke_width=1)
+        with (
+            patch("lmae.glyphs.GlyphAtlas.draw_line") as draw_line,
+            patch.object(font, "getmask2") as getmask2,
+        ):
+            text.set_color((255, 0, 0, 128))
+            text.set_stroke_color((0, 0, 255, 255))
+        draw_line.assert_not_called()
+        getmask2.assert_not_called()
+        self.assertTrue(text.changes_since_last_render)
+
+        expected = Image.new("RGBA", text.rendered_text.size, (0, 0, 0, 0))
+        ImageDraw.Draw(expected).text(
+            (1, 1),
+            "12:45",
+            fill=(255, 0, 0, 128),
+            font=font,
+            stroke_fill=(0, 0, 255, 255),
+            stroke_width=1,
+        )
+        self.assertEqual(expected.tobytes(), text.rendered_text.tobytes())
+
+    def test_rasterize_only_when_visible(self):
+        font = ImageFont.truetype(
+            os.path.join(
+                os.path.dirname(__file__),
+                "../examples/fonts/teeny-tiny-pixls-font/TeenyTinyPixls-o2zo.ttf",
+            ),
+            5,
+        )
+        canvas = Canvas()
+        text = Text(font=font, position=(100, 0))
+        with patch("lmae.glyphs.GlyphAtlas.draw_line") as draw_line:
+            text.set_text("12:45")
+            self.assertGreater(text.size[0], 0)
+            self.assertEqual(text.size, text.measure("12:45"))
+            text.render(canvas)
+            draw_line.assert_not_called()
+
+        text.set_position((0, 0))
+        text.render(canvas)
+        self.assertFalse(text.needs_rasterize)
+        self.assertIsNotNone(canvas.image.getbbox())
+
+
+class GradientRectangleTest(unittest.TestCase):
+    """Tests for cached gradient rendering."""
+
+    def test_vertical_matches_row_interpolation(self):
+        gradient = GradientRectangle(size=(63, 31), top_color=(128, 0, 0), bottom_color=(0, 0, 64))
+        canvas = Canvas(background_fill=False)
+        gradient.render(canvas)
+        for y in range(32):
+            expected = GradientRectangle.interpolate_color((128, 0, 0), (0, 0, 64), y / 31)
+            self.assertEqual(expected, canvas.image.getpixel((0, y)), f"row {y}")
+            self.assertEqual(expected, canvas.image.getpixel((63, y)), f"row {y}")
+
+    def test_gradient_is_drawn_once(self):
+        gradient = GradientRectangle(size=(15, 7))
+        canvas = Canvas(size=(16, 8))
+        gradient.render(canvas)
+        image = gradient.gradient_image
+        gradient.set_position((1, 1))
+        gradient.render(canvas)
+        self.assertIs(image, gradient.gradient_image)
+
+        gradient.set_top_color((255, 0, 0, 255))
+        self.assertTrue(gradient.changes_since_last_render)
+        self.assertIsNone(gradient.gradient_image)
+        gradient.render(canvas)
+        self.assertEqual((255, 0, 0, 255), canvas.image.getpixel((1, 1)))
+
+    def test_orientations_and_stops(self):
+        red, green, blue = (255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 255)
+        stops = [(0.0, red), (0.5, green), (1.0, blue)]
+        horizontal = GradientRectangle(size=(10, 2), orientation="horizontal", stops=stops)
+        canvas = Canvas(size=(11, 3))
+        horizontal.render(canvas)
+        self.assertEqual([red, green, blue], [canvas.image.getpixel((x, 1)) for x in (0, 5, 10)])
+
+        radial = GradientRectangle(
+            size=(20, 20), orientation="radial", top_color=red, bottom_color=blue
+        )
+        canvas = Canvas(size=(21, 21))
+        radial.render(canvas)
+        self.assertEqual(red, canvas.image.getpixel((10, 10)))
+        self.assertEqual(blue, canvas.image.getpixel((0, 0)))
+
+        with self.assertRaises(ValueError):
+            GradientRectangle(stops=[(0.5, red), (0.2, blue)])
+        with self.assertRaises(ValueError):
+            GradientRectangle(orientation="diagonal")
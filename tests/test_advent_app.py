@@ -6,7 +6,7 @@ import freezegun
 from PIL import Image
 
 from examples.advent_app import AdventApp
-from lmae.core import Stage
+from lmae.core import Canvas, Stage
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s %(name)12s [%(levelname)5s]: %(message)s"
@@ -170,6 +170,33 @@ class TestAdventApp(TestCase):
             self.assertEqual(advent_app.line_1_label.text, "days")
             self.assertEqual(advent_app.line_2_label.text, "until")
 
+    def test_scheduled_countdown_updates(self):
+        resource_path = os.path.join(os.path.dirname(__file__), "../examples")
+        with freezegun.freeze_time("2023-12-24 22:59:30") as frozen_time:
+            advent_app = AdventApp(
+                font_path=os.path.join(resource_path, "fonts"),
+                image_path=os.path.join(resource_path, "images"),
+            )
+            advent_app.prepare()
+            advent_app.update_view()
+            self.assertEqual(advent_app.counter_label.text, "2")
+            self.assertEqual(advent_app.line_1_label.text, "hours")
+            self.assertEqual(22, advent_app.last_hour)
+
+            # nothing changes until the top of the minute
+            frozen_time.tick(29.0)
+            advent_app.run_scheduled()
+            advent_app.update_view()
+            self.assertEqual(advent_app.counter_label.text, "2")
+
+            frozen_time.tick(1.0)
+            advent_app.run_scheduled()
+            advent_app.update_view()
+            self.assertEqual(advent_app.counter_label.text, "60")
+            self.assertEqual(advent_app.line_1_label.text, "mins")
+            self.assertEqual(23, advent_app.last_hour)
+            advent_app.stop()
+
     def test_determine_light_patterns_and_color(self):
         logger = logging.getLogger("TestAdventApp.test_determine_light_patterns_and_color")
         resource_path = os.path.join(os.path.dirname(__file__), "../examples")
@@ -189,3 +216,23 @@ class TestAdventApp(TestCase):
             )
 
         self.assertEqual(12, len(distinct_patterns))
+
+    def test_labels_are_centered_by_their_width(self):
+        resource_path = os.path.join(os.path.dirname(__file__), "../examples")
+        advent_app = AdventApp(
+            font_path=os.path.join(resource_path, "fonts"),
+            image_path=os.path.join(resource_path, "images"),
+        )
+        # the left edge of each label's ink, as the app has always drawn them
+        counter_lefts = [12, 12, 12, 12, 11, 13, 12, 12, 12, 12, 9, 9, 9]
+        counter_lefts += [9, 8, 9, 9, 9, 9, 9, 8, 8, 8, 8, 7, 8]
+        for days, counter_left in enumerate(counter_lefts):
+            with self.subTest(days=days):
+                advent_app.days_until_christmas = days
+                advent_app.update_view()
+                lefts = []
+                for label in (advent_app.counter_label, advent_app.line_1_label):
+                    canvas = Canvas(size=(64, 32), background_fill=False)
+                    label.render(canvas)
+                    lefts.append(canvas.image.getbbox()[0])
+                self.assertEqual([counter_left, 8], lefts)
@@ -0,0 +1,192 @@
+import gc
+import os
+import tracemalloc
+import unittest
+from array import array
+from collections.abc import Callable
+
+from PIL import Image, ImageDraw, ImageFont
+
+from lmae.actor import CropMask, Rectangle, Text
+from lmae.animation import StraightMove
+from lmae.core import Actor, Animation, Canvas, Stage
+from tests.golden_frames import SimulatedClock
+from tests.testing_matrix import TestingRGBMatrix, TestingRGBMatrixOptions
+
+FONT_PATH = os.path.join(
+    os.path.dirname(__file__), "../examples/fonts/teeny-tiny-pixls-font/TeenyTinyPixls-o2zo.ttf"
+)
+
+# CPython creates and frees an iterator for each loop and objects for some numbers as it
+# goes, which tracemalloc sees. That is all a steady-state frame may allocate on the Python
+# heap: any Image object, canvas, or list of drawing arguments is bigger than this.
+# tracemalloc can't see the pixel buffers that Pillow allocates in C, so those are checked
+# separately, by counting the images that Pillow creates.
+TRANSIENT_BYTES = 256
+
+WARMUP_FRAMES = 90
+MEASURED_FRAMES = 120
+
+
+def measure_frames(render_frame: Callable[[], None], frames: int) -> tuple[int, int, int]:
+    """
+    Measure what frames allocate, with tracemalloc. The measurement itself allocates a few
+    objects, so measure a function that does nothing too, and subtract.
+
+    :param render_frame: Renders a frame
+    :param frames: How many frames to measure
+    :return: the most memory allocated at any point in a frame, and the memory still
+        allocated after all the frames, in bytes, and how many more objects there were for
+        the garbage collector after all the frames
+    """
+    # peaks go in an array allocated up front, so that storing them allocates nothing
+    peaks = array("q", bytes(8 * frames))
+    gc_count = gc.get_count()[0]
+    start = tracemalloc.get_traced_memory()[0]
+    for index in range(frames):
+        frame_start = tracemalloc.get_traced_memory()[0]
+        # the peak is reset after `frame_start` is allocated, so that it only counts the frame
+        tracemalloc.reset_peak()
+        render_frame()
+        peaks[index] = tracemalloc.get_traced_memory()[1] - frame_start
+    retained = tracemalloc.get_traced_memory()[0] - start
+    return max(peaks), retained, gc.get_count()[0] - gc_count
+
+
+def count_new_images(render_frame: Callable[[], None], frames: int) -> int:
+    """
+    Count the images, and so the pixel buffers, that Pillow creates in frames.
+
+    :param render_frame: Renders a frame
+    :param frames: How many frames to count
+    :return: the most images created in any one frame
+    """
+    most = 0
+    for _ in range(frames):
+        before = Image.core.get_stats()["new_count"]
+        render_frame()
+        most = max(most, Image.core.get_stats()["new_count"] - before)
+    return most
+
+
+class SteadyStateAllocationTest(unittest.TestCase):
+    """Tests that frames allocate nothing once a scene is rendering steadily."""
+
+    def setUp(self):
+        self.font = ImageFont.truetype(FONT_PATH, 5)
+
+    def assertSteadyState(
+        self, actors: list[Actor], animations: list[Animation], images_per_frame: int = 0
+    ):
+        options = TestingRGBMatrixOptions()
+        matrix = TestingRGBMatrix(options)
+        matrix.recording = False
+        clock = SimulatedClock()
+        stage = Stage(actors=actors, animations=animations, matrix=matrix, clock=clock)
+
+        def render_frame():
+            stage.render_frame()
+            clock.advance(1.0 / 30)
+
+        for _ in range(WARMUP_FRAMES):
+            render_frame()
+        gc.disable()
+        tracemalloc.start()
+        try:
+            overhead = measure_frames(lambda: None, MEASURED_FRAMES)
+            measured = measure_frames(render_frame, MEASURED_FRAMES)
+        finally:
+            tracemalloc.stop()
+            gc.enable()
+        peak, retained, gc_objects = (a - b for a, b in zip(measured, overhead, strict=True))
+        self.assertEqual(0, retained, "Frames left memory allocated")
+        self.assertEqual(0, gc_objects, "Frames left objects for the garbage collector")
+        self.assertLessEqual(peak, TRANSIENT_BYTES, "Frames allocated buffers")
+        self.assertEqual(
+            images_per_frame,
+            count_new_images(render_frame, MEASURED_FRAMES),
+            "Frames allocated image buffers",
+        )
+        return stage
+
+    def test_static_scene(self):
+        actors = [
+            Rectangle(position=(10, 10), size=(5, 3), color=(255, 0, 0, 255)),
+            Text(font=self.font, position=(2, 2), text="STILL"),
+        ]
+        stage = self.assertSteadyState(actors, [])
+        self.assertFalse(stage.needs_render)
+
+    def test_moving_text_scene(self):
+        text = Text(font=self.font, position=(2, 2), text="HELLO", color=(255, 255, 0, 255))
+        actors = [
+            Rectangle(position=(0, 20), size=(63, 11), color=(0, 0, 128, 255)),
+            text,
+        ]
+        move = StraightMove(actor=text, distance=(40, 12), duration=2.0, repeat=True)
+        self.assertSteadyState(actors, [move])
+        self.assertTrue(text.binary_alpha)
+
+    def test_moving_crop_mask_scene(self):
+        text = Text(font=self.font, position=(4, 8), text="CROPPED")
+        crop = CropMask(child=text, crop_area=(8, 4, 40, 20))
+        move = StraightMove(actor=text, distance=(30, 0), duration=1.5, repeat=True)
+        # the crop canvas is alpha composited onto the stage, and Pillow's alpha compositing
+        # always returns a new image
+        self.assertSteadyState([crop], [move], images_per_frame=1)
+
+
+class CanvasCompositeTest(unittest.TestCase):
+    """Tests that compositing onto a canvas matches Pillow's alpha compositing."""
+
+    def setUp(self):
+        self.partial = Image.new("RGBA", (8, 6))
+        self.partial.putdata(
+            [
+                ((x * 37) % 256, (y * 53) % 256, 90, (x * y * 29) % 256)
+                for y in range(6)
+                for x in range(8)
+            ]
+        )
+        self.binary = Image.new("RGBA", (8, 6))
+        self.binary.putdata(
+            [(200, x * 20, y * 30, 255 if (x + y) % 3 else 0) for y in range(6) for x in range(8)]
+        )
+
+    def test_matches_alpha_composite(self):
+        for background_fill in (True, False):
+            for image, binary_alpha in ((self.partial, False), (self.binary, True)):
+                for position in ((0, 0), (5, 3), (-3, -2), (60, 29), (-8, 0)):
+                    with self.subTest(
+                        background_fill=background_fill,
+                        binary_alpha=binary_alpha,
+                        position=position,
+                    ):
+                        canvas = Canvas(size=(64, 32), background_fill=background_fill)
+                        canvas.draw_rectangle((2, 1, 30, 20), fill=(10, 200, 30, 128))
+                        expected = canvas.image.copy()
+                        self._alpha_composite(expected, image, position)
+                        canvas.composite(image, position, binary_alpha)
+                        self.assertEqual(expected.tobytes(), canvas.image.tobytes())
+
+    @staticmethod
+    def _alpha_composite(background: Image.Image, image: Image.Image, position: tuple[int, int]):
+        # Pillow can't alpha composite at negative positions, so crop the image instead
+        left, top = max(0, -position[0]), max(0, -position[1])
+        cropped = image.crop((left, top, *image.size))
+        background.alpha_composite(cropped, dest=(position[0] + left, position[1] + top))
+
+    def test_draw_rectangle_matches_image_draw(self):
+        canvas = Canvas(size=(16, 16))
+        expected = canvas.image.copy()
+        ImageDraw.Draw(expected).rectangle(
+            (2, 3, 12, 9), fill=(255, 0, 0, 255), outline=(0, 255, 0, 255), width=2
+        )
+        canvas.draw_rectangle(
+            (2, 3, 12, 9), fill=(255, 0, 0, 255), outline=(0, 255, 0, 255), width=2
+        )
+        self.assertEqual(expected.tobytes(), canvas.image.tobytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
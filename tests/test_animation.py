@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import MagicMock
 
-from lmae.animation import Easing, HueFade, Parallel, Sequence, Still
+from lmae.animation import Easing, HueFade, HueRotate, Parallel, Sequence, Still
 
 
 class EasingTest(unittest.TestCase):
@@ -323,6 +323,81 @@ class HueFadeTest(unittest.TestCase):
         fade.update_actor(101.0)
         self.assertEqual(0, received[-1][3], "Should end invisible")
 
+    def test_fades_share_color_ramp(self):
+        """Fades with the same colors and easing share one precomputed ramp."""
+        actor = MagicMock()
+        fade_a = HueFade(
+            actor=actor,
+            callback=MagicMock(),
+            initial_color=(255, 0, 0),
+            final_color=(0, 0, 255),
+            duration=1.0,
+        )
+        fade_b = HueFade(
+            actor=actor,
+            callback=MagicMock(),
+            initial_color=[255, 0, 0],
+            final_color=[0, 0, 255],
+            duration=5.0,
+        )
+        fade_c = HueFade(
+            actor=actor,
+            callback=MagicMock(),
+            initial_color=(255, 0, 0),
+            final_color=(0, 0, 255),
+            easing=Easing.QUADRATIC,
+            duration=1.0,
+        )
+        self.assertIs(fade_a._ramp, fade_b._ramp)
+        self.assertIsNot(fade_a._ramp, fade_c._ramp)
+
+    def test_callback_only_on_color_change(self):
+        """The callback is not invoked again while the quantized color is unchanged."""
+        callback = MagicMock()
+        actor = MagicMock()
+        fade = HueFade(
+            actor=actor,
+            callback=callback,
+            initial_color=(255, 0, 0),
+            final_color=(0, 0, 255),
+            duration=2.0,
+        )
+        fade.start(100.0)
+        fade.update_actor(100.0)
+        fade.update_actor(100.0001)
+        self.assertEqual(1, callback.call_count)
+        fade.update_actor(103.0)
+        fade.update_actor(104.0)
+        self.assertEqual(2, callback.call_count)
+
+        # after a reset, the first update applies the color again
+        fade.reset()
+        fade.start(200.0)
+        fade.update_actor(200.0)
+        self.assertEqual(3, callback.call_count)
+        callback.assert_called_with((255, 0, 0))
+
+
+class HueRotateTest(unittest.TestCase):
+    """Tests for HueRotate color cycling."""
+
+    def test_rotation_returns_to_initial_color(self):
+        received = []
+        actor = MagicMock()
+        rotate = HueRotate(
+            actor=actor,
+            callback=lambda c: received.append(c),
+            initial_color=(255, 0, 0),
+            duration=3.0,
+        )
+        rotate.start(100.0)
+        rotate.update_actor(100.0)
+        self.assertEqual((255, 0, 0), received[-1])
+        rotate.update_actor(101.0)  # a third of the way around the wheel
+        self.assertEqual((0, 255, 0), received[-1])
+        rotate.update_actor(103.0)
+        self.assertEqual((255, 0, 0), received[-1])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from lmae.assets import AssetRegistry
+
+RESOURCE_PATH = os.path.join(os.path.dirname(__file__), "../examples")
+FONT_PATH = os.path.join(RESOURCE_PATH, "fonts/Roboto/Roboto-Light.ttf")
+
+
+class AssetRegistryTest(unittest.TestCase):
+    """Tests for sharing, reference counting, and evicting assets."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # three 16x16 RGBA images, 1 KB each when decoded
+        self.image_paths = []
+        for index in range(3):
+            path = os.path.join(self.temp_dir.name, f"image-{index}.png")
+            Image.new("RGB", (16, 16), (index, 0, 0)).save(path)
+            self.image_paths.append(path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_assets_are_shared_by_path_and_parameters(self):
+        registry = AssetRegistry()
+        image = registry.image(self.image_paths[0], owner="weather")
+        same_path = os.path.join(self.temp_dir.name, ".", "image-0.png")
+        self.assertIs(image, registry.image(same_path, owner="world-clock"))
+        self.assertEqual("RGBA", image.mode)
+        self.assertIsNot(image, registry.image(self.image_paths[0], mode="L"))
+
+        font = registry.font(FONT_PATH, 15, owner="weather")
+        self.assertIs(font, registry.font(FONT_PATH, 15, owner="advent"))
+        self.assertIsNot(font, registry.font(FONT_PATH, 5))
+
+    def test_reference_counts(self):
+        registry = AssetRegistry()
+        image = registry.image(self.image_paths[0], owner="weather")
+        registry.image(self.image_paths[0], owner="weather")
+        registry.image(self.image_paths[0], owner="world-clock")
+        self.assertEqual(2, registry.reference_count(image))
+        registry.release("weather")
+        self.assertEqual(1, registry.reference_count(image))
+        self.assertIn(image, registry)
+
+    def test_evicts_assets_unused_by_active_owner(self):
+        registry = AssetRegistry(max_bytes=2 * 16 * 16 * 4)
+        registry.activate("weather")
+        weather_image = registry.image(self.image_paths[0], owner="weather")
+        clock_image = registry.image(self.image_paths[1], owner="world-clock")
+        self.assertEqual(2, len(registry))
+
+        # over budget: the other app's image goes first, even though it was used more recently
+        registry.image(self.image_paths[2], owner="weather")
+        self.assertIn(weather_image, registry)
+        self.assertNotIn(clock_image, registry)
+        self.assertEqual(2 * 16 * 16 * 4, registry.total_bytes)
+
+        # once evicted, the next load gets a fresh copy
+        registry.activate("world-clock")
+        reloaded = registry.image(self.image_paths[1], owner="world-clock")
+        self.assertIsNot(clock_image, reloaded)
+        self.assertIn(reloaded, registry)
+
+
+if __name__ == "__main__":
+    unittest.main()
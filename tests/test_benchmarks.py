@@ -0,0 +1,101 @@
+import time
+import unittest
+
+from benchmarks.harness import (
+    AppDriver,
+    compare,
+    create_headless_matrix,
+    percentile,
+    simulated_time,
+    summarize,
+)
+from benchmarks.scaling import SceneBuilder, measure_scene, text_chart
+from benchmarks.soak import SoakTest, check_growth
+from examples import render_test
+from lmae.actor import Rectangle
+
+
+class HarnessTest(unittest.TestCase):
+    """Tests for the benchmark harness."""
+
+    def test_percentile(self):
+        values = [float(value) for value in range(100, 0, -1)]
+        self.assertEqual(50.0, percentile(values, 0.5))
+        self.assertEqual(99.0, percentile(values, 0.99))
+        self.assertEqual(0.0, percentile([], 0.5))
+
+    def test_regressions_beyond_tolerance_are_reported(self):
+        baseline = {"app": {"fps": 100.0, "p99_ms": 10.0}}
+        results = {"app": {"fps": 90.0, "p99_ms": 16.0}, "new_app": {"fps": 1.0}}
+        regressions = compare(results, baseline, tolerances={"fps": -0.15, "p99_ms": 0.5})
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith("app p99_ms"))
+
+    def test_app_runs_in_simulated_time(self):
+        with simulated_time() as clock:
+            matrix, options = create_headless_matrix()
+            app = render_test.create_app()
+            app.set_matrix(matrix=matrix, options=options)
+            driver = AppDriver(app, clock, frame_rate=30)
+            start = time.time()
+            metrics = summarize(driver.run_for(2.0))
+            self.assertAlmostEqual(2.0, time.time() - start, places=3)
+            driver.stop()
+            matrix.close()
+        self.assertEqual(60, metrics["frames"])
+        self.assertGreater(metrics["fps"], 0)
+        self.assertLessEqual(metrics["p50_ms"], metrics["p99_ms"])
+
+
+class ScalingTest(unittest.TestCase):
+    """Tests for the synthetic scaling benchmark."""
+
+    def test_scenes_have_each_actor_type(self):
+        builder = SceneBuilder((64, 32))
+        actors = builder.actors(10)
+        self.assertEqual(
+            ["Text", "StillImage", "SpriteImage", "Rectangle", "CropMask"] * 2,
+            [type(actor).__name__ for actor in actors],
+        )
+        self.assertEqual(25, len(builder.animations(actors, 25)))
+
+    def test_scene_is_measured(self):
+        metrics = measure_scene(8, 4, size=(128, 64), frames=5)
+        self.assertEqual(
+            (5, 8, 4, 128),
+            (metrics["frames"], metrics["actors"], metrics["animations"], metrics["width"]),
+        )
+        chart = text_chart({"actors: mixed": {"mixed x8": metrics}})
+        self.assertIn("actors: mixed", chart)
+
+
+class SoakTestTest(unittest.TestCase):
+    """Tests for the soak test harness."""
+
+    def soak(self, leak: bool = False) -> list[str]:
+        leaked = []
+        with simulated_time() as clock:
+            matrix, options = create_headless_matrix()
+            apps = [render_test.create_app(), render_test.create_app()]
+            for app in apps:
+                app.set_matrix(matrix=matrix, options=options)
+            if leak:
+                apps[0].set_pre_render_callback(lambda: leaked.append(Rectangle()))
+            soak = SoakTest(apps, frame_rate=2, cycle_seconds=120, sample_seconds=300)
+            samples = soak.run(clock, hours=0.5)
+            matrix.close()
+        self.assertEqual(7, len(samples))
+        self.assertAlmostEqual(0.5, samples[-1].simulated_hours)
+        return check_growth(samples, warmup_hours=0.25)
+
+    def test_steady_apps_pass(self):
+        self.assertEqual([], self.soak())
+
+    def test_leaks_are_reported(self):
+        failures = self.soak(leak=True)
+        self.assertTrue(any(failure.startswith("Live Rectangle objects") for failure in failures))
+        self.assertTrue(any(failure.startswith("Loggers grew") for failure in failures))
+
+
+if __name__ == "__main__":
+    unittest.main()
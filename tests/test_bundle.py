@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image, ImageFont
+
+from lmae.actor import Text
+from lmae.assets import AssetRegistry
+from lmae.bundle import AssetBundle, BundleBuilder, _source_stamp, find_bundle
+from lmae.glyphs import get_glyph_atlas
+
+RESOURCE_PATH = os.path.join(os.path.dirname(__file__), "../examples")
+FONT_PATH = os.path.join(RESOURCE_PATH, "fonts/et-bt6001-font/EtBt6001-JO47.ttf")
+
+
+class AssetBundleTest(unittest.TestCase):
+    """Tests for building and loading memory-mapped asset bundles."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        Image.new("RGB", (5, 3), (10, 20, 30)).save(os.path.join(self.root, "image.png"))
+        with open(os.path.join(self.root, "spec.json"), "w") as file:
+            file.write('{"sprites": [1, 2, 3]}')
+        shutil.copy(FONT_PATH, os.path.join(self.root, "font.ttf"))
+        self.bundle_path = os.path.join(self.root, "assets.lmab")
+        builder = BundleBuilder(self.root)
+        builder.add_image("image.png")
+        builder.add_image("image.png", mode="L")
+        builder.add_json("spec.json")
+        builder.add_glyphs("font.ttf", 10, stroke_width=1, characters="AVa1 ")
+        builder.write(self.bundle_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def test_images_are_read_only_views(self):
+        bundle = find_bundle(self.root)
+        self.assertEqual(5, len(bundle))
+        image = bundle.image(self.path("image.png"))
+        self.assertEqual(("RGBA", (5, 3)), (image.mode, image.size))
+        self.assertTrue(image.readonly)
+        with Image.open(self.path("image.png")) as source:
+            self.assertEqual(source.convert("RGBA").tobytes(), image.tobytes())
+            self.assertEqual(
+                source.convert("L").tobytes(), bundle.image(self.path("image.png"), "L").tobytes()
+            )
+        self.assertEqual(5 * 3 * 4, len(bundle.buffer(self.path("image.png"))))
+        self.assertEqual({"sprites": [1, 2, 3]}, bundle.json(self.path("spec.json")))
+        self.assertIsNone(bundle.image(self.path("image.png"), "RGB"))
+
+    def test_changed_sources_are_not_used(self):
+        Image.new("RGB", (6, 3)).save(self.path("image.png"))
+        bundle = AssetBundle(self.bundle_path)
+        self.assertIsNone(bundle.image(self.path("image.png")))
+
+        # without its sources, the bundle is used as is
+        os.remove(self.path("image.png"))
+        self.assertEqual((5, 3), bundle.image(self.path("image.png")).size)
+
+    def test_sources_copied_with_new_times_are_used(self):
+        # as after a checkout, or a copy that doesn't keep modification times
+        for name in ("image.png", "spec.json", "font.ttf"):
+            os.utime(self.path(name), (1_000_000_000, 1_000_000_000))
+        bundle = AssetBundle(self.bundle_path)
+        self.assertTrue(bundle.image(self.path("image.png")).readonly)
+        self.assertEqual({"sprites": [1, 2, 3]}, bundle.json(self.path("spec.json")))
+        self.assertEqual(1, bundle.load_glyphs(ImageFont.truetype(self.path("font.ttf"), 10)))
+
+    def test_changed_sources_of_the_same_size_are_not_used(self):
+        with open(self.path("spec.json"), "w") as file:
+            file.write('{"sprites": [4, 5, 6]}')
+        self.assertIsNone(AssetBundle(self.bundle_path).json(self.path("spec.json")))
+
+    def test_out_of_date_bundle_warns_once(self):
+        Image.new("RGB", (6, 3)).save(self.path("image.png"))
+        with open(self.path("spec.json"), "w") as file:
+            file.write('{"sprites": []}')
+        bundle = AssetBundle(self.bundle_path)
+        with self.assertLogs("lmae.bundle", "WARNING") as logs:
+            self.assertIsNone(bundle.image(self.path("image.png")))
+            self.assertIsNone(bundle.image(self.path("image.png")))
+            self.assertIsNone(bundle.json(self.path("spec.json")))
+        self.assertEqual(1, len(logs.records))
+
+    def test_bundled_glyphs_render_the_same(self):
+        font = ImageFont.truetype(self.path("font.ttf"), 10)
+        self.assertEqual(1, AssetBundle(self.bundle_path).load_glyphs(font))
+        atlas = get_glyph_atlas(font, 1)
+        self.assertTrue(atlas.glyph("A", stroked=True).mask.readonly)
+
+        bundled = Text(text="AVa 1", font=font, stroke_width=1, stroke_color=(255, 0, 0, 255))
+        plain_font = ImageFont.truetype(FONT_PATH, 10)
+        plain = Text(text="AVa 1", font=plain_font, stroke_width=1, stroke_color=(255, 0, 0, 255))
+        self.assertEqual(plain.rendered_text.tobytes(), bundled.rendered_text.tobytes())
+
+    def test_glyphs_are_bundled_per_face(self):
+        # another face of the same file at the same size, as in a font collection
+        font = ImageFont.truetype(self.path("font.ttf"), 10)
+        font.index = 1
+        self.assertEqual(0, AssetBundle(self.bundle_path).load_glyphs(font))
+
+    def test_registry_loads_from_bundle(self):
+        registry = AssetRegistry()
+        self.assertIsNotNone(registry.load_bundle(self.root))
+        self.assertTrue(registry.image(self.path("image.png")).readonly)
+        self.assertEqual({"sprites": [1, 2, 3]}, registry.json(self.path("spec.json")))
+
+    def test_registry_loads_fonts_from_bundle(self):
+        registry = AssetRegistry()
+        registry.load_bundle(self.root)
+        os.remove(self.path("font.ttf"))
+        font = registry.font(self.path("font.ttf"), 10)
+        self.assertNotIsInstance(font.path, str)
+        self.assertTrue(get_glyph_atlas(font, 1).glyph("A", stroked=True).mask.readonly)
+
+    def test_unchanged_sources_are_not_hashed(self):
+        with patch("lmae.bundle._source_stamp", wraps=_source_stamp) as stamp:
+            bundle = AssetBundle(self.bundle_path)
+            self.assertIsNotNone(bundle.image(self.path("image.png")))
+            self.assertIsNotNone(bundle.json(self.path("spec.json")))
+            stamp.assert_not_called()
+
+            verified = AssetBundle(self.bundle_path, verify=True)
+            self.assertIsNotNone(verified.image(self.path("image.png")))
+            stamp.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
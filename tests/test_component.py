@@ -0,0 +1,249 @@
+import gc
+import os
+import tempfile
+import time
+import unittest
+import weakref
+from unittest.mock import MagicMock
+
+from freezegun import freeze_time
+from PIL import Image
+
+from lmae.actor import Rectangle
+from lmae.animation import Sequence, Still, StraightMove
+from lmae.component import AnimatedImage, BakedLoop, FrameStrip, FrameStripCache
+from lmae.core import Canvas, Stage
+from lmae.frames import CompactFrameStore, StreamingFrames
+
+GIF_PATH = os.path.join(os.path.dirname(__file__), "../examples/images/kirby-walk-anim.gif")
+
+
+class BakedLoopTest(unittest.TestCase):
+    """Tests for baking looping animations into frame strips."""
+
+    def setUp(self):
+        self.cache = FrameStripCache()
+        self.rectangle = Rectangle(name="BakedRectangle", position=(0, 0), size=(3, 3))
+        self.loop_sequence = Sequence(
+            actor=self.rectangle,
+            repeat=True,
+            animations=[
+                Still(actor=self.rectangle, duration=1.0),
+                StraightMove(actor=self.rectangle, distance=(8, 0), duration=1.0),
+                StraightMove(actor=self.rectangle, distance=(-8, 0), duration=1.0),
+            ],
+        )
+        self.baked = BakedLoop(
+            actor=self.rectangle,
+            animations=[self.loop_sequence],
+            period=3.0,
+            key="baked-rectangle",
+            bounds=(0, 0, 16, 8),
+            frame_rate=10.0,
+            cache=self.cache,
+        )
+
+    def test_bake_deduplicates_frames(self):
+        strip = self.baked.bake()
+        self.assertEqual(30, len(strip.frame_map))
+        # the still second collapses into a single frame, and each position appears once
+        self.assertEqual(9, strip.image.height // 8)
+        self.assertEqual(len(set(strip.frame_map)), strip.image.height // 8)
+        self.assertEqual((0, 0), self.rectangle.position)
+        self.assertIn("baked-rectangle", self.cache)
+
+    def test_playback_matches_live_render(self):
+        strip = self.baked.bake()
+
+        # run the same actor and animation live on a stage, one frame per tick
+        stage = Stage(size=(16, 8), matrix=MagicMock(), actors=[self.rectangle])
+        stage.add_animation(self.loop_sequence)
+        with freeze_time("2025-01-01 12:00:00") as frozen_time:
+            for step in range(len(strip.frame_map)):
+                stage.update_actors()
+                stage.prepare_frame()
+                stage.render_actors()
+                stage.post_render()
+
+                baked_canvas = Canvas(size=(16, 8))
+                self.baked.set_step(step)
+                self.baked.render(baked_canvas)
+                self.assertEqual(
+                    stage.canvas.image.tobytes(), baked_canvas.image.tobytes(), f"step {step}"
+                )
+                frozen_time.tick(0.1)
+
+    def test_strip_is_shared_by_key(self):
+        strip = self.baked.bake()
+        other = BakedLoop(actor=self.rectangle, period=3.0, key="baked-rectangle", cache=self.cache)
+        self.assertIs(strip, other.bake())
+
+    def test_evicted_strip_is_not_kept(self):
+        strip = weakref.ref(self.baked.bake())
+        self.cache.clear()
+        gc.collect()
+        self.assertIsNone(strip())
+
+        # drawing bakes it again
+        self.baked.render(Canvas(size=(16, 8)))
+        self.assertIn("baked-rectangle", self.cache)
+
+    def test_playback_steps_with_time(self):
+        self.baked.bake()
+        self.baked.playback.start(100.0)
+        self.baked.playback.update_actor(101.55)
+        self.assertEqual(15, self.baked.step)
+        self.assertTrue(self.baked.changes_since_last_render)
+
+
+class FrameStripCacheTest(unittest.TestCase):
+    """Tests for LRU eviction of frame strips under a memory budget."""
+
+    @staticmethod
+    def make_strip() -> FrameStrip:
+        return FrameStrip(Image.new("RGBA", (16, 16)), (16, 16), [0])
+
+    def test_evicts_least_recently_used(self):
+        cache = FrameStripCache(max_bytes=2 * 16 * 16 * 4)
+        cache.put("a", self.make_strip())
+        cache.put("b", self.make_strip())
+        cache.get("a")
+        cache.put("c", self.make_strip())
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(2 * 16 * 16 * 4, cache.total_bytes)
+
+    def test_keeps_oversized_newest_strip(self):
+        cache = FrameStripCache(max_bytes=10)
+        cache.put("a", self.make_strip())
+        cache.put("b", self.make_strip())
+        self.assertEqual(1, len(cache))
+        self.assertIn("b", cache)
+
+
+class StreamingFramesTest(unittest.TestCase):
+    """Tests for decoding animated image frames on demand."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_frames_match_eager_decoding(self):
+        eager = AnimatedImage()
+        eager.set_from_file(GIF_PATH, compact=False)
+        streaming = AnimatedImage()
+        streaming.set_from_file(GIF_PATH, streaming=True)
+        frames = streaming.multi_frame_image.images
+        self.assertIsInstance(frames, StreamingFrames)
+        self.assertEqual(eager.sequence.frames_info, streaming.sequence.frames_info)
+        self.assertEqual(eager.sequence.duration, streaming.sequence.duration)
+        for index, image in enumerate(eager.multi_frame_image.images):
+            self.assertEqual(image.tobytes(), frames[index].tobytes(), f"frame {index}")
+        streaming.close()
+
+    def test_replaced_and_closed_frames_are_closed(self):
+        image = AnimatedImage()
+        image.set_from_file(GIF_PATH, streaming=True)
+        first = image.multi_frame_image.images
+        first[0]
+        image.set_from_file(GIF_PATH, streaming=True)
+        second = image.multi_frame_image.images
+        second[0]
+        self.assertFalse(first._thread.is_alive())
+        with self.assertRaises(ValueError):
+            first[0]
+
+        image.close()
+        self.assertFalse(second._thread.is_alive())
+        with self.assertRaises(ValueError):
+            second[0]
+
+    def test_timing_is_read_without_decoding(self):
+        path = os.path.join(self.temp_dir.name, "timing.gif")
+        images = [Image.new("RGB", (4, 4), (index * 60, 0, 0)) for index in range(4)]
+        images[0].save(path, save_all=True, append_images=images[1:], duration=[50, 0, 120, 30])
+        frames = StreamingFrames(path)
+        self.assertEqual([0.05, 1.0 / 6, 0.12, 0.03], frames.durations)
+        self.assertEqual(4, len(frames))
+        self.assertEqual(0, frames.decode_count)
+        frames.close()
+
+    def test_cache_is_bounded_and_prefetches(self):
+        frames = StreamingFrames(GIF_PATH, cache_size=3, prefetch=2)
+        for index in range(len(frames)):
+            frames[index]
+        # the last frame asked for is followed by the first two, decoded in the background
+        deadline = time.monotonic() + 5
+        while frames.cached_frames() != [7, 0, 1] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([7, 0, 1], frames.cached_frames())
+        decode_count = frames.decode_count
+        frames[0]
+        self.assertEqual(decode_count, frames.decode_count)
+        frames.close()
+
+
+class CompactFrameStoreTest(unittest.TestCase):
+    """Tests for storing animation frames compactly."""
+
+    def setUp(self):
+        eager = AnimatedImage()
+        eager.set_from_file(GIF_PATH, compact=False)
+        # play the walk cycle twice, so that every frame has a duplicate
+        self.images = list(eager.multi_frame_image.images) * 2
+
+    def test_frames_are_lossless_in_any_order(self):
+        store = CompactFrameStore(self.images, keyframe_interval=3)
+        self.assertEqual(len(self.images), len(store))
+        self.assertEqual(len(self.images) // 2, store.distinct_frames)
+        for order in (range(len(store)), reversed(range(len(store))), [5, 1, 14, 0, 7]):
+            for index in order:
+                self.assertEqual(self.images[index].tobytes(), store[index].tobytes(), index)
+
+    def test_stores_a_quarter_or_less(self):
+        store = CompactFrameStore(self.images)
+        raw_bytes = sum(len(image.tobytes()) for image in self.images)
+        self.assertLessEqual(store.nbytes * 4, raw_bytes)
+
+        # playing in order expands each distinct frame once per loop, from the frame before
+        for index in range(len(store)):
+            store[index]
+        self.assertEqual(len(self.images), store.expand_count)
+
+    def test_many_colors_are_stored_as_rgba(self):
+        colorful = Image.new("RGBA", (32, 16))
+        colorful.putdata([(index, index // 2, 255 - index, 255) for index in range(512)])
+        images = [Image.new("RGBA", (32, 16), (9, 9, 9, 255)), colorful]
+        store = CompactFrameStore(images)
+        self.assertEqual(images[1].tobytes(), store[1].tobytes())
+        self.assertEqual(images[0].tobytes(), store[0].tobytes())
+
+    def test_appended_frames_are_lossless(self):
+        store = CompactFrameStore(keyframe_interval=3)
+        for count, image in enumerate(self.images, start=1):
+            store.append(image)
+            # frames can be shown while more are still being added
+            self.assertEqual(count, len(store))
+            self.assertEqual(image.tobytes(), store[count - 1].tobytes())
+        self.assertEqual(len(self.images) // 2, store.distinct_frames)
+        for index in range(len(store)):
+            self.assertEqual(self.images[index].tobytes(), store[index].tobytes(), index)
+
+        with self.assertRaises(ValueError):
+            store.append(Image.new("RGBA", (1, 1)))
+
+    def test_set_from_pil_image_stores_frames_as_decoded(self):
+        actor = AnimatedImage()
+        with Image.open(GIF_PATH) as gif:
+            actor.set_from_pil_image(gif)
+        images = actor.multi_frame_image.images
+        self.assertIsInstance(images, CompactFrameStore)
+        for index, image in enumerate(self.images[: len(images)]):
+            self.assertEqual(image.tobytes(), images[index].tobytes(), index)
+
+
+if __name__ == "__main__":
+    unittest.main()
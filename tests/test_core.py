@@ -0,0 +1,199 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+from lmae.actor import Rectangle
+from lmae.animation import HueFade, Sequence, Still, StraightMove
+from lmae.core import ActorMethod, AnimationTemplate, Stage, TemplateParameter
+
+
+class AnimationTemplateTest(unittest.TestCase):
+    """Tests for defining, instantiating, and pooling animation templates."""
+
+    def setUp(self):
+        self.actor = Rectangle(name="TemplateRectangle")
+        self.template = AnimationTemplate(
+            Sequence,
+            name="Template-sequence",
+            animations=[
+                AnimationTemplate(Still, duration=TemplateParameter("pause", 1.0)),
+                AnimationTemplate(
+                    StraightMove,
+                    distance=TemplateParameter("distance"),
+                    duration=2.0,
+                ),
+            ],
+        )
+
+    def test_instantiate_resolves_parameters(self):
+        sequence = self.template.instantiate(self.actor, distance=(-5, 0), repeat=True)
+        self.assertIsInstance(sequence, Sequence)
+        self.assertEqual("Template-sequence", sequence.name)
+        self.assertIs(self.actor, sequence.actor)
+        self.assertTrue(sequence.repeat)
+        still, move = sequence.animations
+        self.assertEqual(1.0, still.duration)
+        self.assertEqual((-5, 0), move.distance)
+        self.assertIs(self.actor, move.actor)
+        self.assertEqual(3.0, sequence.duration)
+
+    def test_missing_parameter_raises(self):
+        with self.assertRaises(KeyError):
+            self.template.instantiate(self.actor)
+
+    def test_actor_method_is_bound_to_target(self):
+        template = AnimationTemplate(HueFade, callback=ActorMethod("set_color"))
+        fade = template.instantiate(self.actor)
+        self.assertEqual(self.actor.set_color, fade.color_set_callback)
+
+    def test_released_instances_are_reused(self):
+        sequence = self.template.instantiate(self.actor, distance=(-5, 0))
+        children = list(sequence.animations)
+        self.template.release(sequence)
+        self.assertEqual(1, self.template.pool_size())
+
+        reused = self.template.instantiate(self.actor, distance=(7, 0), pause=0.5)
+        self.assertIs(sequence, reused)
+        self.assertEqual(0, self.template.pool_size())
+        self.assertFalse(reused.is_started())
+        self.assertEqual(children, reused.animations)  # children came from their pools too
+        self.assertEqual((7, 0), reused.animations[1].distance)
+        self.assertEqual(0.5, reused.animations[0].duration)
+        self.assertEqual(1, self.template.created_count)
+
+    def test_reused_instances_are_reconfigured_not_reconstructed(self):
+        template = AnimationTemplate(HueFade, callback=ActorMethod("set_color"), duration=2.0)
+        fade = template.instantiate(self.actor, final_color=(0, 0, 255), repeat=True)
+        fade.start(100.0)
+        fade.update_actor(101.0)
+        template.release(fade)
+
+        with patch.object(HueFade, "__init__") as init:
+            reused = template.instantiate(self.actor)
+        init.assert_not_called()
+        self.assertIs(fade, reused)
+        self.assertFalse(reused.is_started())
+        self.assertFalse(reused.repeat)
+        self.assertEqual((0, 255, 255), reused.final_color)
+        self.assertEqual(2.0, reused.duration)
+        reused.start(200.0)
+        reused.update_actor(200.0)
+        self.assertEqual((255, 0, 0), self.actor.color[:3])
+
+    def test_pool_size_is_bounded(self):
+        template = AnimationTemplate(Still, max_pool_size=2)
+        instances = [template.instantiate(self.actor) for _ in range(3)]
+        for instance in instances:
+            template.release(instance)
+        self.assertEqual(2, template.pool_size())
+
+    def test_release_rejects_foreign_animation(self):
+        with self.assertRaises(ValueError):
+            self.template.release(Still(actor=self.actor))
+
+
+class StageTemplateTest(unittest.TestCase):
+    """Tests for the stage handing retired animations back to their templates."""
+
+    def setUp(self):
+        self.stage = Stage(matrix=MagicMock())
+        self.actor = Rectangle(name="StageRectangle")
+        self.stage.actors.append(self.actor)
+        self.template = AnimationTemplate(Still, duration=0.5)
+
+    def test_finished_animation_is_released(self):
+        still = self.template.instantiate(self.actor)
+        self.stage.add_animation(still)
+        still.start(100.0)
+        still.update_actor(101.0)
+        self.stage.post_render()
+        self.assertEqual([], self.stage.animations)
+        self.assertEqual(1, self.template.pool_size())
+
+    def test_cleared_animation_is_released(self):
+        self.stage.add_animation(self.template.instantiate(self.actor))
+        self.stage.clear_animations_for(self.actor)
+        self.assertEqual([], self.stage.animations)
+        self.assertEqual(1, self.template.pool_size())
+
+    def test_repeating_animation_is_retained(self):
+        template = AnimationTemplate(StraightMove, distance=(1, 0), duration=0.5, repeat=True)
+        move = template.instantiate(self.actor)
+        self.stage.add_animation(move)
+        move.start(100.0)
+        move.update_actor(101.0)
+        self.stage.post_render()
+        self.assertEqual([move], self.stage.animations)
+        self.assertEqual(0, template.pool_size())
+
+
+class AnimationHandleTest(unittest.TestCase):
+    """Tests for awaitable animation handles and completion callbacks."""
+
+    def setUp(self):
+        self.stage = Stage(matrix=MagicMock())
+        self.actor = Rectangle(name="HandleRectangle")
+        self.stage.actors.append(self.actor)
+
+    def finish(self, animation):
+        animation.start(100.0)
+        animation.update_actor(101.0)
+        self.stage.post_render()
+
+    def test_callback_on_finish(self):
+        still = Still(actor=self.actor, duration=0.5)
+        handle = self.stage.add_animation(still)
+        callback = MagicMock()
+        handle.add_done_callback(callback)
+        self.assertFalse(handle.done())
+
+        self.finish(still)
+        callback.assert_called_once_with(handle)
+        self.assertTrue(handle.done())
+        self.assertFalse(handle.cancelled())
+
+        # callbacks added after completion are called right away
+        late_callback = MagicMock()
+        handle.add_done_callback(late_callback)
+        late_callback.assert_called_once_with(handle)
+
+    def test_cancel_removes_animation(self):
+        still = Still(actor=self.actor, duration=0.5)
+        handle = self.stage.add_animation(still)
+        self.assertTrue(handle.cancel())
+        self.assertEqual([], self.stage.animations)
+        self.assertTrue(handle.cancelled())
+        self.assertFalse(handle.cancel())
+
+    def test_clearing_cancels(self):
+        handles = self.stage.add_animations(
+            [Still(actor=self.actor), StraightMove(actor=self.actor, distance=(1, 0))]
+        )
+        self.stage.clear_animations_for(self.actor)
+        self.assertTrue(all(handle.cancelled() for handle in handles))
+
+    def test_play_awaits_completion(self):
+        still = Still(actor=self.actor, duration=0.5)
+
+        async def scenario():
+            play = asyncio.ensure_future(self.stage.play(still))
+            await asyncio.sleep(0)
+            self.assertFalse(play.done())
+            self.finish(still)
+            return await play
+
+        self.assertTrue(asyncio.run(scenario()))
+
+    def test_await_cancelled_returns_false(self):
+        still = Still(actor=self.actor, duration=0.5)
+
+        async def scenario():
+            handle = self.stage.add_animation(still)
+            asyncio.get_running_loop().call_soon(handle.cancel)
+            return await handle
+
+        self.assertFalse(asyncio.run(scenario()))
+
+
+if __name__ == "__main__":
+    unittest.main()
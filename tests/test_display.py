@@ -0,0 +1,80 @@
+import os
+import random
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from PIL import Image
+
+from lmae.display import PixelShape, VirtualFrameCanvas, VirtualRGBMatrix, VirtualRGBMatrixOptions
+
+
+class VirtualRGBMatrixTest(unittest.TestCase):
+    """Tests for drawing frames as LEDs on the virtual display."""
+
+    def setUp(self):
+        options = VirtualRGBMatrixOptions()
+        options.cols, options.rows = 8, 4
+        self.matrix = VirtualRGBMatrix(options)
+        random.seed(41)
+        self.frame = Image.new("RGB", (8, 4))
+        self.frame.putdata([tuple(random.randrange(256) for _ in range(3)) for _ in range(32)])
+
+    def draw_leds_one_by_one(self) -> bytes:
+        """Draw each LED with its own drawing call, as a reference."""
+        specs = self.matrix.window_specs
+        surface = pygame.Surface((specs.width, specs.height))
+        pitch = specs.led_pixel_size + specs.led_pixel_spacing
+        half_pixel = specs.led_pixel_size / 2
+        for y in range(4):
+            for x in range(8):
+                left = pitch * x + specs.led_pixel_spacing + specs.border_size
+                top = pitch * y + specs.led_pixel_spacing + specs.border_size
+                color = self.matrix.adjust_brightness(
+                    self.frame.getpixel((x, y)), specs.brightness_adjustment
+                )
+                rect = (left, top, specs.led_pixel_size, specs.led_pixel_size)
+                if specs.pixel_shape == PixelShape.ROUND:
+                    center = (left + half_pixel, top + half_pixel)
+                    pygame.draw.circle(surface, color, center, specs.led_pixel_size - half_pixel)
+                elif specs.pixel_shape == PixelShape.ROUND_RECT:
+                    pygame.draw.rect(surface, color, rect, border_radius=3)
+                else:
+                    pygame.draw.rect(surface, color, rect)
+        return pygame.image.tobytes(surface, "RGB")
+
+    def test_leds_match_drawing_one_by_one(self):
+        for shape in PixelShape:
+            for adjustment in (1.0, 1.5):
+                with self.subTest(shape=shape, adjustment=adjustment):
+                    self.matrix.window_specs.pixel_shape = shape
+                    self.matrix.window_specs.brightness_adjustment = adjustment
+                    self.matrix._prepare_led_rendering()
+                    frame_canvas = self.matrix.CreateFrameCanvas()
+                    frame_canvas.SetImage(self.frame)
+                    self.matrix.SwapOnVSync(frame_canvas)
+                    window = pygame.image.tobytes(pygame.display.get_surface(), "RGB")
+                    self.assertEqual(self.draw_leds_one_by_one(), window)
+
+    def test_brightness_table(self):
+        table = VirtualRGBMatrix.brightness_table(1.5)
+        self.assertEqual(768, len(table))
+        for level in (0, 10, 128, 255):
+            expected = VirtualRGBMatrix.adjust_brightness((level, level, level), 1.5)
+            self.assertEqual(expected, (table[level], table[256 + level], table[512 + level]))
+
+    def test_small_frames_leave_leds_off(self):
+        frame_canvas = VirtualFrameCanvas()
+        frame_canvas.SetImage(Image.new("RGBA", (2, 2), (255, 255, 255, 255)))
+        self.matrix.SwapOnVSync(frame_canvas)
+        surface = pygame.display.get_surface()
+        specs = self.matrix.window_specs
+        pitch = specs.led_pixel_size + specs.led_pixel_spacing
+        center = specs.border_size + specs.led_pixel_spacing + specs.led_pixel_size // 2
+        self.assertEqual((255, 255, 255), tuple(surface.get_at((center, center)))[:3])
+        self.assertEqual((0, 0, 0), tuple(surface.get_at((center + 2 * pitch, center)))[:3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from PIL import Image, ImageFont
+from pilmoji.source import BaseSource
+
+from lmae.actor import EmojiText
+from lmae.core import Canvas
+from lmae.emoji_source import FETCH_RETRY_DELAY, CachedEmojiSource, EmojiAtlas, find_emoji
+
+FONT_PATH = os.path.join(
+    os.path.dirname(__file__), "../examples/fonts/et-bt6001-font/EtBt6001-JO47.ttf"
+)
+
+
+class FakeEmojiSource(BaseSource):
+    STYLE = "fake"
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.requests: list[str] = []
+
+    def get_emoji(self, emoji: str, /) -> io.BytesIO | None:
+        self.requests.append(emoji)
+        if self.fail:
+            raise ConnectionError("offline")
+        buffer = io.BytesIO()
+        Image.new("RGBA", (72, 72), (255, 200, 0, 255)).save(buffer, format="PNG")
+        return buffer
+
+    def get_discord_emoji(self, id: int, /) -> io.BytesIO | None:
+        return None
+
+
+class CachedEmojiSourceTest(unittest.TestCase):
+    """Tests for caching emoji images in memory and on disk."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_find_emoji(self):
+        self.assertEqual(["☀️", "🌧️"], find_emoji(["Sunny ☀️", "Rain 🌧️ then ☀️", "Cloudy"]))
+
+    def test_fetches_once_then_reads_disk(self):
+        upstream = FakeEmojiSource()
+        source = CachedEmojiSource(upstream, cache_dir=self.cache_dir)
+        self.assertIsNotNone(source.get_emoji_bytes("☀️"))
+        self.assertIsNotNone(source.get_emoji("☀️"))
+        self.assertEqual(["☀️"], upstream.requests)
+
+        # a new source, as in the next run, uses the disk cache even when offline
+        offline_source = CachedEmojiSource(FakeEmojiSource(fail=True), cache_dir=self.cache_dir)
+        offline_source.offline = True
+        self.assertIsNotNone(offline_source.get_emoji("☀️"))
+
+    def test_failures_are_remembered(self):
+        upstream = FakeEmojiSource(fail=True)
+        source = CachedEmojiSource(upstream, cache_dir=self.cache_dir)
+        self.assertEqual(["☀️"], source.prefetch(["Sunny ☀️"]))
+        self.assertIsNone(source.get_emoji("☀️"))
+        self.assertEqual(["☀️"], upstream.requests)
+
+    def test_failed_fetches_are_retried(self):
+        upstream = FakeEmojiSource(fail=True)
+        source = CachedEmojiSource(upstream, cache_dir=self.cache_dir)
+        self.assertIsNone(source.get_emoji_bytes("☀️"))
+
+        # once the network is back, prefetching fetches it again
+        upstream.fail = False
+        self.assertEqual([], source.prefetch(["Sunny ☀️"]))
+        self.assertIsNotNone(source.get_emoji("☀️"))
+        self.assertEqual(["☀️", "☀️"], upstream.requests)
+
+    def test_failed_fetches_are_retried_after_a_delay(self):
+        upstream = FakeEmojiSource(fail=True)
+        source = CachedEmojiSource(upstream, cache_dir=self.cache_dir)
+        with patch("lmae.emoji_source.time.monotonic", return_value=100.0):
+            self.assertIsNone(source.get_emoji_bytes("☀️"))
+        upstream.fail = False
+        with patch("lmae.emoji_source.time.monotonic", return_value=100.0 + FETCH_RETRY_DELAY):
+            self.assertIsNotNone(source.get_emoji_bytes("☀️"))
+        self.assertEqual(["☀️", "☀️"], upstream.requests)
+
+    def test_drawing_fetches_in_the_background(self):
+        upstream = FakeEmojiSource()
+        source = CachedEmojiSource(upstream, cache_dir=self.cache_dir)
+        self.assertIsNone(source.get_emoji("☀️"))
+        source.wait_for_fetches()
+        self.assertFalse(source.is_pending("☀️"))
+        self.assertIsNotNone(source.get_emoji("☀️"))
+        self.assertEqual(["☀️"], upstream.requests)
+
+    def test_missing_emoji_are_remembered(self):
+        upstream = FakeEmojiSource()
+        upstream.get_emoji = lambda emoji: upstream.requests.append(emoji)
+        source = CachedEmojiSource(upstream, cache_dir=self.cache_dir)
+        self.assertEqual(["☀️"], source.prefetch(["Sunny ☀️"]))
+        self.assertEqual(["☀️"], source.prefetch(["Sunny ☀️"]))
+        self.assertEqual(["☀️"], upstream.requests)
+
+    def test_atlas_round_trip(self):
+        source = CachedEmojiSource(FakeEmojiSource(), cache_dir=self.cache_dir)
+        atlas = EmojiAtlas.build(source, ["☀️ 🌧️"], widths=[10, 20])
+        self.assertEqual(4, len(atlas))
+        self.assertEqual((20, 20), atlas.get("🌧️", 20).size)
+
+        path = os.path.join(self.cache_dir, "atlas.png")
+        atlas.save(path)
+        loaded = EmojiAtlas.load(path)
+        self.assertEqual(atlas.images.keys(), loaded.images.keys())
+        for key, image in atlas.images.items():
+            self.assertEqual(image.tobytes(), loaded.images[key].tobytes())
+
+
+class EmojiTextTest(unittest.TestCase):
+    """Tests for rendering emoji text within its own bounds."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.upstream = FakeEmojiSource()
+        self.source = CachedEmojiSource(self.upstream, cache_dir=self.temp_dir.name)
+        self.font = ImageFont.truetype(FONT_PATH, 10)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_renders_at_position(self):
+        text = EmojiText(text_font=self.font, text="Hi ☀️", emoji_source=self.source)
+        self.assertLess(text.size[0], 64)
+        canvas = Canvas(background_fill=False)
+        text.set_position((20, 10))
+        text.render(canvas)
+        bbox = canvas.image.getbbox()
+        self.assertEqual((20 + text.render_offset[0], 10 + text.render_offset[1]), bbox[:2])
+        self.assertEqual(text.size, (bbox[2] - bbox[0], bbox[3] - bbox[1]))
+
+    def test_set_text_renders_new_text(self):
+        text = EmojiText(text_font=self.font, text="Hi", emoji_source=self.source)
+        text.prefetch(["Hi ☀️"])
+        old_size = text.size
+        text.set_text("Hi ☀️")
+        self.assertEqual("Hi ☀️", text.text)
+        self.assertGreater(text.size[0], old_size[0])
+        self.assertTrue(text.changes_since_last_render)
+
+    def test_renders_emoji_once_fetched(self):
+        # hold up the fetch, as a slow network would
+        fetch_allowed = threading.Event()
+        fetch = self.upstream.get_emoji
+        self.upstream.get_emoji = lambda emoji: fetch_allowed.wait() and fetch(emoji)
+        text = EmojiText(text_font=self.font, text="Hi ☀️", emoji_source=self.source)
+        self.assertEqual(["☀️"], text.awaited_emoji)
+        without_emoji = text.rendered_text.tobytes()
+        text.changes_since_last_render = False
+        text.update()
+        self.assertFalse(text.changes_since_last_render)
+
+        fetch_allowed.set()
+        self.source.wait_for_fetches()
+        text.update()
+        self.assertEqual([], text.awaited_emoji)
+        self.assertNotEqual(without_emoji, text.rendered_text.tobytes())
+        self.assertTrue(text.changes_since_last_render)
+
+    def test_atlas_avoids_source(self):
+        atlas = EmojiAtlas()
+        atlas.add("☀️", 10, Image.new("RGBA", (10, 10), (255, 0, 0, 255)))
+        text = EmojiText(text_font=self.font, text="☀️", emoji_source=self.source, emoji_atlas=atlas)
+        self.assertEqual([], self.upstream.requests)
+        self.assertEqual((255, 0, 0, 255), text.rendered_text.getpixel((0, 0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+import uuid
+
+from PIL import Image
+
+from lmae.actor import Rectangle
+from lmae.core import Stage
+from lmae.display import HeadlessRGBMatrix, ViewerRGBMatrix, VirtualRGBMatrixOptions
+from lmae.frame_ring import FrameRing
+
+PACKAGE_PATH = os.path.join(os.path.dirname(__file__), "..")
+
+
+class FrameRingTest(unittest.TestCase):
+    """Tests for publishing frames to shared memory."""
+
+    def setUp(self):
+        self.name = f"lmae-test-{uuid.uuid4().hex[:12]}"
+        self.ring = FrameRing.create((4, 2), name=self.name, slots=3)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def frame(self, level: int) -> Image.Image:
+        return Image.new("RGB", (4, 2), (level, 0, 0))
+
+    def test_readers_see_published_frames(self):
+        reader = FrameRing.attach(self.name)
+        self.assertIsNone(reader.read_latest())
+        self.ring.publish(self.frame(10), timestamp=1.5)
+        self.ring.publish(self.frame(20))
+        latest = reader.read_latest()
+        self.assertEqual(2, latest.sequence)
+        self.assertEqual((20, 0, 0), latest.image.getpixel((3, 1)))
+        first = reader.read(1)
+        self.assertEqual((1.5, (10, 0, 0)), (first.timestamp, first.image.getpixel((0, 0))))
+        reader.close()
+
+    def test_overwritten_frames_are_dropped(self):
+        for level in range(5):
+            self.ring.publish(self.frame(level))
+        reader = FrameRing.attach(self.name)
+        self.assertIsNone(reader.read(2))
+        self.assertEqual([3, 4, 5], [reader.read(sequence).sequence for sequence in (3, 4, 5)])
+        self.assertIsNone(reader.read(6))
+        reader.close()
+
+    def test_another_process_reads_frames(self):
+        self.ring.publish(self.frame(42))
+        script = (
+            "from lmae.frame_ring import FrameRing\n"
+            f"ring = FrameRing.attach({self.name!r})\n"
+            "frame = ring.read_latest()\n"
+            "print(frame.sequence, frame.image.getpixel((0, 0))[0])\n"
+            "ring.close()\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": PACKAGE_PATH},
+            check=True,
+        )
+        self.assertEqual("1 42", result.stdout.strip())
+        # the reader leaves the ring in place for the process that created it
+        reader = FrameRing.attach(self.name)
+        self.assertEqual(1, reader.latest_sequence())
+        reader.close()
+
+
+class HeadlessRGBMatrixTest(unittest.TestCase):
+    """Tests for rendering a stage without a display."""
+
+    def test_stage_frames_are_published(self):
+        name = f"lmae-test-{uuid.uuid4().hex[:12]}"
+        matrix = HeadlessRGBMatrix(VirtualRGBMatrixOptions(), ring_name=name)
+        reader = FrameRing.attach(name)
+        rectangle = Rectangle(position=(1, 1), size=(2, 2), color=(0, 255, 0, 255))
+        stage = Stage(matrix=matrix, actors=[rectangle])
+        stage.render_frame()
+        frame = reader.read_latest()
+        self.assertEqual((64, 32), frame.image.size)
+        self.assertEqual((0, 255, 0), frame.image.getpixel((2, 2)))
+        self.assertEqual((0, 0, 0), frame.image.getpixel((10, 10)))
+        reader.close()
+        matrix.close()
+
+
+class ViewerRGBMatrixTest(unittest.TestCase):
+    """Tests for drawing the virtual display in a viewer process."""
+
+    def test_viewer_runs_until_closed(self):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        matrix = ViewerRGBMatrix(VirtualRGBMatrixOptions())
+        name = matrix.frame_ring.name
+        stage = Stage(matrix=matrix, actors=[Rectangle(size=(4, 4), color=(255, 0, 0, 255))])
+        for _ in range(20):
+            stage.render_frame()
+            time.sleep(0.01)
+        self.assertIsNone(matrix.viewer.poll(), "viewer should still be running")
+        matrix.close()
+        self.assertIsNotNone(matrix.viewer.poll())
+        with self.assertRaises(FileNotFoundError):
+            FrameRing.attach(name)
+
+
+if __name__ == "__main__":
+    unittest.main()
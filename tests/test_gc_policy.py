@@ -0,0 +1,163 @@
+import asyncio
+import gc
+import unittest
+import weakref
+
+from lmae.app import SingleStageRenderLoopApp
+from lmae.gc_policy import OVERDUE_FACTOR, GCPolicy
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Node:
+    """An object that refers to itself, so that only the garbage collector can free it."""
+
+    def __init__(self):
+        self.itself = self
+
+
+class PreparingApp:
+    def __init__(self):
+        self.assets = None
+
+    def prepare(self):
+        self.assets = [Node() for _ in range(10)]
+
+
+class GCPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.was_enabled = gc.isenabled()
+        self.callbacks = list(gc.callbacks)
+
+    def tearDown(self):
+        gc.unfreeze()
+        if self.was_enabled:
+            gc.enable()
+        gc.callbacks[:] = self.callbacks
+
+    def make_garbage(self, count: int) -> weakref.ref:
+        """
+        :param count: How many objects to leave for the garbage collector
+        :return: a reference to one of them, which dies when it is collected
+        """
+        nodes = [Node() for _ in range(count)]
+        return weakref.ref(nodes[0])
+
+    def test_managed_disables_automatic_collection_until_closed(self):
+        policy = GCPolicy()
+        policy.start()
+        self.assertFalse(gc.isenabled())
+        self.assertIn(policy.on_collection, gc.callbacks)
+        policy.close()
+        self.assertTrue(gc.isenabled())
+        self.assertNotIn(policy.on_collection, gc.callbacks)
+
+    def test_instrumented_leaves_automatic_collection_on(self):
+        policy = GCPolicy(managed=False)
+        policy.start()
+        self.assertTrue(gc.isenabled())
+        gc.collect(0)
+        self.assertEqual(1, policy.collections[0])
+        self.assertEqual(0.0, policy.collect_while_idle(1.0))
+        policy.close()
+
+    def test_prepare_freezes_what_the_app_keeps(self):
+        policy = GCPolicy()
+        policy.start()
+        garbage = self.make_garbage(10)
+        app = PreparingApp()
+        policy.prepare(app)
+        self.assertIsNone(garbage())
+        self.assertGreater(gc.get_freeze_count(), len(app.assets))
+        self.assertEqual(1, policy.collections[2])
+        self.assertEqual(0, policy.frames_paused)
+        policy.close()
+        self.assertEqual(0, gc.get_freeze_count())
+
+    def test_collects_due_generation_while_idle(self):
+        policy = GCPolicy()
+        policy.start()
+        gc.collect()
+        self.assertEqual(0.0, policy.collect_while_idle(1.0))
+        garbage = self.make_garbage(policy.thresholds[0])
+        self.assertIsNotNone(garbage())
+        self.assertGreater(policy.collect_while_idle(1.0), 0.0)
+        self.assertIsNone(garbage())
+        self.assertEqual(1, policy.collections[0])
+        policy.close()
+
+    def test_waits_for_enough_idle_time_unless_overdue(self):
+        policy = GCPolicy()
+        policy.start()
+        gc.collect()
+        policy.estimates[0] = 0.5
+        garbage = self.make_garbage(policy.thresholds[0])
+        self.assertEqual(0.0, policy.collect_while_idle(0.1))
+        self.assertIsNotNone(garbage())
+        more_garbage = self.make_garbage(policy.thresholds[0] * OVERDUE_FACTOR)
+        policy.collect_while_idle(0.0)
+        self.assertIsNone(garbage())
+        self.assertIsNone(more_garbage())
+        policy.close()
+
+    def test_correlates_pauses_with_overruns(self):
+        clock = FakeClock()
+        policy = GCPolicy(managed=False, clock=clock)
+        budget = 1.0 / 30
+
+        # a collection long enough to make the frame overrun
+        policy.frame_started()
+        policy.on_collection("start", {"generation": 2})
+        clock.now += 0.020
+        policy.on_collection("stop", {"generation": 2})
+        policy.frame_finished(0.040, budget)
+
+        # a frame that overran anyway, with a short collection
+        policy.frame_started()
+        policy.on_collection("start", {"generation": 0})
+        clock.now += 0.001
+        policy.on_collection("stop", {"generation": 0})
+        policy.frame_finished(0.050, budget)
+
+        # a frame that overran with no collection
+        policy.frame_started()
+        policy.frame_finished(0.040, budget)
+
+        # a collection between frames doesn't count against the next one
+        policy.on_collection("start", {"generation": 1})
+        clock.now += 0.030
+        policy.on_collection("stop", {"generation": 1})
+        policy.frame_started()
+        policy.frame_finished(0.010, budget)
+
+        self.assertEqual(4, policy.frames)
+        self.assertEqual(3, policy.overruns)
+        self.assertEqual(2, policy.overruns_paused)
+        self.assertEqual(1, policy.overruns_from_pauses)
+        self.assertEqual(2, policy.frames_paused)
+        self.assertAlmostEqual(0.020, policy.longest_frame_pause)
+        self.assertEqual([1, 1, 1], policy.collections)
+        self.assertAlmostEqual(0.030, policy.longest_collection[1])
+
+    def test_app_collects_while_waiting_for_next_frame(self):
+        policy = GCPolicy()
+        policy.start()
+        gc.collect()
+        app = SingleStageRenderLoopApp()
+        app.gc_policy = policy
+        garbage = self.make_garbage(policy.thresholds[0])
+        asyncio.run(app.wait_for_next_frame(0.001, 0.010))
+        self.assertIsNone(garbage())
+        self.assertEqual(1, policy.frames)
+        self.assertEqual(0, policy.overruns)
+        policy.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import unittest
+
+from PIL import Image, ImageDraw, ImageFont
+
+from lmae.actor import Text
+from lmae.core import Canvas
+from lmae.glyphs import get_glyph_atlas
+
+FONT_DIR = os.path.join(os.path.dirname(__file__), "../examples/fonts")
+FONTS = [
+    ("teeny-tiny-pixls-font/TeenyTinyPixls-o2zo.ttf", 5),
+    ("sparkly-font/SparklyFontRegular-zyA3.ttf", 16),
+    ("Roboto/Roboto-Regular.ttf", 12),
+]
+STRINGS = ["", "7", "12:45", "72°F", "AVAWAY To", "two\nlines"]
+
+
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(os.path.join(FONT_DIR, path), size)
+
+
+class GlyphAtlasTest(unittest.TestCase):
+    """Tests that text laid out from cached glyphs matches Pillow's text rendering."""
+
+    def test_atlas_is_shared(self):
+        font = load_font(*FONTS[0])
+        same_font = load_font(*FONTS[0])
+        self.assertIs(get_glyph_atlas(font, 1), get_glyph_atlas(same_font, 1))
+        self.assertIsNot(get_glyph_atlas(font, 1), get_glyph_atlas(font, 0))
+        self.assertIsNone(get_glyph_atlas(ImageFont.load_default_imagefont()))
+
+    def test_measure_matches_textbbox(self):
+        draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        for path, size in FONTS:
+            font = load_font(path, size)
+            for stroke_width in (0, 1, 2):
+                atlas = get_glyph_atlas(font, stroke_width)
+                for string in STRINGS:
+                    with self.subTest(font=path, stroke_width=stroke_width, string=string):
+                        expected = draw.textbbox(
+                            (0, 0), string, font=font, stroke_width=stroke_width
+                        )
+                        self.assertEqual(expected, atlas.measure(string))
+
+    def test_text_matches_pillow(self):
+        colors = [
+            ((224, 224, 224, 255), (0, 0, 0, 255)),
+            ((255, 0, 0, 128), (0, 0, 255, 200)),
+            ((255, 255, 255, 255), (255, 255, 255, 255)),
+        ]
+        for path, size in FONTS:
+            font = load_font(path, size)
+            for stroke_width in (0, 1, 2):
+                for color, stroke_color in colors:
+                    text = Text(
+                        font=font,
+                        color=color,
+                        stroke_color=stroke_color,
+                        stroke_width=stroke_width,
+                    )
+                    for string in STRINGS[1:]:
+                        with self.subTest(
+                            font=path, stroke_width=stroke_width, color=color, string=string
+                        ):
+                            text.set_text(string)
+                            expected = Image.new("RGBA", text.rendered_text.size, (0, 0, 0, 0))
+                            ImageDraw.Draw(expected).text(
+                                (stroke_width, stroke_width),
+                                string,
+                                fill=color,
+                                font=font,
+                                stroke_fill=stroke_color,
+                                stroke_width=stroke_width,
+                            )
+                            self.assertEqual(expected.tobytes(), text.rendered_text.tobytes())
+
+
+class TextLayoutTest(unittest.TestCase):
+    """Tests for measuring, aligning, and wrapping text without rendering it."""
+
+    def setUp(self):
+        self.font = load_font("Roboto/Roboto-Regular.ttf", 12)
+        self.atlas = get_glyph_atlas(self.font)
+
+    def test_layout_is_cached(self):
+        self.assertIs(self.atlas.layout("12:45"), self.atlas.layout("12:45"))
+
+    def test_anchor_offsets(self):
+        layout = self.atlas.layout("72°F")
+        width = self.font.getlength("72°F")
+        ascent, descent = self.font.getmetrics()
+        self.assertEqual((0, 0), layout.anchor_offset("la", ascent))
+        self.assertEqual((-round(width / 2), -ascent), layout.anchor_offset("ms", ascent))
+        self.assertEqual((-round(width), -(ascent + descent)), layout.anchor_offset("rd", ascent))
+
+    def test_wrap_to_width(self):
+        lines = self.atlas.wrap("Partly cloudy with a chance of rain", 40)
+        self.assertGreater(len(lines), 1)
+        self.assertEqual("Partly cloudy with a chance of rain", " ".join(lines))
+        for line in lines:
+            if " " in line:
+                self.assertLessEqual(self.atlas.measure_line(line)[2], 40)
+
+    def test_align_right(self):
+        layout = self.atlas.layout("1\n1000", align="right")
+        self.assertEqual(0, layout.line_origins[1][0])
+        self.assertEqual(
+            round(self.font.getlength("1000") - self.font.getlength("1")), layout.line_origins[0][0]
+        )
+
+    def test_text_anchor_moves_render_position(self):
+        canvas = Canvas(size=(64, 32), background_fill=False)
+        text = Text(font=self.font, text="72°F", position=(32, 16), anchor="mm")
+        text.render(canvas)
+        bbox = canvas.image.getbbox()
+        self.assertLessEqual(abs((bbox[0] + bbox[2]) / 2 - 32), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
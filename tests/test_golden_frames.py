@@ -0,0 +1,83 @@
+import os
+import unittest
+
+from PIL import Image, ImageFont
+
+from lmae.actor import CropMask, GradientRectangle, Rectangle, Text
+from lmae.animation import Easing, HueFade, StraightMove
+from lmae.component import AnimatedImage
+from tests.golden_frames import GoldenFrameTestCase, render_scene
+from tests.testing_matrix import RecordedFrames
+
+EXAMPLES_PATH = os.path.join(os.path.dirname(__file__), "../examples")
+
+
+class RecordedFramesTest(unittest.TestCase):
+    """Tests for recording presented frames compactly."""
+
+    def test_frames_are_lossless_and_deduplicated(self):
+        frames = RecordedFrames()
+        images = []
+        for step in range(40):
+            image = Image.new("RGB", (16, 8))
+            image.putpixel((step % 16, step % 8), (255, step, 0))
+            images.append(image)
+        for image in images + images[:5]:
+            frames.append(image)
+        self.assertEqual(45, len(frames))
+        self.assertEqual(40, frames.distinct_frames)
+        self.assertEqual(frames.hashes[:5], frames.hashes[40:])
+        for index in (0, 17, 39, 42):
+            self.assertEqual(images[index % 40].tobytes(), frames[index].tobytes(), index)
+        self.assertLess(frames.nbytes, sum(len(image.tobytes()) for image in images) // 4)
+
+
+class GoldenFramesTest(GoldenFrameTestCase):
+    """Checks that scenes render exactly the frames they always have."""
+
+    def test_moving_rectangles(self):
+        box = Rectangle(position=(2, 2), size=(6, 6), color=(255, 200, 0, 255))
+        bar = Rectangle(position=(0, 24), size=(63, 3), outline_width=1)
+        animations = [
+            StraightMove(actor=box, distance=(50, 16), duration=1.0, easing=Easing.QUADRATIC),
+            HueFade(actor=bar, callback=bar.set_color, duration=1.0),
+        ]
+        matrix, hashes = render_scene([box, bar], animations, frame_count=40)
+        self.assertMatchesGolden("moving_rectangles", matrix, hashes)
+
+    def test_masked_gradient(self):
+        gradient = GradientRectangle(
+            size=(63, 31),
+            orientation="radial",
+            stops=[(0.0, (255, 255, 255, 255)), (0.5, (0, 128, 255, 255)), (1.0, (0, 0, 0, 255))],
+        )
+        sweep = Rectangle(position=(-8, 4), size=(6, 24), color=(255, 0, 64, 255))
+        mask = CropMask(child=sweep, crop_area=(8, 4, 55, 27))
+        animations = [StraightMove(actor=sweep, distance=(72, 0), duration=1.0)]
+        matrix, hashes = render_scene([gradient, mask], animations, frame_count=40)
+        self.assertMatchesGolden("masked_gradient", matrix, hashes)
+
+    def test_animated_image(self):
+        walker = AnimatedImage(position=(0, 4))
+        walker.set_from_file(os.path.join(EXAMPLES_PATH, "images/kirby-walk-anim.gif"))
+        matrix, hashes = render_scene([walker], walker.get_animations(), frame_count=60)
+        self.assertMatchesGolden("animated_image", matrix, hashes)
+
+    def test_text(self):
+        font = ImageFont.truetype(
+            os.path.join(EXAMPLES_PATH, "fonts/teeny-tiny-pixls-font/TeenyTinyPixls-o2zo.ttf"), 5
+        )
+        text = Text(
+            font=font,
+            position=(2, 10),
+            text="GOLDEN FRAMES",
+            color=(224, 224, 224, 255),
+            stroke_width=1,
+        )
+        animations = [StraightMove(actor=text, distance=(0, 12), duration=0.5)]
+        matrix, hashes = render_scene([text], animations, frame_count=20)
+        self.assertMatchesGolden("text", matrix, hashes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,8 @@ import unittest
 from unittest.mock import patch
 
 from examples.satori import SatoriApp, SatoriPattern
+from lmae.assets import AssetRegistry
+from tests.testing_matrix import TestingRGBMatrix, TestingRGBMatrixOptions
 
 
 def _mock_localtime(hour: int, minute: int = 0, second: int = 0) -> time.struct_time:
@@ -249,5 +251,27 @@ class ColorTableTest(unittest.TestCase):
             self.assertTrue(found, f"Color {key_color} missing from table")
 
 
+class PrepareTest(unittest.TestCase):
+    """Test that preparing the app sets it up as the running app."""
+
+    def setUp(self):
+        resource_path = os.path.join(os.path.dirname(__file__), "..", "examples")
+        self.app = SatoriApp(width=32, height=16, seed=1, resource_path=resource_path)
+        self.app.assets = AssetRegistry()
+        options = TestingRGBMatrixOptions()
+        self.app.set_matrix(matrix=TestingRGBMatrix(options), options=options)
+
+    def test_prepare_activates_assets_and_keeps_the_stage_size(self):
+        self.app.prepare()
+        self.assertIs(self.app, self.app.assets.active_owner)
+        self.assertEqual((32, 16), self.app.stage.size)
+
+    def test_prepare_again_replaces_scheduled_calls(self):
+        self.app.prepare()
+        scheduled = len(self.app.scheduler)
+        self.app.prepare()
+        self.assertEqual(scheduled, len(self.app.scheduler))
+
+
 if __name__ == "__main__":
     unittest.main()
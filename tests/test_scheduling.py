@@ -0,0 +1,170 @@
+import time
+import unittest
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+import freezegun
+
+from lmae.scheduling import TimerWheel, next_boundary
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class NextBoundaryTest(unittest.TestCase):
+    def test_boundaries(self):
+        now = datetime(2024, 3, 9, 23, 59, 30, 500)
+        self.assertEqual(datetime(2024, 3, 9, 23, 59, 31), next_boundary("second", now))
+        self.assertEqual(datetime(2024, 3, 10, 0, 0), next_boundary("minute", now))
+        self.assertEqual(datetime(2024, 3, 10, 0, 0), next_boundary("hour", now))
+        self.assertEqual(datetime(2024, 3, 10, 0, 0), next_boundary("day", now))
+
+    def test_exactly_on_a_boundary_gives_the_next_one(self):
+        now = datetime(2024, 3, 9, 12, 0, 0)
+        self.assertEqual(datetime(2024, 3, 9, 13, 0), next_boundary("hour", now))
+
+    def test_unknown_boundary(self):
+        with self.assertRaises(ValueError):
+            next_boundary("fortnight", datetime.now())
+
+
+class TimerWheelTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(tick=0.01, slots=64, clock=self.clock)
+
+    def advance_to(self, now: float) -> int:
+        self.clock.now = now
+        return self.wheel.advance()
+
+    def test_call_at_fires_once_when_due(self):
+        callback = MagicMock()
+        self.wheel.call_at(1000.5, callback, "a")
+        self.assertEqual(0, self.advance_to(1000.4))
+        callback.assert_not_called()
+        self.assertEqual(1, self.advance_to(1000.5))
+        callback.assert_called_once_with("a")
+        self.assertEqual(0, self.advance_to(1001.0))
+        self.assertEqual(0, len(self.wheel))
+
+    def test_calls_are_made_in_time_order(self):
+        order = []
+        self.wheel.call_later(0.3, order.append, "third")
+        self.wheel.call_later(0.1, order.append, "first")
+        self.wheel.call_later(0.2, order.append, "second")
+        self.advance_to(1001.0)
+        self.assertEqual(["first", "second", "third"], order)
+
+    def test_call_more_than_one_revolution_ahead(self):
+        # 64 slots of 10 ms is 0.64 s per revolution
+        callback = MagicMock()
+        self.wheel.call_later(2.0, callback)
+        for step in range(1, 200):
+            self.advance_to(1000.0 + step * 0.01)
+        callback.assert_not_called()
+        self.advance_to(1002.0)
+        callback.assert_called_once()
+
+    def test_call_every_does_not_drift(self):
+        times = []
+        self.wheel.call_every(1.0, lambda: times.append(self.clock.now))
+        # advance in uneven frame steps
+        now = 1000.0
+        while now < 1005.0:
+            now += 0.037
+            self.advance_to(now)
+        self.assertEqual(5, len(times))
+        for count, when in enumerate(times, start=1):
+            self.assertAlmostEqual(1000.0 + count, when, delta=0.05)
+
+    def test_call_every_skips_missed_calls(self):
+        callback = MagicMock()
+        self.wheel.call_every(1.0, callback)
+        self.advance_to(1010.5)  # a long stall
+        self.assertEqual(1, callback.call_count)
+        self.advance_to(1011.0)
+        self.assertEqual(2, callback.call_count)
+
+    def test_cancel(self):
+        callback = MagicMock()
+        call = self.wheel.call_every(0.5, callback)
+        self.advance_to(1000.5)
+        call.cancel()
+        self.advance_to(1002.0)
+        self.assertEqual(1, callback.call_count)
+        self.assertEqual(0, len(self.wheel))
+
+    def test_cancel_all(self):
+        callback = MagicMock()
+        self.wheel.call_later(0.5, callback)
+        self.wheel.call_every(0.5, callback)
+        self.wheel.cancel_all()
+        self.advance_to(1002.0)
+        callback.assert_not_called()
+
+    def test_callback_exceptions_do_not_stop_other_calls(self):
+        callback = MagicMock()
+        self.wheel.call_later(0.1, MagicMock(side_effect=RuntimeError("boom")))
+        self.wheel.call_later(0.2, callback)
+        self.advance_to(1001.0)
+        callback.assert_called_once()
+
+
+class WallClockTriggerTest(unittest.TestCase):
+    def test_call_on_the_minute(self):
+        with freezegun.freeze_time("2024-01-01 12:00:30") as frozen_time:
+            wheel = TimerWheel()
+            callback = MagicMock()
+            wheel.call_on("minute", callback)
+
+            frozen_time.tick(29.0)
+            wheel.advance()
+            callback.assert_not_called()
+
+            frozen_time.tick(1.0)
+            wheel.advance()
+            callback.assert_called_once()
+
+            frozen_time.tick(60.0)
+            wheel.advance()
+            self.assertEqual(2, callback.call_count)
+
+    def test_call_on_the_hour_in_utc(self):
+        with freezegun.freeze_time("2024-01-01 12:59:59") as frozen_time:
+            wheel = TimerWheel()
+            hours = []
+            wheel.call_on("hour", lambda: hours.append(datetime.now(UTC).hour), tz=UTC)
+            frozen_time.tick(1.0)
+            wheel.advance()
+            self.assertEqual([13], hours)
+
+    def test_early_wakeup_waits_for_wall_clock(self):
+        with freezegun.freeze_time("2024-01-01 12:00:30") as frozen_time:
+            wheel = TimerWheel()
+            callback = MagicMock()
+            wheel.call_on("minute", callback)
+            # the monotonic clock reaches the deadline, but the wall clock was set back
+            frozen_time.move_to("2024-01-01 12:00:50")
+            wheel.advance(time.monotonic() + 30.0)
+            callback.assert_not_called()
+            frozen_time.move_to("2024-01-01 12:01:00")
+            wheel.advance(time.monotonic() + 30.0)
+            callback.assert_called_once()
+
+    def test_cancel_stops_boundary_calls(self):
+        with freezegun.freeze_time("2024-01-01 12:00:30") as frozen_time:
+            wheel = TimerWheel()
+            callback = MagicMock()
+            wheel.call_on("minute", callback).cancel()
+            frozen_time.tick(120.0)
+            wheel.advance()
+            callback.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
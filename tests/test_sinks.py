@@ -0,0 +1,120 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from PIL import Image
+
+from lmae.actor import Rectangle
+from lmae.core import Stage
+from lmae.sinks import FrameSink, QueuedSink, RecorderSink, SocketSink, read_frames
+from tests.testing_matrix import TestingRGBMatrix, TestingRGBMatrixOptions
+
+
+class ListSink(FrameSink):
+    """A sink that keeps the frames it is given, and can be held up."""
+
+    def __init__(self):
+        self.frames = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.presenting = threading.Event()
+        self.closed = False
+
+    def present(self, frame, timestamp):
+        self.presenting.set()
+        self.gate.wait()
+        self.frames.append((timestamp, frame))
+
+    def close(self):
+        self.closed = True
+
+
+def frame(level: int) -> Image.Image:
+    image = Image.new("RGB", (8, 4))
+    image.putpixel((level % 8, 2), (level, 255 - level, 7))
+    return image
+
+
+class QueuedSinkTest(unittest.TestCase):
+    """Tests for presenting frames to a sink on its own thread."""
+
+    def test_frames_are_presented_in_order(self):
+        sink = ListSink()
+        queued = QueuedSink(sink, queue_size=4)
+        for level in range(3):
+            queued.present(frame(level), float(level))
+        self.assertTrue(queued.wait_until_idle(timeout=5))
+        self.assertEqual([0.0, 1.0, 2.0], [timestamp for timestamp, _ in sink.frames])
+        queued.close()
+        self.assertTrue(sink.closed)
+
+    def test_slow_sink_drops_oldest_frames(self):
+        sink = ListSink()
+        sink.gate.clear()
+        queued = QueuedSink(sink, queue_size=2)
+        queued.present(frame(0), 0.0)
+        # wait for the worker to get stuck presenting the first frame
+        self.assertTrue(sink.presenting.wait(timeout=5))
+        for level in range(1, 6):
+            queued.present(frame(level), float(level))
+        self.assertEqual(3, queued.dropped_frames)
+        sink.gate.set()
+        queued.close()
+        self.assertEqual([0.0, 4.0, 5.0], [timestamp for timestamp, _ in sink.frames])
+
+
+class FrameStreamTest(unittest.TestCase):
+    """Tests for recording and streaming delta-encoded frames."""
+
+    def test_recording_plays_back(self):
+        frames = [frame(level) for level in (1, 2, 2, 3)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "frames.lmaf")
+            recorder = RecorderSink(path, key_frame_interval=3)
+            for index, image in enumerate(frames):
+                recorder.present(image, 10.0 + index)
+            recorder.close()
+            # unchanged and single-pixel frames only record their changes
+            self.assertLess(os.path.getsize(path), 2 * 8 * 4 * 3 + 100)
+            with open(path, "rb") as stream:
+                played = list(read_frames(stream))
+        self.assertEqual([10.0, 11.0, 12.0, 13.0], [timestamp for timestamp, _ in played])
+        for expected, (_, image) in zip(frames, played, strict=True):
+            self.assertEqual(expected.tobytes(), image.tobytes())
+
+    def test_viewer_joins_stream(self):
+        sink = SocketSink(port=0)
+        sink.present(frame(1), 1.0)
+        with socket.create_connection(("127.0.0.1", sink.port), timeout=5) as connection:
+            sink.present(frame(2), 2.0)
+            sink.present(frame(3), 3.0)
+            sink.close()
+            with connection.makefile("rb") as stream:
+                played = list(read_frames(stream))
+        self.assertEqual([2.0, 3.0], [timestamp for timestamp, _ in played])
+        self.assertEqual(frame(3).tobytes(), played[-1][1].tobytes())
+
+
+class StageSinksTest(unittest.TestCase):
+    """Tests for presenting a stage's frames to sinks as well as the matrix."""
+
+    def test_frames_reach_matrix_and_sinks(self):
+        matrix = TestingRGBMatrix(options=TestingRGBMatrixOptions())
+        sink = ListSink()
+        rectangle = Rectangle(position=(1, 1), size=(2, 2), color=(0, 0, 255, 255))
+        stage = Stage(matrix=matrix, actors=[rectangle], sinks=[sink])
+        stage.render_frame()
+        self.assertEqual(1, len(sink.frames))
+        self.assertEqual((0, 0, 255), sink.frames[0][1].getpixel((2, 2)))
+
+    def test_sinks_without_matrix(self):
+        sink = ListSink()
+        stage = Stage(actors=[Rectangle(size=(2, 2))], sinks=[sink])
+        stage.render_frame()
+        self.assertEqual((64, 32), sink.frames[0][1].size)
+
+
+if __name__ == "__main__":
+    unittest.main()
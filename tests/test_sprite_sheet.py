@@ -0,0 +1,66 @@
+import os
+import unittest
+
+from PIL import Image
+
+from lmae.actor import SpriteImage
+from lmae.assets import AssetRegistry
+from lmae.core import Canvas
+from lmae.sprite_sheet import SpriteSheet
+
+RESOURCE_PATH = os.path.join(os.path.dirname(__file__), "../examples")
+SHEET_PATH = os.path.join(RESOURCE_PATH, "images/weather-sprites.png")
+SPEC_PATH = os.path.join(RESOURCE_PATH, "images/weather-sprites.json")
+
+
+class SpriteSheetTest(unittest.TestCase):
+    """Tests for compiled sprite sheets and the sprite images that share them."""
+
+    def setUp(self):
+        self.sheet = SpriteSheet.from_files(SHEET_PATH, SPEC_PATH)
+
+    def test_compiles_spec(self):
+        sprite = self.sheet.get("cloudy")
+        self.assertEqual((17, 0), sprite.position)
+        self.assertEqual((17, 0, 34, 17), sprite.box)
+        self.assertIn("sunny", self.sheet)
+        self.assertIsNone(self.sheet.get("no-such-sprite"))
+        self.assertIs(self.sheet.crop("cloudy"), self.sheet.crop("cloudy"))
+
+        with self.assertRaises(ValueError):
+            SpriteSheet(self.sheet.image, {"broken": {"position": [0, 0]}})
+        with self.assertRaises(ValueError):
+            SpriteSheet(self.sheet.image, {"outside": {"position": [-1, 0], "size": [2, 2]}})
+
+    def test_renders_same_as_sheet_region(self):
+        sprite = SpriteImage(position=(3, 5), sheet=self.sheet, selected="rainy")
+        self.assertEqual((17, 17), sprite.size)
+        canvas = Canvas(background_fill=False)
+        sprite.render(canvas)
+
+        expected = Image.new("RGBA", canvas.image.size, (0, 0, 0, 0))
+        expected.alpha_composite(self.sheet.image, dest=(3, 5), source=self.sheet.get("rainy").box)
+        self.assertEqual(expected.tobytes(), canvas.image.tobytes())
+
+    def test_sprite_images_share_sheet(self):
+        registry = AssetRegistry()
+        sheet = registry.sprite_sheet(SHEET_PATH, SPEC_PATH, owner="weather")
+        self.assertIs(sheet, registry.sprite_sheet(SHEET_PATH, SPEC_PATH, owner="weather"))
+        first = SpriteImage(sheet=sheet, selected="sunny")
+        second = SpriteImage(sheet=sheet, selected="sunny")
+        self.assertIs(first.sprite_image, second.sprite_image)
+
+        shadow = sheet.with_image(Image.new("RGBA", sheet.image.size))
+        self.assertIs(sheet.sprites, shadow.sprites)
+        self.assertIsNot(sheet.crop("sunny"), shadow.crop("sunny"))
+
+    def test_sheet_from_image_and_spec(self):
+        sprite = SpriteImage(sheet=self.sheet.image, spec=self.sheet.spec, selected="sunny")
+        self.assertEqual((17, 17), sprite.size)
+        sprite.set_sprite("no-such-sprite")
+        self.assertEqual((0, 0), sprite.size)
+        self.assertIsNone(sprite.sprite_image)
+
+
+if __name__ == "__main__":
+    unittest.main()
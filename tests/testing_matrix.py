@@ -1,9 +1,94 @@
 from __future__ import annotations
 
+import hashlib
 import logging
+import zlib
+from collections.abc import Sequence
 
 from PIL import Image
 
+from lmae.sinks import PACKET_HEADER, DeltaEncoder
+
+# how many distinct frames to store between whole frames
+KEYFRAME_INTERVAL = 16
+
+
+def frame_hash(image: Image) -> str:
+    """
+    :param image: A frame
+    :return: a hash of the frame's RGB pixels, as hex
+    """
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return hashlib.blake2b(image.tobytes(), digest_size=16).hexdigest()
+
+
+class RecordedFrames(Sequence):
+    """
+    Every frame presented to a testing matrix, stored compactly. Each distinct frame is
+    stored once, as a compressed packet holding the region that changed since the previous
+    distinct frame, with a whole frame stored every so often. Frames are known by the hash
+    of their pixels, so whole runs can be compared without expanding any frames.
+    """
+
+    def __init__(self):
+        self.hashes: list[str] = []  # the hash of each frame presented
+        self._distinct: dict[str, int] = {}
+        self._packets: list[bytes] = []  # each distinct frame's compressed delta packet
+        self._key_frames: list[bool] = []  # whether each distinct frame was stored whole
+        self._encoder = DeltaEncoder()
+        self.size: tuple[int, int] = (0, 0)
+
+    def append(self, image: Image) -> str:
+        """
+        Record a frame.
+
+        :param image: The frame
+        :return: the frame's hash
+        """
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        digest = frame_hash(image)
+        if digest not in self._distinct:
+            self._distinct[digest] = len(self._packets)
+            key_frame = image.size != self.size or len(self._packets) % KEYFRAME_INTERVAL == 0
+            self.size = image.size
+            packet = self._encoder.encode(image, 0.0, key_frame=key_frame)
+            self._packets.append(zlib.compress(packet))
+            self._key_frames.append(key_frame)
+        self.hashes.append(digest)
+        return digest
+
+    @property
+    def distinct_frames(self) -> int:
+        return len(self._packets)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes of compressed frame data stored
+        """
+        return sum(len(packet) for packet in self._packets)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __getitem__(self, index: int) -> Image:
+        distinct_index = self._distinct[self.hashes[index]]
+        start = distinct_index
+        while not self._key_frames[start]:
+            start -= 1
+        frame = None
+        for packet in self._packets[start : distinct_index + 1]:
+            data = zlib.decompress(packet)
+            _, left, top, width, height = PACKET_HEADER.unpack_from(data)
+            if frame is None:
+                frame = Image.new("RGB", (left + width, top + height))
+            if width:
+                region = Image.frombytes("RGB", (width, height), data[PACKET_HEADER.size :])
+                frame.paste(region, (left, top))
+        return frame
+
 
 class TestingRGBMatrixOptions:
     """
@@ -53,7 +138,8 @@ class TestingFrameCanvas:
 class TestingRGBMatrix:
     """
     A stand-in class for rgbmatrix.RGBMatrix
-    Useful in testing, does not invoke Pygame
+    Useful in testing, does not invoke Pygame.
+    Every frame presented is recorded in `frames`, unless `recording` is turned off.
     """
 
     def __init__(self, options: TestingRGBMatrixOptions = None):
@@ -63,6 +149,8 @@ class TestingRGBMatrix:
 
         self.matrix_options: TestingRGBMatrixOptions = options
         self.frame_canvas = TestingFrameCanvas()
+        self.frames = RecordedFrames()
+        self.recording = True
 
     def CreateFrameCanvas(self) -> TestingFrameCanvas:
         # self.logger.info("Creating frame canvas")
@@ -85,5 +173,8 @@ class TestingRGBMatrix:
             return 0, 0, 0
 
     def SwapOnVSync(self, frame_canvas: TestingFrameCanvas) -> TestingFrameCanvas:
-        self.frame_canvas = frame_canvas
-        return self.CreateFrameCanvas()
+        if self.recording and frame_canvas.image is not None:
+            self.frames.append(frame_canvas.image)
+        # like the LED matrix, hand back the canvas that was shown before, to draw on next
+        frame_canvas, self.frame_canvas = self.frame_canvas, frame_canvas
+        return frame_canvas